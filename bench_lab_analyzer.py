@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Lab Analyzer Benchmark Suite
+Throughput and allocation numbers for the lab analysis hot path
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services/lab-agent'))
+
+from lab_analyzer import LabResultAnalyzer, CATALOGUE
+
+try:
+    import lab_columnar
+except ImportError:  # pandas/pyarrow not installed
+    lab_columnar = None
+
+# Tests without a reference range, as sent by real analyzers
+UNKNOWN_TESTS = [
+    'hba1c', 'tsh', 'vitamin_d', 'ferritin', 'crp', 'esr', 'ck', 'ldh',
+    'magnesium', 'phosphate', 'albumin', 'total_protein', 'troponin', 'inr'
+]
+
+MALFORMED_VALUES = ['', 'N/A', '>500', '12..3', 'hemolyzed', None, {'value': 'pending'}]
+
+DEFAULT_SIZES = [8, 24, 64]
+
+
+def _name_variants(key):
+    """Spellings that normalize to the same reference range"""
+    spaced = key.replace('_', ' ')
+    return [key, key.upper(), spaced.title(), spaced]
+
+
+def make_panel(rng, ranges, size, abnormal_rate=0.15, critical_rate=0.03,
+               unknown_rate=0.05, malformed_rate=0.02):
+    """
+    Build one synthetic panel of `size` tests
+    Rates are per test; everything else is drawn inside the normal range
+    """
+    keys = list(ranges)
+    names = [variant for key in keys for variant in _name_variants(key)]
+    rng.shuffle(names)
+    panel = {}
+
+    for i in range(size):
+        roll = rng.random()
+        if roll < unknown_rate or not names:
+            panel[f"{rng.choice(UNKNOWN_TESTS)}_{i}"] = round(rng.uniform(0, 200), 2)
+            continue
+
+        name = names.pop()
+        ref = ranges[name.lower().replace(' ', '_')]
+        roll -= unknown_rate
+        span = ref.max_normal - ref.min_normal or 1.0
+
+        if roll < malformed_rate:
+            value = rng.choice(MALFORMED_VALUES)
+        elif roll < malformed_rate + critical_rate and (ref.critical_low or ref.critical_high):
+            if ref.critical_low and (rng.random() < 0.5 or not ref.critical_high):
+                value = ref.critical_low * rng.uniform(0.5, 0.95)
+            else:
+                value = ref.critical_high + rng.uniform(0.01, 0.5) * span
+        elif roll < malformed_rate + critical_rate + abnormal_rate:
+            if rng.random() < 0.5:
+                value = ref.max_normal + rng.uniform(0.01, 0.3) * span
+            else:
+                value = max(ref.min_normal - rng.uniform(0.01, 0.3) * span, 0.01)
+        else:
+            value = rng.uniform(ref.min_normal, ref.max_normal)
+
+        panel[name] = round(value, 2) if isinstance(value, float) else value
+
+    return panel
+
+
+def panel_to_csv(panel):
+    """Render a panel in the parse_csv_results format"""
+    lines = ['test_name,value']
+    for name, value in panel.items():
+        if isinstance(value, dict):
+            value = value.get('value')
+        lines.append(f"{name},{'' if value is None else value}")
+    return '\n'.join(lines)
+
+
+def _best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _allocations(fn):
+    """Memory retained by fn's result and peak memory while producing it"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+    del result
+    return current, peak, blocks
+
+
+def run_case(name, fn, units, tests, repeat):
+    """Time and measure one workload over `units` panels"""
+    seconds = _best_time(fn, repeat)
+    retained, peak, blocks = _allocations(fn)
+    return {
+        'case': name,
+        'panels': units,
+        'tests': tests,
+        'seconds': round(seconds, 6),
+        'panels_per_sec': round(units / seconds, 1) if seconds else None,
+        'tests_per_sec': round(tests / seconds, 1) if seconds else None,
+        'retained_bytes_per_panel': round(retained / units, 1),
+        'retained_blocks_per_panel': round(blocks / units, 2),
+        'peak_bytes': peak,
+    }
+
+
+def run_benchmarks(sizes, panels_per_size, repeat, seed):
+    analyzer = LabResultAnalyzer()
+    ranges = CATALOGUE.current().ranges
+    rng = random.Random(seed)
+    results = []
+
+    for size in sizes:
+        panels = [make_panel(rng, ranges, size) for _ in range(panels_per_size)]
+        csv_texts = [panel_to_csv(panel) for panel in panels]
+        tests = sum(len(panel) for panel in panels)
+        prefix = f"size={size}"
+
+        results.append(run_case(f"{prefix} analyze_panel", lambda: [analyzer.analyze_panel(p) for p in panels],
+                                len(panels), tests, repeat))
+        results.append(run_case(f"{prefix} analyze_panel_compact",
+                                lambda: [analyzer.analyze_panel_compact(p) for p in panels],
+                                len(panels), tests, repeat))
+        results.append(run_case(f"{prefix} analyze_panel+json",
+                                lambda: [json.dumps(analyzer.analyze_panel(p)) for p in panels],
+                                len(panels), tests, repeat))
+        results.append(run_case(f"{prefix} parse_csv_results",
+                                lambda: [analyzer.parse_csv_results(text) for text in csv_texts],
+                                len(panels), tests, repeat))
+
+        if lab_columnar is not None:
+            frame = lab_columnar.panels_to_frame({str(i): p for i, p in enumerate(panels)})
+            results.append(run_case(f"{prefix} analyze_frame (bulk)",
+                                    lambda: lab_columnar.analyze_frame(frame),
+                                    len(panels), tests, repeat))
+
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return cases whose panels/sec dropped more than `tolerance` below the baseline"""
+    previous = {case['case']: case for case in baseline.get('results', [])}
+    regressions = []
+    for case in results:
+        old = previous.get(case['case'])
+        if not old or not old.get('panels_per_sec') or not case.get('panels_per_sec'):
+            continue
+        ratio = case['panels_per_sec'] / old['panels_per_sec']
+        case['vs_baseline'] = round(ratio, 3)
+        if ratio < 1 - tolerance:
+            regressions.append(case)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lab analyzer hot path")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Tests per panel")
+    parser.add_argument('--panels', type=int, default=2000, help="Panels per size")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing repetitions (best is kept)")
+    parser.add_argument('--seed', type=int, default=20251216)
+    parser.add_argument('--output', help="Where to save results (default: outputs/benchmarks/)")
+    parser.add_argument('--baseline', help="Previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed throughput drop vs baseline before failing (fraction)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Lab Analyzer Benchmark")
+    print("=" * 70)
+
+    results = run_benchmarks(args.sizes, args.panels, args.repeat, args.seed)
+    report = {
+        'benchmark': 'lab_analyzer',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'reference_catalogue_version': CATALOGUE.current().version,
+        'parameters': {'sizes': args.sizes, 'panels': args.panels, 'repeat': args.repeat, 'seed': args.seed},
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+
+    print(f"{'case':<36} {'panels/s':>12} {'tests/s':>12} {'B/panel':>10} {'blk/panel':>10} {'vs base':>8}")
+    print("-" * 92)
+    for case in results:
+        print(f"{case['case']:<36} {case['panels_per_sec']:>12,.0f} {case['tests_per_sec']:>12,.0f} "
+              f"{case['retained_bytes_per_panel']:>10,.0f} {case['retained_blocks_per_panel']:>10} "
+              f"{case.get('vs_baseline', ''):>8}")
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'outputs/benchmarks',
+        f"lab_analyzer-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print()
+    print(f"Results saved to {output}")
+
+    if regressions:
+        print()
+        print(f"❌ {len(regressions)} case(s) regressed more than {args.tolerance:.0%} vs baseline:")
+        for case in regressions:
+            print(f"  • {case['case']}: {case['vs_baseline']:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
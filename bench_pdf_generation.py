@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+PDF Generation Benchmark Suite
+Render time, pages, bytes and peak memory for MedicalReportPDFGenerator.generate_pdf
+as reports grow, starting from the comprehensive report in test_pdf_generation.py
+"""
+
+import sys
+import os
+import io
+import gc
+import re
+import copy
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services/pdf-service'))
+
+from pdf_generator import MedicalReportPDFGenerator, OUTPUT_PROFILES
+from pdf_cache import TEMPLATE_VERSION
+from test_pdf_generation import create_comprehensive_test_report
+
+# Scale factors: each multiplies the findings, notes and reviewer comments of the base report
+DEFAULT_SCALES = [1, 4, 16, 64]
+
+LAB_TESTS = [
+    ('Hemoglobin', 'g/dL', 13.0, 17.0), ('Glucose (Fasting)', 'mg/dL', 70, 100),
+    ('Creatinine', 'mg/dL', 0.7, 1.3), ('Sodium', 'mEq/L', 136, 145),
+    ('Potassium', 'mEq/L', 3.5, 5.0), ('ALT', 'U/L', 7, 56),
+    ('Platelet Count', 'x10^3/µL', 150, 400), ('TSH', 'mIU/L', 0.4, 4.0),
+]
+
+_PAGE_OBJECT = re.compile(rb'/Type /Page[^s]')
+
+
+def make_lab_finding(rng, index):
+    """One lab line in the report generator's format; about 1 in 10 abnormal, 1 in 40 critical"""
+    name, unit, low, high = rng.choice(LAB_TESTS)
+    roll = rng.random()
+    if roll < 0.025:
+        value = high * rng.uniform(1.5, 2.5)
+        return (f"⚠️ CRITICAL: {name} #{index}: {value:.1f} {unit} (HIGH - Reference: {low}-{high} {unit}) "
+                f"- immediate clinical attention required")
+    if roll < 0.1:
+        value = high * rng.uniform(1.05, 1.3)
+        return f"{name} #{index}: {value:.1f} {unit} (HIGH - Reference: {low}-{high} {unit})"
+    value = rng.uniform(low, high)
+    return f"{name} #{index}: {value:.1f} {unit} (NORMAL - Reference: {low}-{high} {unit})"
+
+
+def make_report(scale, rng):
+    """
+    The comprehensive test report grown `scale` times: more lab results,
+    longer imaging findings, more notes and a longer reviewer comment
+    """
+    report = copy.deepcopy(create_comprehensive_test_report())
+    base = report['laboratory_findings']['findings']
+    report['laboratory_findings']['findings'] = base + [
+        make_lab_finding(rng, i) for i in range(len(base) * (scale - 1))
+    ]
+    imaging = report['imaging_findings']['findings']
+    report['imaging_findings']['findings'] = [
+        f"{finding} {' '.join([finding] * (i % 3))}".strip()
+        for i, finding in enumerate(imaging * scale)
+    ]
+    report['interpretive_notes'] = report.get('interpretive_notes', []) * scale
+    report['recommendations'] = report.get('recommendations', []) * scale
+    report['reviewer_comments'] = ' '.join([report.get('reviewer_comments', '')] * scale)
+    return report
+
+
+def _best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak_memory(fn):
+    """Peak traced memory while fn runs"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_case(name, generator, report, repeat):
+    """Render one report: best-of-repeat time, then output size, pages and peak memory"""
+    def render():
+        output = io.BytesIO()
+        generator.generate_pdf(report, output)
+        return output
+
+    pdf = render().getvalue()
+    pages = len(_PAGE_OBJECT.findall(pdf))
+    seconds = _best_time(render, repeat)
+    return {
+        'case': name,
+        'lines': (len(report['laboratory_findings']['findings']) + len(report['imaging_findings']['findings'])
+                  + len(report['interpretive_notes']) + len(report['recommendations'])),
+        'ms_per_pdf': round(seconds * 1000, 2),
+        'pages': pages,
+        'ms_per_page': round(seconds * 1000 / pages, 2) if pages else None,
+        'bytes': len(pdf),
+        'peak_bytes': _peak_memory(render),
+    }
+
+
+def run_benchmarks(scales, repeat, seed, profile='standard'):
+    generator = MedicalReportPDFGenerator.for_profile(profile)
+    # Warm up fonts and the paragraph cache so the first case is not penalised
+    generator.generate_pdf(create_comprehensive_test_report(), io.BytesIO())
+
+    results = []
+    for scale in scales:
+        report = make_report(scale, random.Random(seed + scale))
+        results.append(run_case(f"scale={scale} generate_pdf", generator, report, repeat))
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance, size_tolerance):
+    """
+    Return cases that got slower by more than `tolerance`, or whose pages or
+    bytes grew by more than `size_tolerance`, relative to the baseline
+    """
+    previous = {case['case']: case for case in baseline.get('results', [])}
+    regressions = []
+    for case in results:
+        old = previous.get(case['case'])
+        if not old:
+            continue
+        reasons = []
+        if old.get('ms_per_pdf'):
+            ratio = case['ms_per_pdf'] / old['ms_per_pdf']
+            case['vs_baseline'] = round(ratio, 3)
+            if ratio > 1 + tolerance:
+                reasons.append(f"time {ratio:.2f}x")
+        for field in ('pages', 'bytes'):
+            if old.get(field) and case[field] > old[field] * (1 + size_tolerance):
+                reasons.append(f"{field} {old[field]} → {case[field]}")
+        if reasons:
+            case['regressions'] = reasons
+            regressions.append(case)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering as reports grow")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="Report size multipliers over the comprehensive test report")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing repetitions (best is kept)")
+    parser.add_argument('--seed', type=int, default=20251217)
+    parser.add_argument('--profile', choices=sorted(OUTPUT_PROFILES), default='standard',
+                        help="PDF output profile to render with")
+    parser.add_argument('--output', help="Where to save results (default: outputs/benchmarks/)")
+    parser.add_argument('--baseline', help="Previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed render time increase vs baseline before failing (fraction)")
+    parser.add_argument('--size-tolerance', type=float, default=0.10,
+                        help="Allowed page/byte growth vs baseline before failing (fraction)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("PDF Generation Benchmark")
+    print("=" * 70)
+
+    results = run_benchmarks(args.scales, args.repeat, args.seed, args.profile)
+    report = {
+        'benchmark': 'pdf_generation',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'template_version': TEMPLATE_VERSION,
+        'parameters': {'scales': args.scales, 'repeat': args.repeat, 'seed': args.seed,
+                       'profile': args.profile},
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance, args.size_tolerance)
+
+    print(f"{'case':<26} {'lines':>6} {'ms/PDF':>10} {'pages':>6} {'ms/page':>8} {'bytes':>10} "
+          f"{'peak KB':>9} {'vs base':>8}")
+    print("-" * 90)
+    for case in results:
+        print(f"{case['case']:<26} {case['lines']:>6} {case['ms_per_pdf']:>10,.1f} {case['pages']:>6} "
+              f"{case['ms_per_page'] or 0:>8,.1f} {case['bytes']:>10,} {case['peak_bytes'] / 1024:>9,.0f} "
+              f"{case.get('vs_baseline', ''):>8}")
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'outputs/benchmarks',
+        f"pdf_generation-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print()
+    print(f"Results saved to {output}")
+
+    if regressions:
+        print()
+        print(f"❌ {len(regressions)} case(s) regressed vs baseline:")
+        for case in regressions:
+            print(f"  • {case['case']}: {', '.join(case['regressions'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
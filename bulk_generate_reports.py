@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Bulk Report Generation
+Regenerate draft reports for many patients in parallel from files or NDJSON
+"""
+
+import sys
+import os
+import io
+import re
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, Iterable, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for service in ('services/report-agent', 'services/lab-agent', 'services/pdf-service'):
+    sys.path.insert(0, os.path.join(BASE_DIR, service))
+
+from report_generator import MedicalReportGenerator
+from report_stream import assemble_report, write_ndjson, write_text
+from lab_analyzer import LabResultAnalyzer
+
+# Per-process workers, created once by _init_worker
+_generator: Optional[MedicalReportGenerator] = None
+_analyzer: Optional[LabResultAnalyzer] = None
+_pdf_generator = None
+_image_processor = None
+_options: Dict[str, Any] = {}
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _read_text(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def _case_from_files(case_id: str, patient_path: str, labs_json: str, labs_csv: str,
+                     imaging_path: str) -> Dict[str, Any]:
+    """
+    Build one case from whichever input files exist
+    An unreadable or malformed file makes the case an error record
+    """
+    try:
+        case = {'case_id': case_id, 'patient': _read_json(patient_path)}
+        if os.path.exists(labs_json):
+            case['labs'] = _read_json(labs_json)
+        elif os.path.exists(labs_csv):
+            case['lab_csv'] = _read_text(labs_csv)
+        if os.path.exists(imaging_path):
+            case['imaging'] = _read_json(imaging_path)
+    except (OSError, ValueError) as e:
+        return {'case_id': case_id, 'error': f"Unreadable input: {type(e).__name__}: {e}"}
+    if not isinstance(case['patient'], dict):
+        return {'case_id': case_id, 'error': "Patient file is not a JSON object"}
+    return case
+
+
+def iter_directory_cases(directory: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield cases from a directory, in sorted order
+
+    Two layouts are supported:
+    - one subdirectory per patient holding patient.json, labs.json or labs.csv,
+      and optionally imaging.json (a stored image analysis result)
+    - flat files named like demo-data: sample_patient_1.json pairs with
+      sample_labs_1.json / sample_labs_1.csv and sample_imaging_1.json
+    """
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            patient_path = os.path.join(path, 'patient.json')
+            if os.path.exists(patient_path):
+                yield _case_from_files(
+                    name, patient_path,
+                    os.path.join(path, 'labs.json'),
+                    os.path.join(path, 'labs.csv'),
+                    os.path.join(path, 'imaging.json')
+                )
+        elif 'patient' in name and name.endswith('.json'):
+            stem = name[:-len('.json')]
+            sibling = lambda kind, ext: os.path.join(directory, stem.replace('patient', kind, 1) + ext)
+            yield _case_from_files(
+                stem, path,
+                sibling('labs', '.json'),
+                sibling('labs', '.csv'),
+                sibling('imaging', '.json')
+            )
+
+
+def iter_ndjson_cases(stream: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield cases from NDJSON lines
+    Each line: {"case_id": optional, "patient": {...}, "labs": {...} or "lab_csv": "...",
+                "imaging": optional image analysis result}
+    """
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            case = json.loads(line)
+        except ValueError as e:
+            yield {'case_id': f"line-{line_no}", 'error': f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(case, dict):
+            yield {'case_id': f"line-{line_no}", 'error': "Not a JSON object"}
+            continue
+        case.setdefault('case_id', f"line-{line_no}")
+        yield case
+
+
+def _safe_name(case_id: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]', '_', case_id).lstrip('.') or 'case'
+
+
+def _named_cases(cases: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Give each case a file name stem safe to join onto an output directory;
+    repeated case IDs get a numeric suffix
+    """
+    used = set()
+    for case in cases:
+        name = _safe_name(str(case.get('case_id')))
+        candidate, n = name, 1
+        while candidate in used:
+            n += 1
+            candidate = f"{name}-{n}"
+        used.add(candidate)
+        case['file_name'] = candidate
+        yield case
+
+
+def _init_worker(options: Dict[str, Any]):
+    """Create the heavy objects once per process"""
+    global _generator, _analyzer, _pdf_generator, _options
+    _options = options
+    _generator = MedicalReportGenerator()
+    _analyzer = LabResultAnalyzer()
+    if options.get('pdf_dir'):
+        from pdf_generator import MedicalReportPDFGenerator
+        _pdf_generator = MedicalReportPDFGenerator()
+
+
+def _imaging_for(case: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Stored imaging result, or a fresh analysis when --analyze-images is set"""
+    global _image_processor
+    if 'imaging' in case:
+        return case['imaging']
+    patient = case['patient']
+    image_path = patient.get('image_path')
+    if not (_options.get('analyze_images') and image_path and os.path.exists(image_path)):
+        return None
+    if _image_processor is None:
+        sys.path.insert(0, os.path.join(BASE_DIR, 'services/image-agent'))
+        from image_processor import process_diagnostic_image
+        _image_processor = process_diagnostic_image
+    return _image_processor(image_path, patient.get('image_type', 'xray'), patient)
+
+
+def generate_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate one draft report (runs inside a worker process)"""
+    case_id = str(case.get('case_id'))
+    file_name = case.get('file_name') or _safe_name(case_id)
+    if case.get('error'):
+        return {'case_id': case_id, 'file_name': file_name, 'status': 'error', 'message': case['error']}
+
+    try:
+        patient = case['patient']
+        lab_result = None
+        if case.get('labs') is not None:
+            lab_result = _analyzer.analyze_panel(case['labs'])
+        elif case.get('lab_csv'):
+            lab_result = _analyzer.analyze_panel(_analyzer.parse_csv_results(case['lab_csv']))
+
+        record = {'case_id': case_id, 'file_name': file_name, 'status': 'success'}
+        fmt = _options.get('format', 'ndjson')
+        if fmt in ('events', 'text'):
+            # Streamed straight into the sink; the report dict is only built for a PDF
+            events = _generator.iter_report(patient, _imaging_for(case), lab_result)
+            if _pdf_generator is not None:
+                events = list(events)
+            _write_events(record, events, fmt)
+            report = assemble_report(events) if _pdf_generator is not None else None
+        else:
+            report = _generator.generate_complete_report(
+                patient_data=patient,
+                imaging_data=_imaging_for(case),
+                lab_data=lab_result
+            )
+            record['report'] = report
+
+        if _pdf_generator is not None:
+            pdf_path = os.path.join(_options['pdf_dir'], f"{file_name}.pdf")
+            record['pdf_path'] = _pdf_generator.render_to_file(report, pdf_path)
+        return record
+
+    except Exception as e:
+        return {'case_id': case_id, 'file_name': file_name, 'status': 'error',
+                'message': f"{type(e).__name__}: {e}"}
+
+
+def _write_events(record: Dict[str, Any], events: Iterable[Dict[str, Any]], fmt: str):
+    """
+    Consume a case's event stream in the worker: text goes to its .txt file,
+    events come back as NDJSON lines for the parent to append in order
+    """
+    if fmt == 'text':
+        text_path = os.path.join(_options['output_dir'], f"{record['file_name']}.txt")
+        try:
+            with open(text_path, 'w') as f:
+                write_text(events, f)
+        except BaseException:
+            if os.path.exists(text_path):
+                os.unlink(text_path)
+            raise
+        record['text_path'] = text_path
+    else:
+        buffer = io.StringIO()
+        write_ndjson(events, buffer, extra={'case_id': record['case_id']})
+        record['events'] = buffer.getvalue()
+
+
+def _ordered_map(executor, fn, items: Iterable, window: int) -> Iterator:
+    """Like executor.map, but keeps at most `window` cases in flight"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_bulk(cases: Iterable[Dict[str, Any]], workers: int, options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Generate reports for all cases, yielding records in input order"""
+    cases = _named_cases(cases)
+    if workers <= 1:
+        _init_worker(options)
+        for case in cases:
+            yield generate_case(case)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(options,)) as executor:
+        yield from _ordered_map(executor, generate_case, cases, window=workers * 8)
+
+
+class _Progress:
+    """Periodic progress and throughput line on stderr"""
+
+    def __init__(self, every: float = 1.0, quiet: bool = False):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.every = every
+        self.quiet = quiet
+        self.done = 0
+        self.failed = 0
+
+    def update(self, record: Dict[str, Any]):
+        self.done += 1
+        if record.get('status') != 'success':
+            self.failed += 1
+        now = time.perf_counter()
+        if not self.quiet and now - self.last >= self.every:
+            self.last = now
+            self._print(now)
+
+    def _print(self, now: float):
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        print(f"  {self.done} reports, {self.failed} failed, {rate:,.1f} reports/s", file=sys.stderr)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            'reports': self.done,
+            'failed': self.failed,
+            'seconds': round(elapsed, 3),
+            'reports_per_sec': round(self.done / elapsed, 1) if elapsed else None,
+        }
+
+
+def _write_record(record: Dict[str, Any], fmt: str, out, output_dir: Optional[str]):
+    if fmt == 'ndjson':
+        out.write(json.dumps({key: value for key, value in record.items() if key != 'file_name'}) + '\n')
+        return
+    if record.get('status') != 'success':
+        if fmt == 'events':
+            out.write(json.dumps({'case_id': record['case_id'], 'event': 'error',
+                                  'message': record.get('message')}) + '\n')
+        return
+    if fmt == 'events':
+        # Section/line events, each tagged with its case, serialised by the worker
+        out.write(record['events'])
+    elif fmt == 'text':
+        # Written by the worker
+        return
+    else:
+        with open(os.path.join(output_dir, f"{record['file_name']}.json"), 'w') as f:
+            json.dump(record['report'], f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate draft medical reports in bulk")
+    parser.add_argument('input', help="Patient directory, NDJSON file, or - for NDJSON on stdin")
+    parser.add_argument('--format', choices=['ndjson', 'events', 'files', 'text'], default='ndjson',
+                        help="One NDJSON record per report, NDJSON section/line events, "
+                             "or one JSON / plain-text file per report")
+    parser.add_argument('--output', default='-',
+                        help="NDJSON file (- for stdout) or output directory for --format files/text")
+    parser.add_argument('--pdf-dir', help="Also render a PDF per report into this directory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 runs in-process)")
+    parser.add_argument('--analyze-images', action='store_true',
+                        help="Run image analysis for cases without imaging.json (needs OpenCV)")
+    parser.add_argument('--quiet', action='store_true', help="No progress output")
+    args = parser.parse_args()
+
+    per_file = args.format in ('files', 'text')
+    if per_file and args.output == '-':
+        parser.error(f"--format {args.format} needs --output <directory>")
+
+    input_file = None
+    if args.input == '-':
+        cases = iter_ndjson_cases(sys.stdin)
+    elif os.path.isdir(args.input):
+        cases = iter_directory_cases(args.input)
+    else:
+        input_file = open(args.input)
+        cases = iter_ndjson_cases(input_file)
+
+    options = {'analyze_images': args.analyze_images, 'format': args.format}
+    if args.pdf_dir:
+        os.makedirs(args.pdf_dir, exist_ok=True)
+        options['pdf_dir'] = os.path.abspath(args.pdf_dir)
+
+    output_dir = None
+    if per_file:
+        output_dir = args.output
+        os.makedirs(output_dir, exist_ok=True)
+        options['output_dir'] = os.path.abspath(output_dir)
+        out = None
+    elif args.output == '-':
+        out = sys.stdout
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        out = open(args.output, 'w')
+
+    progress = _Progress(quiet=args.quiet)
+    try:
+        for record in run_bulk(cases, args.workers, options):
+            _write_record(record, args.format, out, output_dir)
+            progress.update(record)
+            if record.get('status') != 'success' and not args.quiet:
+                print(f"  ❌ {record['case_id']}: {record.get('message')}", file=sys.stderr)
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if input_file is not None:
+            input_file.close()
+
+    summary = progress.summary()
+    summary['workers'] = args.workers
+    if not args.quiet:
+        print(f"✅ {summary['reports'] - summary['failed']}/{summary['reports']} reports in "
+              f"{summary['seconds']}s ({summary['reports_per_sec']} reports/s, "
+              f"{args.workers} workers)", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -77,10 +77,19 @@ APPROVAL_RESPONSE=$(curl -s -X POST http://localhost:3000/medical/approve-report
     \"reviewer_comments\": \"Report reviewed and approved. All findings are accurate.\"
   }")
 
-PDF_PATH=$(echo $APPROVAL_RESPONSE | grep -o '"pdf_path":"[^"]*"' | cut -d'"' -f4)
+echo "✅ Report approved! Waiting for the PDF to render..."
 
-echo "✅ Report approved and PDF generated!"
-echo "   PDF Path: $PDF_PATH"
+# The PDF is rendered in the background; poll the job until it finishes
+for i in $(seq 1 30); do
+  PDF_STATUS=$(curl -s http://localhost:3000/medical/report/$SESSION_ID/pdf-status)
+  if echo $PDF_STATUS | grep -q '"pdf_available":true' || echo $PDF_STATUS | grep -q '"status":"failed"'; then
+    break
+  fi
+  sleep 1
+done
+
+echo "✅ PDF generated!"
+echo "   Download: http://localhost:3000/medical/report/$SESSION_ID/download"
 echo ""
 
 echo "=============================================="
@@ -15,14 +15,26 @@ function FinalReport({ reportData, onReset }) {
     setDownloadError(null)
 
     try {
-      // Call the download endpoint
-      const response = await api.get(
-        `/medical/report/${reportData.session_id}/download`,
-        {
-          responseType: 'blob', // Important for binary data
-          timeout: 30000, // 30 second timeout
-        }
-      )
+      // Call the download endpoint; 202 means the PDF is still being rendered
+      let response
+      for (let attempt = 0; attempt < 30; attempt++) {
+        response = await api.get(
+          `/medical/report/${reportData.session_id}/download`,
+          {
+            responseType: 'blob', // Important for binary data
+            timeout: 30000, // 30 second timeout
+          }
+        )
+        if (response.status !== 202) break
+
+        const retryAfter = Number(response.headers['retry-after']) || 2
+        await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000))
+      }
+
+      if (response.status === 202) {
+        setDownloadError('PDF is still being generated. Please try again in a moment.')
+        return
+      }
 
       // Create a blob from the PDF data
       const blob = new Blob([response.data], { type: 'application/pdf' })
@@ -0,0 +1,177 @@
+"""
+FastAPI service for laboratory result analysis
+"""
+
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Dict, Any, Iterator, Optional
+import io
+import json
+import time
+
+from lab_analyzer import LabResultAnalyzer
+
+app = FastAPI(title="Laboratory Analysis Service")
+
+# Enable CORS for frontend
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# One analyzer for the lifetime of the process
+analyzer = LabResultAnalyzer()
+
+# Lightweight in-process counters exposed on /metrics
+metrics = {
+    "started_at": time.time(),
+    "requests": 0,
+    "batch_requests": 0,
+    "panels_analyzed": 0,
+    "tests_analyzed": 0,
+    "panel_errors": 0,
+    "analysis_seconds": 0.0,
+}
+
+class LabPanelRequest(BaseModel):
+    lab_data: Dict[str, Any]
+    panel_id: Optional[str] = None
+
+def _analyze(panel_id: Optional[str], lab_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyze one panel and update counters"""
+    started = time.perf_counter()
+    result = analyzer.analyze_panel(lab_data)
+    metrics["analysis_seconds"] += time.perf_counter() - started
+    metrics["panels_analyzed"] += 1
+    metrics["tests_analyzed"] += len(lab_data)
+    if panel_id is not None:
+        result["panel_id"] = panel_id
+    return result
+
+def _iter_lines(body: bytes) -> Iterator[str]:
+    """Yield body lines one at a time without splitting the whole payload up front"""
+    stream = io.BytesIO(body)
+    for line in stream:
+        yield line.decode("utf-8").rstrip("\r\n")
+
+def _check_csv_header(header: str):
+    """Batch CSV must start with panel_id,test_name,value"""
+    columns = [c.strip().lower() for c in header.split(",")]
+    if columns[:3] != ["panel_id", "test_name", "value"]:
+        raise HTTPException(status_code=400, detail="CSV header must be: panel_id,test_name,value")
+
+def _csv_panels(rows: Iterator[str]) -> Iterator[tuple]:
+    """
+    Group CSV rows into panels one panel at a time
+    Expected format: panel_id,test_name,value (rows of a panel are contiguous)
+    """
+    current_id, current = None, {}
+    for row in rows:
+        parts = row.split(",")
+        if len(parts) < 3:
+            continue
+        panel_id = parts[0].strip()
+        if panel_id != current_id and current_id is not None:
+            yield current_id, current
+            current = {}
+        current_id = panel_id
+        current[parts[1].strip().lower().replace(" ", "_")] = parts[2].strip()
+    if current_id is not None:
+        yield current_id, current
+
+@app.get("/")
+async def root():
+    return {
+        "service": "Laboratory Analysis Service",
+        "version": "1.0.0",
+        "status": "operational"
+    }
+
+@app.get("/health")
+async def health_check():
+    catalogue = analyzer.catalogue.current()
+    return {
+        "status": "healthy",
+        "reference_catalogue_version": catalogue.version,
+        "reference_ranges": len(catalogue.ranges),
+        "catalogue_error": analyzer.catalogue.last_error,
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    uptime = time.time() - metrics["started_at"]
+    panels = metrics["panels_analyzed"]
+    return {
+        **metrics,
+        "uptime_seconds": round(uptime, 3),
+        "panels_per_second": round(panels / uptime, 2) if uptime else 0.0,
+        "mean_panel_ms": round(metrics["analysis_seconds"] * 1000 / panels, 4) if panels else 0.0,
+    }
+
+@app.post("/analyze")
+async def analyze_panel(panel: LabPanelRequest):
+    """
+    Analyze a single lab panel
+
+    Body: {"lab_data": {"hemoglobin": 11.5, ...}, "panel_id": optional}
+    """
+    metrics["requests"] += 1
+    return _analyze(panel.panel_id, panel.lab_data)
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """
+    Analyze many panels and stream results back as NDJSON
+
+    Accepts either:
+    - application/x-ndjson: one {"panel_id": ..., "lab_data": {...}} object per line
+    - text/csv: panel_id,test_name,value rows, grouped by panel_id
+
+    Each output line is the analysis of one panel, in input order. Panels
+    that fail to parse produce an error line instead of aborting the batch.
+    """
+    metrics["requests"] += 1
+    metrics["batch_requests"] += 1
+    content_type = request.headers.get("content-type", "application/x-ndjson")
+    # The body is read before streaming starts: StreamingResponse listens for
+    # client disconnects on the same receive channel the body arrives on
+    lines = _iter_lines(await request.body())
+
+    async def ndjson_results():
+        line_no = 0
+        for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                panel = json.loads(line)
+                result = _analyze(panel.get("panel_id"), panel["lab_data"])
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                metrics["panel_errors"] += 1
+                result = {"status": "error", "line": line_no, "message": f"Invalid panel: {e}"}
+            yield json.dumps(result) + "\n"
+
+    async def csv_results():
+        for panel_id, lab_data in _csv_panels(lines):
+            yield json.dumps(_analyze(panel_id, lab_data)) + "\n"
+
+    if "csv" in content_type:
+        # Validate the header before the streaming response starts
+        try:
+            _check_csv_header(next(lines))
+        except StopIteration:
+            raise HTTPException(status_code=400, detail="Empty CSV body")
+        body = csv_results()
+    else:
+        body = ndjson_results()
+
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8002)
@@ -3,10 +3,17 @@ Laboratory Result Analysis Service
 Rule-based analyzer for common lab tests
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, Union
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from enum import Enum
+from array import array
+import hashlib
 import json
+import os
+import sys
+import threading
+import time
 
 class TestStatus(Enum):
     NORMAL = "normal"
@@ -24,45 +31,341 @@ class ReferenceRange:
     critical_low: Optional[float] = None
     critical_high: Optional[float] = None
     unit: str = ""
+    delta_limit: Optional[float] = None  # Largest plausible change between two draws
+
+    def __post_init__(self):
+        # Formatted once and shared by every result for this test
+        self.range_label = sys.intern(f'{self.min_normal}-{self.max_normal}')
     
-# Standard reference ranges for common lab tests
-REFERENCE_RANGES = {
-    # Hematology
-    'hemoglobin': ReferenceRange('Hemoglobin', 12.0, 16.0, 7.0, 20.0, 'g/dL'),
-    'wbc': ReferenceRange('White Blood Cell Count', 4.0, 11.0, 2.0, 30.0, '×10³/μL'),
-    'platelets': ReferenceRange('Platelet Count', 150, 400, 50, 1000, '×10³/μL'),
-    'hematocrit': ReferenceRange('Hematocrit', 36, 48, 20, 60, '%'),
-    'rbc': ReferenceRange('Red Blood Cell Count', 4.0, 5.5, 2.0, 7.0, '×10⁶/μL'),
-    
-    # Chemistry
-    'glucose': ReferenceRange('Glucose', 70, 100, 40, 400, 'mg/dL'),
-    'creatinine': ReferenceRange('Creatinine', 0.6, 1.2, 0.2, 10.0, 'mg/dL'),
-    'bun': ReferenceRange('Blood Urea Nitrogen', 7, 20, 2, 100, 'mg/dL'),
-    'sodium': ReferenceRange('Sodium', 136, 145, 120, 160, 'mEq/L'),
-    'potassium': ReferenceRange('Potassium', 3.5, 5.0, 2.5, 7.0, 'mEq/L'),
-    'calcium': ReferenceRange('Calcium', 8.5, 10.5, 6.0, 14.0, 'mg/dL'),
-    'alt': ReferenceRange('ALT (Liver)', 7, 56, 0, 1000, 'U/L'),
-    'ast': ReferenceRange('AST (Liver)', 10, 40, 0, 1000, 'U/L'),
-    'bilirubin_total': ReferenceRange('Total Bilirubin', 0.1, 1.2, 0, 20, 'mg/dL'),
-    
-    # Lipid Panel
-    'cholesterol_total': ReferenceRange('Total Cholesterol', 125, 200, 0, 500, 'mg/dL'),
-    'hdl': ReferenceRange('HDL Cholesterol', 40, 60, 10, 150, 'mg/dL'),
-    'ldl': ReferenceRange('LDL Cholesterol', 0, 100, 0, 300, 'mg/dL'),
-    'triglycerides': ReferenceRange('Triglycerides', 0, 150, 0, 1000, 'mg/dL'),
+# Reference ranges are loaded from a versioned catalogue file so they can be
+# changed without redeploying the steps that load this module
+DEFAULT_CATALOGUE_PATH = os.environ.get(
+    'LAB_REFERENCE_RANGES_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_ranges.json')
+)
+
+class CatalogueError(ValueError):
+    """Raised when a reference range catalogue fails validation"""
+
+@dataclass(frozen=True)
+class ReferenceCatalogue:
+    """An immutable, validated set of reference ranges"""
+    version: str
+    ranges: Dict[str, ReferenceRange]
+    source: str
+    checksum: str
+
+def _optional_number(entry: Dict[str, Any], field: str, key: str) -> Optional[float]:
+    value = entry.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise CatalogueError(f"{key}.{field} must be a number")
+    return value
+
+def compile_catalogue(document: Dict[str, Any], source: str = '<memory>',
+                      checksum: str = '') -> ReferenceCatalogue:
+    """
+    Validate a parsed catalogue document and build its ReferenceRange objects
+    """
+    version = document.get('version')
+    if not isinstance(version, str) or not version.strip():
+        raise CatalogueError("Catalogue must have a non-empty string 'version'")
+    entries = document.get('ranges')
+    if not isinstance(entries, dict) or not entries:
+        raise CatalogueError("Catalogue must have a non-empty 'ranges' object")
+
+    ranges = {}
+    for key, entry in entries.items():
+        if not isinstance(entry, dict):
+            raise CatalogueError(f"{key} must be an object")
+        normalized = key.lower().replace(' ', '_')
+        if normalized in ranges:
+            raise CatalogueError(f"Duplicate test name: {key}")
+        name = entry.get('name')
+        if not isinstance(name, str) or not name:
+            raise CatalogueError(f"{key}.name must be a non-empty string")
+
+        min_normal = _optional_number(entry, 'min_normal', key)
+        max_normal = _optional_number(entry, 'max_normal', key)
+        if min_normal is None or max_normal is None:
+            raise CatalogueError(f"{key} requires min_normal and max_normal")
+        if min_normal > max_normal:
+            raise CatalogueError(f"{key}: min_normal is above max_normal")
+        critical_low = _optional_number(entry, 'critical_low', key)
+        critical_high = _optional_number(entry, 'critical_high', key)
+        if critical_low is not None and critical_low > min_normal:
+            raise CatalogueError(f"{key}: critical_low is above min_normal")
+        if critical_high is not None and critical_high < max_normal:
+            raise CatalogueError(f"{key}: critical_high is below max_normal")
+        delta_limit = _optional_number(entry, 'delta_limit', key)
+        if delta_limit is not None and delta_limit <= 0:
+            raise CatalogueError(f"{key}: delta_limit must be positive")
+
+        ranges[normalized] = ReferenceRange(
+            sys.intern(name), min_normal, max_normal, critical_low, critical_high,
+            sys.intern(str(entry.get('unit', ''))), delta_limit
+        )
+
+    return ReferenceCatalogue(version.strip(), ranges, source, checksum)
+
+def load_catalogue(path: str) -> ReferenceCatalogue:
+    """Read, validate and compile a catalogue file"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        document = json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        raise CatalogueError(f"Invalid catalogue JSON in {path}: {e}")
+    if not isinstance(document, dict):
+        raise CatalogueError("Catalogue must be a JSON object")
+    return compile_catalogue(document, path, hashlib.sha256(raw).hexdigest())
+
+class ReferenceRangeCatalogue:
+    """
+    Hot-reloadable holder for the active ReferenceCatalogue
+
+    current() is lock-free: it returns the compiled catalogue and, at most
+    once per check_interval, stats the file. A changed file is compiled by
+    whichever caller notices first and swapped in with a single assignment;
+    analyses already holding the previous catalogue finish with it. A file
+    that fails validation is ignored and the previous catalogue stays active.
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOGUE_PATH, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._file_signature = self._signature()
+        self._catalogue = load_catalogue(path)
+        self._next_check = time.monotonic() + check_interval
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def current(self) -> ReferenceCatalogue:
+        """Return the active catalogue, picking up file changes periodically"""
+        if time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._catalogue
+
+    @property
+    def version(self) -> str:
+        return self.current().version
+
+    def reload(self, force: bool = True) -> ReferenceCatalogue:
+        """Reload now; with force=False only if the file changed"""
+        with self._reload_lock:
+            self._reload_locked(force)
+        return self._catalogue
+
+    def _maybe_reload(self):
+        # Another caller is already reloading: keep serving the current catalogue
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._reload_locked(force=False)
+        finally:
+            self._reload_lock.release()
+
+    def _reload_locked(self, force: bool):
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            signature = self._signature()
+            if not force and signature == self._file_signature:
+                return
+            catalogue = load_catalogue(self.path)
+        except (OSError, CatalogueError) as e:
+            self.last_error = str(e)
+            return
+        self._file_signature = signature
+        self.last_error = None
+        self._catalogue = catalogue
+
+# Shared catalogue for this process
+CATALOGUE = ReferenceRangeCatalogue()
+
+# Ranges as loaded at import time; use CATALOGUE.current() to follow reloads
+REFERENCE_RANGES = CATALOGUE.current().ranges
+
+# Display flag and interpretation for each status
+STATUS_FLAGS = {
+    TestStatus.CRITICAL_LOW: '⚠️ CRITICAL LOW',
+    TestStatus.CRITICAL_HIGH: '⚠️ CRITICAL HIGH',
+    TestStatus.LOW: '↓ LOW',
+    TestStatus.HIGH: '↑ HIGH',
+    TestStatus.NORMAL: '✓',
+}
+
+STATUS_INTERPRETATIONS = {
+    TestStatus.CRITICAL_LOW: 'Value critically below normal range. Immediate clinical attention recommended.',
+    TestStatus.CRITICAL_HIGH: 'Value critically above normal range. Immediate clinical attention recommended.',
+    TestStatus.LOW: 'Value below normal range. Clinical correlation advised.',
+    TestStatus.HIGH: 'Value above normal range. Clinical correlation advised.',
+    TestStatus.NORMAL: 'Value within normal range.',
 }
 
+# Statuses outside TestStatus, for values that cannot be graded
+STATUS_ERROR = 'error'
+STATUS_UNKNOWN = 'unknown'
+
+_FLAG_BY_STATUS = {status.value: flag for status, flag in STATUS_FLAGS.items()}
+_INTERPRETATION_BY_STATUS = {status.value: text for status, text in STATUS_INTERPRETATIONS.items()}
+_ABNORMAL_STATUSES = frozenset((TestStatus.LOW.value, TestStatus.HIGH.value))
+_CRITICAL_STATUSES = frozenset((TestStatus.CRITICAL_LOW.value, TestStatus.CRITICAL_HIGH.value))
+
+LAB_DISCLAIMER = 'Laboratory results for clinical correlation only. Not a medical diagnosis.'
+
+
+class LabTestResult:
+    """
+    Compact result for one test
+    Holds only the graded value and a reference to the shared ReferenceRange;
+    flag, interpretation and range text are looked up when serialized
+    """
+    __slots__ = ('test_name', 'value', 'status', 'ref')
+
+    def __init__(self, test_name: str, value, status: str, ref: Optional[ReferenceRange]):
+        self.test_name = test_name
+        self.value = value
+        self.status = status
+        self.ref = ref
+
+    @property
+    def flag(self) -> Optional[str]:
+        return _FLAG_BY_STATUS.get(self.status)
+
+    @property
+    def interpretation(self) -> Optional[str]:
+        return _INTERPRETATION_BY_STATUS.get(self.status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the result in the analyze_value dict shape"""
+        status = self.status
+        if status == STATUS_ERROR:
+            return {
+                'test_name': self.test_name,
+                'value': str(self.value),
+                'status': status,
+                'message': f'Invalid numeric value: {self.value}'
+            }
+        if status == STATUS_UNKNOWN:
+            return {
+                'test_name': self.test_name,
+                'value': self.value,
+                'status': status,
+                'message': 'Reference range not available for this test'
+            }
+        ref = self.ref
+        return {
+            'test_name': self.test_name,
+            'value': self.value,
+            'unit': ref.unit,
+            'reference_range': ref.range_label,
+            'status': status,
+            'flag': _FLAG_BY_STATUS[status],
+            'interpretation': _INTERPRETATION_BY_STATUS[status]
+        }
+
+
+class LabPanelAnalysis:
+    """
+    Compact analysis of a panel
+    Abnormal and critical findings are kept as index arrays into results
+    """
+    __slots__ = ('results', 'abnormal_index', 'critical_index', 'catalogue_version')
+
+    def __init__(self, results: List[LabTestResult], catalogue_version: Optional[str] = None):
+        self.results = results
+        self.catalogue_version = catalogue_version
+        self.abnormal_index = array('I')
+        self.critical_index = array('I')
+        for i, result in enumerate(results):
+            if result.status in _ABNORMAL_STATUSES:
+                self.abnormal_index.append(i)
+            elif result.status in _CRITICAL_STATUSES:
+                self.critical_index.append(i)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    @property
+    def abnormal_findings(self) -> List[LabTestResult]:
+        return [self.results[i] for i in self.abnormal_index]
+
+    @property
+    def critical_findings(self) -> List[LabTestResult]:
+        return [self.results[i] for i in self.critical_index]
+
+    @property
+    def summary(self) -> Dict[str, int]:
+        total_tests = len(self.results)
+        abnormal_count = len(self.abnormal_index)
+        return {
+            'total_tests': total_tests,
+            'normal_count': total_tests - abnormal_count,
+            'abnormal_count': abnormal_count,
+            'critical_count': len(self.critical_index)
+        }
+
+    @property
+    def summary_text(self) -> str:
+        abnormal_count = len(self.abnormal_index)
+        critical_count = len(self.critical_index)
+        summary_text = []
+        if critical_count > 0:
+            summary_text.append(f'{critical_count} critical value(s) requiring immediate attention.')
+        if abnormal_count > 0:
+            summary_text.append(f'{abnormal_count} abnormal value(s) noted.')
+        if abnormal_count == 0 and critical_count == 0:
+            summary_text.append('All values within normal reference ranges.')
+        return ' '.join(summary_text)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the analyze_panel dict shape; findings share the result dicts"""
+        analyzed_results = [result.to_dict() for result in self.results]
+        return {
+            'status': 'success',
+            'summary': self.summary,
+            'summary_text': self.summary_text,
+            'results': analyzed_results,
+            'abnormal_findings': [analyzed_results[i] for i in self.abnormal_index],
+            'critical_findings': [analyzed_results[i] for i in self.critical_index],
+            'reference_catalogue_version': self.catalogue_version,
+            'disclaimer': LAB_DISCLAIMER
+        }
+
+
 class LabResultAnalyzer:
     """Analyze laboratory results against reference ranges"""
     
-    def __init__(self):
-        self.reference_ranges = REFERENCE_RANGES
+    def __init__(self, catalogue: Optional[ReferenceRangeCatalogue] = None):
+        self.catalogue = catalogue or CATALOGUE
     
-    def analyze_value(self, test_name: str, value) -> Dict[str, Any]:
+    @property
+    def reference_ranges(self) -> Dict[str, ReferenceRange]:
+        return self.catalogue.current().ranges
+    
+    @property
+    def catalogue_version(self) -> str:
+        return self.catalogue.current().version
+    
+    def is_stale(self, analysis: Dict[str, Any]) -> bool:
+        """True if a stored analyze_panel result predates the active catalogue"""
+        return analysis.get('reference_catalogue_version') != self.catalogue_version
+    
+    def evaluate(self, test_name: str, value, reference_ranges=None) -> 'LabTestResult':
         """
-        Analyze a single lab test value
-        Returns status and interpretation
+        Analyze a single lab test value into a compact LabTestResult
         """
+        if reference_ranges is None:
+            reference_ranges = self.reference_ranges
+        
         # Extract numeric value if it's a dict
         if isinstance(value, dict):
             value = value.get('value', value)
@@ -71,130 +374,211 @@ class LabResultAnalyzer:
         try:
             value = float(value)
         except (ValueError, TypeError):
-            return {
-                'test_name': test_name,
-                'value': str(value),
-                'status': 'error',
-                'message': f'Invalid numeric value: {value}'
-            }
+            return LabTestResult(test_name, value, STATUS_ERROR, None)
         
         test_name_lower = test_name.lower().replace(' ', '_')
+        ref = reference_ranges.get(test_name_lower)
         
-        if test_name_lower not in self.reference_ranges:
-            return {
-                'test_name': test_name,
-                'value': value,
-                'status': 'unknown',
-                'message': 'Reference range not available for this test'
-            }
-        
-        ref = self.reference_ranges[test_name_lower]
+        if ref is None:
+            return LabTestResult(test_name, value, STATUS_UNKNOWN, None)
         
         # Determine status
-        status = TestStatus.NORMAL
-        flag = ''
-        interpretation = ''
-        
         if ref.critical_low and value < ref.critical_low:
             status = TestStatus.CRITICAL_LOW
-            flag = '⚠️ CRITICAL LOW'
-            interpretation = f'Value critically below normal range. Immediate clinical attention recommended.'
         elif ref.critical_high and value > ref.critical_high:
             status = TestStatus.CRITICAL_HIGH
-            flag = '⚠️ CRITICAL HIGH'
-            interpretation = f'Value critically above normal range. Immediate clinical attention recommended.'
         elif value < ref.min_normal:
             status = TestStatus.LOW
-            flag = '↓ LOW'
-            interpretation = f'Value below normal range. Clinical correlation advised.'
         elif value > ref.max_normal:
             status = TestStatus.HIGH
-            flag = '↑ HIGH'
-            interpretation = f'Value above normal range. Clinical correlation advised.'
         else:
-            flag = '✓'
-            interpretation = 'Value within normal range.'
+            status = TestStatus.NORMAL
         
-        return {
-            'test_name': ref.name,
-            'value': value,
-            'unit': ref.unit,
-            'reference_range': f'{ref.min_normal}-{ref.max_normal}',
-            'status': status.value,
-            'flag': flag,
-            'interpretation': interpretation
-        }
+        return LabTestResult(ref.name, value, status.value, ref)
+    
+    def analyze_value(self, test_name: str, value) -> Dict[str, Any]:
+        """
+        Analyze a single lab test value
+        Returns status and interpretation
+        """
+        return self.evaluate(test_name, value).to_dict()
+    
+    def analyze_panel_compact(self, lab_results: Dict[str, float]) -> 'LabPanelAnalysis':
+        """
+        Analyze a complete lab panel without building per-test dicts
+        Call to_dict() on the result when it needs to be serialized
+        """
+        # One catalogue snapshot for the whole panel, even if a reload lands mid-way
+        catalogue = self.catalogue.current()
+        ranges = catalogue.ranges
+        evaluate = self.evaluate
+        return LabPanelAnalysis(
+            [evaluate(test_name, value, ranges) for test_name, value in lab_results.items()],
+            catalogue.version
+        )
     
     def analyze_panel(self, lab_results: Dict[str, float]) -> Dict[str, Any]:
         """
         Analyze a complete lab panel
         Returns comprehensive analysis with abnormal value highlighting
         """
-        analyzed_results = []
-        abnormal_findings = []
-        critical_findings = []
-        
-        for test_name, value in lab_results.items():
-            result = self.analyze_value(test_name, value)
-            analyzed_results.append(result)
-            
-            if result['status'] in ['low', 'high']:
-                abnormal_findings.append(result)
-            
-            if result['status'] in ['critical_low', 'critical_high']:
-                critical_findings.append(result)
-        
-        # Generate summary
-        total_tests = len(analyzed_results)
-        abnormal_count = len(abnormal_findings)
-        critical_count = len(critical_findings)
-        
-        summary = {
-            'total_tests': total_tests,
-            'normal_count': total_tests - abnormal_count,
-            'abnormal_count': abnormal_count,
-            'critical_count': critical_count
-        }
-        
-        # Generate interpretive summary text
-        summary_text = []
-        if critical_count > 0:
-            summary_text.append(f'{critical_count} critical value(s) requiring immediate attention.')
-        if abnormal_count > 0:
-            summary_text.append(f'{abnormal_count} abnormal value(s) noted.')
-        if abnormal_count == 0 and critical_count == 0:
-            summary_text.append('All values within normal reference ranges.')
-        
-        return {
-            'status': 'success',
-            'summary': summary,
-            'summary_text': ' '.join(summary_text),
-            'results': analyzed_results,
-            'abnormal_findings': abnormal_findings,
-            'critical_findings': critical_findings,
-            'disclaimer': 'Laboratory results for clinical correlation only. Not a medical diagnosis.'
-        }
+        return self.analyze_panel_compact(lab_results).to_dict()
     
-    def parse_csv_results(self, csv_data: str) -> Dict[str, float]:
+    def iter_csv_results(self, csv_data: Union[str, Iterable[str]]) -> Iterator[Tuple[str, float]]:
         """
-        Parse CSV format lab results
-        Expected format: test_name,value
+        Parse CSV format lab results one row at a time
+        Accepts the whole text or an iterable of lines (header first)
+        Yields (test_name, value) pairs; rows with non-numeric values are skipped
         """
-        results = {}
-        lines = csv_data.strip().split('\n')
+        lines = csv_data.strip().split('\n') if isinstance(csv_data, str) else iter(csv_data)
         
-        for line in lines[1:]:  # Skip header
+        for index, line in enumerate(lines):
+            if index == 0:  # Skip header
+                continue
             if ',' in line:
                 parts = line.split(',')
                 if len(parts) >= 2:
                     test_name = parts[0].strip().lower().replace(' ', '_')
                     try:
-                        value = float(parts[1].strip())
-                        results[test_name] = value
+                        yield test_name, float(parts[1].strip())
                     except ValueError:
                         continue
+    
+    def parse_csv_results(self, csv_data: str) -> Dict[str, float]:
+        """
+        Parse CSV format lab results
+        Expected format: test_name,value
+        """
+        return dict(self.iter_csv_results(csv_data))
+    
+    def iter_critical_values(self, lab_results) -> Iterator[LabTestResult]:
+        """
+        Check values against critical limits only, as they arrive
+        lab_results is a dict or an iterable of (test_name, value) pairs,
+        e.g. iter_csv_results(); critical results are yielded immediately
+        so alerts can go out before the panel is fully analyzed
+        """
+        reference_ranges = self.reference_ranges
+        pairs = lab_results.items() if isinstance(lab_results, dict) else lab_results
         
-        return results
+        for test_name, value in pairs:
+            if isinstance(value, dict):
+                value = value.get('value', value)
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                continue
+            ref = reference_ranges.get(test_name.lower().replace(' ', '_'))
+            if ref is None:
+                continue
+            if ref.critical_low and value < ref.critical_low:
+                yield LabTestResult(ref.name, value, TestStatus.CRITICAL_LOW.value, ref)
+            elif ref.critical_high and value > ref.critical_high:
+                yield LabTestResult(ref.name, value, TestStatus.CRITICAL_HIGH.value, ref)
+
+    def analyze_trends(self, patient_id: str, lab_results: Dict[str, float], history,
+                       observed_at=None, window: int = 5) -> Dict[str, Any]:
+        """
+        Compare a panel against the patient's previous values
+        history is a LabHistoryStore; only the last `window` prior values
+        of each test are read, via the (patient, test, time) index
+        """
+        current_time = _parse_timestamp(observed_at) or datetime.now()
+        reference_ranges = self.reference_ranges
+        trends = []
+        delta_alerts = []
+
+        for test_name, value in lab_results.items():
+            if isinstance(value, dict):
+                value = value.get('value', value)
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                continue
+
+            test_name_lower = test_name.lower().replace(' ', '_')
+            previous = history.last_values(patient_id, test_name_lower, window, before=observed_at or current_time)
+            if not previous:
+                continue
+
+            ref = reference_ranges.get(test_name_lower)
+            previous_date, previous_value = previous[-1]
+            delta = value - previous_value
+            delta_limit = ref.delta_limit if ref else None
+            exceeded = delta_limit is not None and abs(delta) >= delta_limit
+
+            # Least-squares slope over the window plus the current value
+            points = [(_parse_timestamp(ts) or current_time, v) for ts, v in previous]
+            points.append((current_time, value))
+            slope = _slope_per_day(points)
+
+            if abs(delta) < 1e-9:
+                direction = 'stable'
+            else:
+                direction = 'rising' if delta > 0 else 'falling'
+
+            trend = {
+                'test_name': ref.name if ref else test_name,
+                'value': value,
+                'unit': ref.unit if ref else '',
+                'previous_value': previous_value,
+                'previous_date': previous_date,
+                'delta': round(delta, 4),
+                'delta_limit': delta_limit,
+                'delta_exceeded': exceeded,
+                'direction': direction,
+                'slope_per_day': round(slope, 4) if slope is not None else None,
+                'points': len(points)
+            }
+            trends.append(trend)
+
+            if exceeded:
+                trend['interpretation'] = (
+                    f"{'Increase' if delta > 0 else 'Decrease'} of {abs(delta):g} {trend['unit']} "
+                    f"since {previous_date} exceeds delta limit of {delta_limit:g}. "
+                    f"Verify specimen and correlate clinically."
+                )
+                delta_alerts.append(trend)
+
+        return {
+            'status': 'success',
+            'window': window,
+            'trends': trends,
+            'delta_alerts': delta_alerts
+        }
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """
+    Parse an ISO date or datetime, returning None if not parseable
+    Values with a UTC offset are converted to naive UTC so they can be
+    compared with naive stored timestamps
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _slope_per_day(points: List[tuple]) -> Optional[float]:
+    """Least-squares slope of (datetime, value) points in units per day"""
+    if len(points) < 2:
+        return None
+    origin = points[0][0]
+    xs = [(ts - origin).total_seconds() / 86400.0 for ts, _ in points]
+    ys = [v for _, v in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
 
 
 def analyze_lab_results(lab_data: Dict[str, float]) -> Dict[str, Any]:
@@ -0,0 +1,220 @@
+"""
+Columnar Lab Data I/O
+Parquet/Arrow readers and writers for raw lab panels and analysis results
+"""
+
+from typing import Dict, Any, Optional
+import os
+import numpy as np
+import pandas as pd
+
+from lab_analyzer import (
+    CATALOGUE, STATUS_FLAGS, STATUS_INTERPRETATIONS, TestStatus, LabPanelAnalysis
+)
+
+# Low-cardinality string columns stored as dictionary-encoded categoricals
+INPUT_CATEGORICAL_COLUMNS = ['panel_id', 'test_name']
+RESULT_CATEGORICAL_COLUMNS = [
+    'panel_id', 'test_name', 'unit', 'reference_range', 'status', 'flag', 'interpretation'
+]
+
+RESULT_COLUMNS = [
+    'panel_id', 'test_name', 'value', 'unit', 'reference_range', 'status', 'flag', 'interpretation'
+]
+
+
+def _categorize(df: pd.DataFrame, columns) -> pd.DataFrame:
+    for column in columns:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def panels_to_frame(panels: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Flatten {panel_id: {test_name: value}} into a long frame
+    Columns: panel_id, test_name, value (NaN for non-numeric input)
+    """
+    panel_ids, test_names, values = [], [], []
+    for panel_id, lab_data in panels.items():
+        for test_name, value in lab_data.items():
+            if isinstance(value, dict):
+                value = value.get('value')
+            panel_ids.append(panel_id)
+            test_names.append(test_name)
+            values.append(value)
+
+    df = pd.DataFrame({
+        'panel_id': panel_ids,
+        'test_name': test_names,
+        'value': pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype('float64'),
+    })
+    return _categorize(df, INPUT_CATEGORICAL_COLUMNS)
+
+
+def frame_to_panels(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Inverse of panels_to_frame; rows with missing values are dropped"""
+    panels: Dict[str, Dict[str, float]] = {}
+    valid = df[df['value'].notna()]
+    for panel_id, test_name, value in zip(valid['panel_id'], valid['test_name'], valid['value']):
+        panels.setdefault(str(panel_id), {})[str(test_name)] = float(value)
+    return panels
+
+
+def analyses_to_frame(analyses: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Flatten {panel_id: analysis} into one row per test
+    analysis is either analyze_panel output or a LabPanelAnalysis
+    Columns follow RESULT_COLUMNS
+    """
+    rows = {column: [] for column in RESULT_COLUMNS}
+    for panel_id, analysis in analyses.items():
+        if isinstance(analysis, LabPanelAnalysis):
+            # Read the compact records directly, no per-test dicts
+            for result in analysis:
+                ref = result.ref
+                rows['panel_id'].append(panel_id)
+                rows['test_name'].append(result.test_name)
+                rows['value'].append(result.value)
+                rows['unit'].append(ref.unit if ref else None)
+                rows['reference_range'].append(ref.range_label if ref else None)
+                rows['status'].append(result.status)
+                rows['flag'].append(result.flag)
+                rows['interpretation'].append(result.interpretation)
+            continue
+        for result in analysis.get('results', []):
+            rows['panel_id'].append(panel_id)
+            for column in RESULT_COLUMNS[1:]:
+                rows[column].append(result.get(column))
+
+    df = pd.DataFrame(rows)
+    df['value'] = pd.to_numeric(df['value'], errors='coerce').astype('float64')
+    return _categorize(df, RESULT_CATEGORICAL_COLUMNS)
+
+
+def _reference_frame(reference_ranges) -> pd.DataFrame:
+    """One row per known test, keyed by normalized test name"""
+    keys = list(reference_ranges.keys())
+    refs = [reference_ranges[key] for key in keys]
+    return pd.DataFrame({
+        'ref_name': [ref.name for ref in refs],
+        'unit': [ref.unit for ref in refs],
+        'reference_range': [f'{ref.min_normal}-{ref.max_normal}' for ref in refs],
+        'min_normal': [float(ref.min_normal) for ref in refs],
+        'max_normal': [float(ref.max_normal) for ref in refs],
+        # Zero or missing critical limits never trigger, as in analyze_value
+        'critical_low': [float(ref.critical_low) if ref.critical_low else np.nan for ref in refs],
+        'critical_high': [float(ref.critical_high) if ref.critical_high else np.nan for ref in refs],
+    }, index=pd.Index(keys, name='test_key'))
+
+
+def analyze_frame(df: pd.DataFrame, reference_ranges=None) -> pd.DataFrame:
+    """
+    Vectorized equivalent of LabResultAnalyzer.analyze_value over a long frame
+    Input columns: panel_id, test_name, value. Output columns: RESULT_COLUMNS
+    """
+    refs = _reference_frame(reference_ranges or CATALOGUE.current().ranges)
+    test_names = df['test_name'].astype(str)
+    keys = test_names.str.lower().str.replace(' ', '_', regex=False)
+    joined = refs.reindex(keys.to_numpy())
+    value = df['value'].to_numpy(dtype='float64')
+
+    known = joined['ref_name'].notna().to_numpy()
+    invalid = np.isnan(value)
+    with np.errstate(invalid='ignore'):
+        conditions = [
+            invalid,
+            ~known,
+            value < joined['critical_low'].to_numpy(),
+            value > joined['critical_high'].to_numpy(),
+            value < joined['min_normal'].to_numpy(),
+            value > joined['max_normal'].to_numpy(),
+        ]
+    statuses = ['error', 'unknown', TestStatus.CRITICAL_LOW.value, TestStatus.CRITICAL_HIGH.value,
+                TestStatus.LOW.value, TestStatus.HIGH.value]
+    status = np.select(conditions, statuses, default=TestStatus.NORMAL.value)
+    # Error rows keep the submitted name without range details, as in analyze_value
+    scored = known & ~invalid
+
+    flags = {s.value: flag for s, flag in STATUS_FLAGS.items()}
+    interpretations = {s.value: text for s, text in STATUS_INTERPRETATIONS.items()}
+    status_series = pd.Series(status, index=df.index)
+
+    result = pd.DataFrame({
+        'panel_id': df['panel_id'].to_numpy(),
+        'test_name': np.where(scored, joined['ref_name'].to_numpy(), test_names.to_numpy()),
+        'value': value,
+        'unit': np.where(scored, joined['unit'].to_numpy(), None),
+        'reference_range': np.where(scored, joined['reference_range'].to_numpy(), None),
+        'status': status,
+        'flag': status_series.map(flags).to_numpy(),
+        'interpretation': status_series.map(interpretations).to_numpy(),
+    }, index=df.index)
+    return _categorize(result, RESULT_CATEGORICAL_COLUMNS)
+
+
+def write_frame(df: pd.DataFrame, path: str) -> str:
+    """Write a frame as Parquet (.parquet) or Arrow IPC (.arrow/.feather)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(('.arrow', '.feather')):
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_parquet(path, index=False)
+    return path
+
+
+def read_frame(path: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """Read a frame written by write_frame; categorical columns round-trip"""
+    if path.endswith(('.arrow', '.feather')):
+        return pd.read_feather(path, columns=columns)
+    return pd.read_parquet(path, columns=columns)
+
+
+def write_lab_input(panels: Dict[str, Dict[str, Any]], path: str) -> str:
+    """Write raw lab panels in columnar form"""
+    return write_frame(panels_to_frame(panels), path)
+
+
+def read_lab_input(path: str) -> Dict[str, Dict[str, float]]:
+    """Read raw lab panels back into {panel_id: lab_data} dicts"""
+    return frame_to_panels(read_frame(path))
+
+
+def write_lab_results(analyses: Dict[str, Dict[str, Any]], path: str) -> str:
+    """Write analyze_panel outputs in columnar form"""
+    return write_frame(analyses_to_frame(analyses), path)
+
+
+def read_lab_results(path: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """Read analysis results as a frame (no JSON parsing involved)"""
+    return read_frame(path, columns)
+
+
+def rescore(input_path: str, output_path: str, reference_ranges=None) -> Dict[str, Any]:
+    """
+    Re-score a columnar file of raw lab values against the current reference ranges
+    Returns a small summary of the run
+    """
+    catalogue = CATALOGUE.current()
+    results = analyze_frame(read_frame(input_path), reference_ranges or catalogue.ranges)
+    write_frame(results, output_path)
+    counts = results['status'].value_counts()
+    return {
+        'input': input_path,
+        'output': output_path,
+        'rows': len(results),
+        'panels': int(results['panel_id'].nunique()),
+        'reference_catalogue_version': catalogue.version if reference_ranges is None else None,
+        'status_counts': {str(k): int(v) for k, v in counts.items() if v}
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    if len(sys.argv) != 3:
+        print("Usage: python lab_columnar.py <input.parquet> <output.parquet>")
+        sys.exit(1)
+
+    print(json.dumps(rescore(sys.argv[1], sys.argv[2]), indent=2))
@@ -0,0 +1,149 @@
+"""
+Laboratory History Store
+Per-patient time series of lab values backed by SQLite
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
+import sqlite3
+import threading
+import os
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lab_values (
+    patient_id  TEXT NOT NULL,
+    test_name   TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    value       REAL NOT NULL,
+    session_id  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_lab_values_patient_test_time
+    ON lab_values (patient_id, test_name, observed_at, seq);
+CREATE INDEX IF NOT EXISTS idx_lab_values_session
+    ON lab_values (session_id);
+"""
+
+
+def normalize_test_name(test_name: str) -> str:
+    """Normalize a test name the same way the analyzer does"""
+    return test_name.lower().replace(' ', '_')
+
+
+def _timestamp(observed_at) -> str:
+    """Store timestamps as ISO-8601 text so lexical order is time order"""
+    if observed_at is None:
+        return datetime.now().isoformat(timespec='seconds')
+    if isinstance(observed_at, datetime):
+        return observed_at.isoformat(timespec='seconds')
+    return str(observed_at)
+
+
+class LabHistoryStore:
+    """
+    Store of lab values indexed by (patient, test, time), one panel per session
+
+    Every query walks the composite index, so range queries and
+    "last N values" lookups cost O(log n + k) regardless of how many
+    sessions have been recorded.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def append_panel(self, patient_id: str, lab_data: Dict[str, Any],
+                     observed_at=None, session_id: Optional[str] = None) -> int:
+        """
+        Record every numeric value of a panel for a patient
+        A session's panel replaces whatever that session recorded before, so a
+        retried or re-submitted analysis does not count the same values twice
+        Returns number of values appended
+        """
+        timestamp = _timestamp(observed_at)
+        rows = []
+        for test_name, value in lab_data.items():
+            if isinstance(value, dict):
+                value = value.get('value')
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                continue
+            rows.append((patient_id, normalize_test_name(test_name), timestamp, value, session_id))
+
+        with self._lock, self._conn:
+            if session_id is not None:
+                self._conn.execute("DELETE FROM lab_values WHERE session_id = ?", (session_id,))
+            self._conn.executemany(
+                "INSERT INTO lab_values (patient_id, test_name, observed_at, value, session_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def discard_session(self, session_id: str) -> int:
+        """
+        Remove the values a session recorded
+        Returns number of values removed
+        """
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM lab_values WHERE session_id = ?", (session_id,)
+            ).rowcount
+
+    def range(self, patient_id: str, test_name: str,
+              start=None, end=None) -> List[Tuple[str, float]]:
+        """
+        Return (observed_at, value) pairs for a test, oldest first
+        Bounds are inclusive and optional
+        """
+        query = "SELECT observed_at, value FROM lab_values WHERE patient_id = ? AND test_name = ?"
+        params: List[Any] = [patient_id, normalize_test_name(test_name)]
+        if start is not None:
+            query += " AND observed_at >= ?"
+            params.append(_timestamp(start))
+        if end is not None:
+            query += " AND observed_at <= ?"
+            params.append(_timestamp(end))
+        query += " ORDER BY observed_at, seq"
+
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def last_values(self, patient_id: str, test_name: str, n: int = 5,
+                    before=None) -> List[Tuple[str, float]]:
+        """
+        Return the most recent n (observed_at, value) pairs, oldest first
+        If before is given, only values strictly earlier are considered
+        """
+        query = "SELECT observed_at, value FROM lab_values WHERE patient_id = ? AND test_name = ?"
+        params: List[Any] = [patient_id, normalize_test_name(test_name)]
+        if before is not None:
+            query += " AND observed_at < ?"
+            params.append(_timestamp(before))
+        query += " ORDER BY observed_at DESC, seq DESC LIMIT ?"
+        params.append(n)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        rows.reverse()
+        return rows
+
+    def tests_for_patient(self, patient_id: str) -> List[str]:
+        """List all test names recorded for a patient"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT test_name FROM lab_values WHERE patient_id = ?",
+                (patient_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
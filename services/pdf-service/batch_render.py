@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Batch PDF Rendering
+Render many approved reports across a pool of warm renderer processes
+"""
+
+import sys
+import os
+import io
+import re
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterator, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_generator import MedicalReportPDFGenerator, OUTPUT_PROFILES
+
+# Per-process renderer, created once by _init_worker
+_renderer: Optional[MedicalReportPDFGenerator] = None
+
+# Enough for a first render to load fonts and fill the paragraph cache
+_WARMUP_REPORT = {'report_id': 'WARMUP', 'status': 'approved', 'reviewer_name': 'Warm Up'}
+
+
+def _init_worker(profile: str = 'standard'):
+    """Create the renderer once per process and warm it up"""
+    global _renderer
+    _renderer = MedicalReportPDFGenerator.for_profile(profile)
+    _renderer.generate_pdf(_WARMUP_REPORT, io.BytesIO())
+
+
+def _safe_name(report_id: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]', '_', report_id).lstrip('.') or 'report'
+
+
+def _render_one(job: Tuple[int, Dict[str, Any], Optional[str]]) -> Dict[str, Any]:
+    """Render one report to its path (runs inside a worker process)"""
+    index, report, pdf_path = job
+    entry = {
+        'index': index,
+        'report_id': report.get('report_id'),
+        'status': 'success',
+        'pdf_path': pdf_path,
+        'bytes': None,
+        'render_ms': None,
+        'error': None,
+    }
+    if report.get('error'):
+        # Input that could not be read; reported in place of the report
+        entry.update(status='error', pdf_path=None, error=report['error'], render_ms=0.0)
+        return entry
+    started = time.perf_counter()
+    try:
+        _renderer.render_to_file(report, pdf_path)
+        entry['bytes'] = os.path.getsize(pdf_path)
+    except Exception as e:
+        entry.update(status='error', pdf_path=None, error=f"{type(e).__name__}: {e}")
+    entry['render_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return entry
+
+
+def _ordered_map(executor, fn, items: Iterable, window: int) -> Iterator:
+    """Like executor.map, but keeps at most `window` reports in flight"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _jobs(reports: Iterable[Dict[str, Any]], output_dir: str) -> Iterator[Tuple[int, Dict[str, Any], Optional[str]]]:
+    """
+    Assign each report its output path; repeated report IDs get a numeric suffix
+    Unreadable input (see iter_ndjson_reports) passes through without a path
+    """
+    used = set()
+    for index, report in enumerate(reports):
+        if report.get('error'):
+            yield index, report, None
+            continue
+        name = _safe_name(str(report.get('report_id') or f'report-{index}'))
+        candidate, n = name, 1
+        while candidate in used:
+            n += 1
+            candidate = f"{name}-{n}"
+        used.add(candidate)
+        yield index, report, os.path.join(output_dir, f"{candidate}.pdf")
+
+
+def iter_render_batch(reports: Iterable[Dict[str, Any]], output_dir: str,
+                      workers: int = os.cpu_count() or 1,
+                      profile: str = 'standard') -> Iterator[Dict[str, Any]]:
+    """
+    Render reports (a list or any iterable) into output_dir with the given
+    output profile, yielding one manifest entry per report in input order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = _jobs(reports, output_dir)
+
+    if workers <= 1:
+        _init_worker(profile)
+        for job in jobs:
+            yield _render_one(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(profile,)) as executor:
+        yield from _ordered_map(executor, _render_one, jobs, window=workers * 4)
+
+
+def render_batch(reports: Iterable[Dict[str, Any]], output_dir: str,
+                 workers: int = os.cpu_count() or 1, profile: str = 'standard') -> Dict[str, Any]:
+    """
+    Render all reports and return the manifest:
+    totals, throughput and per-report path, size, timing and error
+    """
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    entries: List[Dict[str, Any]] = list(iter_render_batch(reports, output_dir, workers, profile))
+    return _manifest(entries, output_dir, workers, started_at, time.perf_counter() - started, profile)
+
+
+def _manifest(entries: List[Dict[str, Any]], output_dir: str, workers: int,
+              started_at: str, seconds: float, profile: str = 'standard') -> Dict[str, Any]:
+    failed = sum(1 for entry in entries if entry['status'] != 'success')
+    render_times = sorted(entry['render_ms'] for entry in entries if entry['status'] == 'success')
+    return {
+        'started_at': started_at,
+        'completed_at': datetime.now().isoformat(),
+        'output_dir': os.path.abspath(output_dir),
+        'workers': workers,
+        'profile': profile,
+        'total': len(entries),
+        'succeeded': len(entries) - failed,
+        'failed': failed,
+        'seconds': round(seconds, 3),
+        'reports_per_sec': round(len(entries) / seconds, 1) if seconds else None,
+        'render_ms_p50': render_times[len(render_times) // 2] if render_times else None,
+        'render_ms_max': render_times[-1] if render_times else None,
+        'reports': entries,
+    }
+
+
+def write_manifest(manifest: Dict[str, Any], path: str):
+    """Write the manifest atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def iter_report_files(directory: str) -> Iterator[Dict[str, Any]]:
+    """Report dicts from *.json files in a directory; unreadable files become error records"""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json') and name != 'manifest.json':
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    report = json.load(f)
+            except (OSError, ValueError) as e:
+                yield {'report_id': name, 'error': f"Unreadable input: {type(e).__name__}: {e}"}
+                continue
+            if not isinstance(report, dict):
+                yield {'report_id': name, 'error': "Not a JSON object"}
+                continue
+            yield report
+
+
+def iter_ndjson_reports(stream: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Report dicts from NDJSON: either a bare report per line or a
+    bulk_generate_reports record ({"status": "success", "report": {...}})
+    A line that is not a JSON object becomes an error record
+    ({"report_id": "line-N", "error": ...}) so the rest of the batch still renders
+    """
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield {'report_id': f"line-{line_no}", 'error': f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield {'report_id': f"line-{line_no}", 'error': "Not a JSON object"}
+            continue
+        if 'report' in record:
+            if record.get('status', 'success') == 'success':
+                yield record['report']
+        else:
+            yield record
+
+
+def _print_run(reports: Iterable[Dict[str, Any]], pdf_path: str, quiet: bool = False,
+               profile: str = 'standard') -> int:
+    """Render every report into one PDF in a single layout pass; unreadable input is skipped and listed"""
+    errors = []
+
+    def readable(reports):
+        for report in reports:
+            if report.get('error'):
+                errors.append({'report_id': report.get('report_id'), 'error': report['error']})
+                if not quiet:
+                    print(f"  ❌ {report.get('report_id')}: {report['error']}", file=sys.stderr)
+                continue
+            yield report
+
+    started = time.perf_counter()
+    try:
+        result = MedicalReportPDFGenerator.for_profile(profile).render_print_run_to_file(readable(reports), pdf_path)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    
+    json.dump({'pdf_path': os.path.abspath(pdf_path), 'seconds': round(seconds, 3), **result, 'errors': errors},
+              sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    if not quiet:
+        print(f"✅ {result['reports']} reports, {result['pages']} pages in {seconds:.2f}s → {pdf_path}",
+              file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render approved medical reports to PDF in bulk")
+    parser.add_argument('input', help="Directory of report JSON files, NDJSON file, or - for NDJSON on stdin")
+    parser.add_argument('--output', help="Directory for the PDFs and manifest.json")
+    parser.add_argument('--print-run', metavar='PDF',
+                        help="Instead of one PDF per report, lay all reports out in this single PDF "
+                             "(page numbers restart per report, one bookmark per patient); "
+                             "the page index is written to stdout as JSON")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Renderer processes (1 renders in-process)")
+    parser.add_argument('--profile', choices=sorted(OUTPUT_PROFILES), default='standard',
+                        help="PDF output profile (compact: smaller files for archiving and email)")
+    parser.add_argument('--quiet', action='store_true', help="No progress output")
+    args = parser.parse_args()
+    if not args.output and not args.print_run:
+        parser.error("one of --output or --print-run is required")
+
+    input_file = None
+    if args.input == '-':
+        reports = iter_ndjson_reports(sys.stdin)
+    elif os.path.isdir(args.input):
+        reports = iter_report_files(args.input)
+    else:
+        input_file = open(args.input)
+        reports = iter_ndjson_reports(input_file)
+
+    if args.print_run:
+        try:
+            return _print_run(reports, args.print_run, args.quiet, args.profile)
+        finally:
+            if input_file is not None:
+                input_file.close()
+    
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    entries = []
+    try:
+        for entry in iter_render_batch(reports, args.output, args.workers, args.profile):
+            entries.append(entry)
+            if args.quiet:
+                continue
+            if entry['status'] != 'success':
+                print(f"  ❌ {entry['report_id']}: {entry['error']}", file=sys.stderr)
+            elif len(entries) % 100 == 0:
+                print(f"  {len(entries)} PDFs rendered", file=sys.stderr)
+    finally:
+        if input_file is not None:
+            input_file.close()
+
+    manifest = _manifest(entries, args.output, args.workers, started_at, time.perf_counter() - started,
+                         args.profile)
+    manifest_path = os.path.join(args.output, 'manifest.json')
+    write_manifest(manifest, manifest_path)
+
+    if not args.quiet:
+        print(f"✅ {manifest['succeeded']}/{manifest['total']} PDFs in {manifest['seconds']}s "
+              f"({manifest['reports_per_sec']} PDFs/s, {args.workers} workers) → {manifest_path}",
+              file=sys.stderr)
+    return 1 if manifest['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+PDF Blob Storage
+Rendered PDFs kept by key behind a small interface, so any replica can serve a download
+"""
+
+from typing import Dict, Optional
+import hashlib
+import os
+import threading
+import uuid
+
+
+class BlobNotFoundError(KeyError):
+    """No blob is stored under the key"""
+
+
+class BlobStore:
+    """
+    Interface for PDF storage
+    Blobs are immutable once written; put() under an existing key replaces it whole.
+    Implementations must make a blob visible to readers only once it is complete
+    """
+
+    def put(self, key: str, data: bytes):
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.size(key)
+        except BlobNotFoundError:
+            return False
+        return True
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes start..end (inclusive); stores that can seek should override this"""
+        return self.get(key)[start:end + 1]
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs as files under root, sharded two levels deep by a hash of the key
+    (root/ab/cd/<key>) so no directory grows unbounded
+    Point root at shared storage (NFS, a mounted bucket) to serve every replica
+    """
+
+    def __init__(self, root: str, shard_depth: int = 2):
+        self.root = root
+        self.shard_depth = shard_depth
+
+    def path(self, key: str) -> str:
+        if not key or '/' in key or '\\' in key or key.startswith('.'):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+        shards = [digest[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+        return os.path.join(self.root, *shards, key)
+
+    def put(self, key: str, data: bytes):
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(key) from None
+
+    def size(self, key: str) -> int:
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            raise BlobNotFoundError(key) from None
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        try:
+            with open(self.path(key), 'rb') as f:
+                f.seek(start)
+                return f.read(end - start + 1)
+        except FileNotFoundError:
+            raise BlobNotFoundError(key) from None
+
+
+class MemoryBlobStore(BlobStore):
+    """In-process stand-in for tests; blobs are lost when the process exits"""
+
+    def __init__(self):
+        self._blobs: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            self._blobs[key] = bytes(data)
+
+    def get(self, key: str) -> bytes:
+        with self._lock:
+            try:
+                return self._blobs[key]
+            except KeyError:
+                raise BlobNotFoundError(key) from None
+
+    def size(self, key: str) -> int:
+        return len(self.get(key))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._blobs.pop(key, None)
+
+
+def blob_store_from_env(default_root: Optional[str] = None) -> BlobStore:
+    """
+    Store selected by PDF_BLOB_STORE: "local" (default, rooted at PDF_BLOB_DIR)
+    or "memory"
+    """
+    kind = os.environ.get('PDF_BLOB_STORE', 'local').lower()
+    if kind == 'memory':
+        return MemoryBlobStore()
+    if kind == 'local':
+        root = os.environ.get('PDF_BLOB_DIR') or default_root
+        if not root:
+            raise ValueError("PDF_BLOB_DIR is not set")
+        return LocalBlobStore(root)
+    raise ValueError(f"Unknown PDF_BLOB_STORE: {kind}")
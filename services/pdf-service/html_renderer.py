@@ -0,0 +1,186 @@
+"""
+HTML Preview Renderer for Medical Reports
+Formatted review copy of a report, laid out like the PDF but rendered in microseconds
+"""
+
+from collections import OrderedDict
+from html import escape
+from typing import Dict, Any, List, Optional
+import threading
+import os
+
+try:
+    from report_layout import build_report_layout, SECTION_TITLES, EMPTY_TEXT
+except ImportError:
+    # Loaded by file path from a Motia step; load the sibling module the same way
+    import importlib.util
+    _spec = importlib.util.spec_from_file_location(
+        "report_layout", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_layout.py')
+    )
+    _report_layout = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_report_layout)
+    build_report_layout = _report_layout.build_report_layout
+    SECTION_TITLES = _report_layout.SECTION_TITLES
+    EMPTY_TEXT = _report_layout.EMPTY_TEXT
+
+# Rendered previews kept per process
+PREVIEW_CACHE_SIZE = 256
+
+# Colours and spacing follow MedicalReportPDFGenerator's styles
+STYLESHEET = """
+body{font-family:Helvetica,Arial,sans-serif;font-size:11pt;line-height:1.45;color:#222;max-width:7.5in;margin:0.4in auto;padding:0 0.25in}
+h1{font-size:18pt;color:#1a5490;text-align:center;margin:0 0 12px}
+h2{font-size:14pt;color:#2c5aa0;background:#f0f4f8;border:1px solid #2c5aa0;padding:5px;margin:20px 0 12px}
+p{margin:0 0 8px;text-align:justify}
+.meta{margin-bottom:18px}
+.critical{color:red;font-weight:bold}
+.muted{font-size:9pt;color:gray;font-style:italic}
+table.patient{border-collapse:collapse;width:100%;font-size:10pt}
+table.patient th,table.patient td{border:0.5px solid #ccc;padding:8px 10px;text-align:left}
+table.patient th{background:#f0f4f8}
+.signature{display:flex;justify-content:space-between;font-size:9pt;margin:24px 0}
+.signature .line{border-top:1px solid #222;width:3in;padding-top:3px}
+.disclaimer{background:#fff3cd;border:1px solid #ff9800;color:red;font-weight:bold;font-size:9pt;text-align:center;padding:12px 15px;margin-top:18px}
+.footer{border-top:0.5px solid #ccc;color:gray;font-size:8pt;display:flex;justify-content:space-between;margin-top:24px;padding-top:6px}
+""".strip()
+
+# Templates are compiled once at import into bound str.format callables;
+# rendering is then a handful of format calls and one join
+_PAGE = ('<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+         '<title>{title} {report_id}</title><style>' + STYLESHEET.replace('{', '{{').replace('}', '}}') +
+         '</style></head><body>{body}'
+         '<div class="footer"><span>Preview</span><span>CONFIDENTIAL MEDICAL DOCUMENT</span>'
+         '<span>AI-Assisted Report</span></div></body></html>').format
+_TITLE = '<h1>{}</h1>'.format
+_META = ('<p class="meta"><b>Report ID:</b> {report_id} | '
+         '<b style="color:{color}">Status: {status}</b>{reviewer}</p>').format
+_REVIEWER = ' | <b>Reviewed by:</b> {}'.format
+_HEADING = '<h2>{}</h2>'.format
+_PATIENT_ROW = '<tr><th>{}</th><td>{}</td><th>{}</th><td>{}</td></tr>'.format
+_PATIENT_TABLE = '<table class="patient">{}</table>'.format
+_PARAGRAPH = '<p>{}</p>'.format
+_FINDING = '<p>{}. {}</p>'.format
+_CRITICAL_FINDING = '<p class="critical">{}. {}</p>'.format
+_BULLET = '<p>• {}</p>'.format
+_MUTED = '<p class="muted">{}</p>'.format
+_SIGNATURE = ('<div class="signature"><div class="line"><b>{name}</b><br>Reviewing Radiologist/Physician</div>'
+              '<div class="line" style="text-align:right"><b>Date:</b> {date}</div></div>').format
+_DISCLAIMER = '<div class="disclaimer">{}</div>'.format
+
+
+def _text(value: Any) -> str:
+    return escape(str(value), quote=False)
+
+
+def _findings(parts: List[str], findings):
+    for number, finding, is_critical in findings:
+        parts.append((_CRITICAL_FINDING if is_critical else _FINDING)(number, _text(finding)))
+
+
+def render_report_html(report_data: Dict[str, Any]) -> str:
+    """Render a report dict (as produced by generate_complete_report) to a standalone HTML page"""
+    layout = build_report_layout(report_data)
+    parts = [
+        _TITLE(layout['title']),
+        _META(
+            report_id=_text(layout['report_id']),
+            color=layout['status_color'],
+            status=_text(layout['status']),
+            reviewer=_REVIEWER(_text(layout['reviewer_name'])) if layout['reviewer_name'] else ''
+        ),
+        _HEADING(SECTION_TITLES['patient_information']),
+        _PATIENT_TABLE(''.join(
+            _PATIENT_ROW(label, _text(value), label2, _text(value2))
+            for label, value, label2, value2 in layout['patient_rows']
+        )),
+        _HEADING(SECTION_TITLES['examination_summary']),
+        _PARAGRAPH(_text(layout['examination_summary'])),
+    ]
+
+    imaging = layout['imaging']
+    if imaging:
+        parts.append(_HEADING(SECTION_TITLES['imaging_findings']))
+        if imaging['findings']:
+            _findings(parts, imaging['findings'])
+        else:
+            parts.append(_PARAGRAPH(EMPTY_TEXT['imaging_findings']))
+        if imaging['meta_text']:
+            parts.append(_MUTED(_text(imaging['meta_text'])))
+
+    lab = layout['laboratory']
+    if lab:
+        parts.append(_HEADING(SECTION_TITLES['laboratory_findings']))
+        if lab['findings']:
+            if lab['show_abnormal_label']:
+                parts.append(_PARAGRAPH("Abnormal Results:"))
+            _findings(parts, lab['findings'])
+        else:
+            parts.append(_PARAGRAPH(EMPTY_TEXT['laboratory_findings']))
+
+    for key, has_key in (('interpretive_notes', 'has_interpretive_notes'),
+                         ('recommendations', 'has_recommendations')):
+        parts.append(_HEADING(SECTION_TITLES[key]))
+        if layout[has_key]:
+            parts.extend(_BULLET(_text(line)) for line in layout[key])
+        else:
+            parts.append(_PARAGRAPH(EMPTY_TEXT[key]))
+
+    if layout['reviewer_comments']:
+        parts.append(_HEADING(SECTION_TITLES['reviewer_comments']))
+        parts.append(_PARAGRAPH(_text(layout['reviewer_comments'])))
+
+    if layout['signature']:
+        parts.append(_SIGNATURE(name=_text(layout['signature']['name']),
+                                date=_text(layout['signature']['date'])))
+
+    parts.append(_DISCLAIMER('<br>'.join(_text(line) for line in layout['disclaimer_lines'])))
+
+    return _PAGE(title=layout['title'], report_id=_text(layout['report_id']), body=''.join(parts))
+
+
+class PreviewCache:
+    """LRU of rendered previews keyed by a caller-chosen version key"""
+
+    def __init__(self, maxsize: int = PREVIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            html = self._items.get(key)
+            if html is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            return html
+
+    def render(self, key: str, report_data: Dict[str, Any]) -> str:
+        """Cached preview for key, rendering report_data on a miss"""
+        html = self.get(key)
+        if html is None:
+            html = render_report_html(report_data)
+            with self._lock:
+                self.misses += 1
+                self._items[key] = html
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+        return html
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+    import time
+
+    with open(sys.argv[1]) as f:
+        report = json.load(f)
+
+    runs = 2000
+    started = time.perf_counter()
+    for _ in range(runs):
+        html = render_report_html(report)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+    print(html)
+    print(f"<!-- {len(html)} bytes, {elapsed_ms:.4f} ms per render -->")
@@ -0,0 +1,205 @@
+"""
+Content-Addressed PDF Cache
+Rendered PDFs keyed by a canonical hash of the report content and template version
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+# Bump when the PDF layout changes so cached PDFs from the old layout are not served
+TEMPLATE_VERSION = '2'
+
+# Fields that change between otherwise identical reports and are not printed
+VOLATILE_FIELDS = ('generated_date', 'metadata')
+
+# Fields set at approval; they only appear on the sign-off page, never in the body pages
+REVIEW_FIELDS = ('status', 'reviewer_name', 'reviewer_comments', 'requires_approval')
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(report_data: Dict[str, Any], template_version: str = TEMPLATE_VERSION,
+                 profile: str = 'standard') -> str:
+    """
+    Canonical hash of what a report's PDF shows (key order and volatile fields ignored)
+    Output profiles other than standard produce different bytes, so they hash apart
+    """
+    content = {key: value for key, value in report_data.items() if key not in VOLATILE_FIELDS}
+    key = {'template': template_version, 'report': content}
+    if profile != 'standard':
+        key['profile'] = profile
+    payload = json.dumps(key, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+def body_hash(report_data: Dict[str, Any], template_version: str = TEMPLATE_VERSION) -> str:
+    """Hash of what the body pages show: a draft and its unedited approval share it"""
+    body = {key: value for key, value in report_data.items() if key not in REVIEW_FIELDS}
+    return content_hash(body, template_version)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, for integrity checks on download"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src: str, dest: str):
+    """Atomically place src at dest, as a hard link when the filesystem allows"""
+    # rename() between two links to one inode is a no-op that leaves the temp link behind
+    if os.path.exists(dest) and os.path.samefile(src, dest):
+        return
+    tmp_path = os.path.join(os.path.dirname(os.path.abspath(dest)), f".{uuid.uuid4().hex}.tmp")
+    try:
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class PDFCache:
+    """
+    Directory of <hash>.pdf files bounded by total size, least recently used evicted first
+    Entries are immutable; callers get a hard link (or copy) at their own path,
+    so evicting an entry never removes a PDF that was handed out. Each entry's
+    SHA-256 is kept beside it and checked on every hit, so a file modified in
+    place is dropped instead of served
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _digest_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.sha256")
+
+    def _ensure_loaded(self):
+        """Index existing entries, oldest use first (mtime is refreshed on every hit)"""
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            found = []
+            for name in os.listdir(self.directory):
+                if not name.endswith('.pdf') or name.startswith('.'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, name[:-4], stat.st_size))
+            for _, key, size in sorted(found):
+                self._entries[key] = size
+                self._bytes += size
+            self._loaded = True
+
+    def _remove(self, key: str):
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is not None:
+                self._bytes -= size
+        for path in (self._path(key), self._digest_path(key)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str, output_path: str) -> Optional[str]:
+        """
+        Place the cached PDF for key at output_path
+        Returns its SHA-256, or None on a miss
+        """
+        self._ensure_loaded()
+        path = self._path(key)
+        try:
+            with open(self._digest_path(key)) as f:
+                expected = f.read().strip()
+            if file_sha256(path) != expected:
+                self._remove(key)
+                raise FileNotFoundError(path)
+            os.utime(path)
+            _link_or_copy(path, output_path)
+        except FileNotFoundError:
+            # Never cached, evicted (possibly by another process) or failed verification
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._bytes -= size
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._entries[key] = os.path.getsize(path)
+                self._bytes += self._entries[key]
+            self.hits += 1
+        return expected
+
+    def put(self, key: str, pdf_path: str) -> str:
+        """
+        Add a rendered PDF under key and evict down to max_bytes
+        Returns the PDF's SHA-256
+        """
+        digest = file_sha256(pdf_path)
+        size = os.path.getsize(pdf_path)
+        if size > self.max_bytes:
+            return digest
+        self._ensure_loaded()
+
+        # Digest first: an entry is only visible once its PDF is in place
+        tmp_digest = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_digest, 'w') as f:
+            f.write(digest)
+        os.replace(tmp_digest, self._digest_path(key))
+        _link_or_copy(pdf_path, self._path(key))
+
+        evicted = []
+        with self._lock:
+            self._bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key = next(iter(self._entries))
+                evicted.append(old_key)
+                self._bytes -= self._entries.pop(old_key)
+        for old_key in evicted:
+            for path in (self._path(old_key), self._digest_path(old_key)):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+        return digest
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -10,82 +10,321 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, KeepTogether
 from reportlab.platypus import Frame, PageTemplate, Image as RLImage
+from reportlab.platypus import BaseDocTemplate, Flowable
 from reportlab.lib.colors import HexColor
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.pdfbase.pdfdoc import PDFZCompress
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import io
+import tempfile
+import threading
 import os
 
+try:
+    from report_layout import build_report_layout, SECTION_TITLES, EMPTY_TEXT
+    from pdf_cache import PDFCache, content_hash, body_hash
+    from blob_store import BlobStore, blob_store_from_env
+except ImportError:
+    # Loaded by file path from a Motia step; load the sibling modules the same way
+    import importlib.util
+
+    def _load_sibling(name):
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{name}.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    _report_layout = _load_sibling('report_layout')
+    build_report_layout = _report_layout.build_report_layout
+    SECTION_TITLES = _report_layout.SECTION_TITLES
+    EMPTY_TEXT = _report_layout.EMPTY_TEXT
+    _pdf_cache = _load_sibling('pdf_cache')
+    PDFCache = _pdf_cache.PDFCache
+    content_hash = _pdf_cache.content_hash
+    body_hash = _pdf_cache.body_hash
+    _blob_store = _load_sibling('blob_store')
+    BlobStore = _blob_store.BlobStore
+    blob_store_from_env = _blob_store.blob_store_from_env
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    # Optional: without pypdf approvals render the whole PDF instead of joining
+    # the pre-rendered body with the sign-off page
+    PdfReader = PdfWriter = None
+
+# Parsed paragraph fragments kept for static text (headings, notes, disclaimer)
+PARAGRAPH_CACHE_SIZE = 1024
+
+# Form XObject names for the parts of the page template drawn once per document
+HEADER_FORM = 'reportHeader'
+FOOTER_FORM = 'reportFooter'
+
+def _build_styles():
+    """Sample stylesheet plus the custom paragraph styles for medical reports"""
+    styles = getSampleStyleSheet()
+
+    # Title style
+    styles.add(ParagraphStyle(
+        name='ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=20,
+        textColor=HexColor('#1a5490'),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Section heading
+    styles.add(ParagraphStyle(
+        name='SectionHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=HexColor('#2c5aa0'),
+        spaceAfter=12,
+        spaceBefore=20,
+        fontName='Helvetica-Bold',
+        borderWidth=1,
+        borderColor=HexColor('#2c5aa0'),
+        borderPadding=5,
+        backColor=HexColor('#f0f4f8')
+    ))
+
+    # Body text
+    styles.add(ParagraphStyle(
+        name='ReportBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        leading=16,
+        alignment=TA_JUSTIFY,
+        spaceAfter=10
+    ))
+
+    # Disclaimer style
+    styles.add(ParagraphStyle(
+        name='Disclaimer',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.red,
+        alignment=TA_CENTER,
+        spaceAfter=6,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Critical finding
+    styles.add(ParagraphStyle(
+        name='Critical',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor=colors.red,
+        fontName='Helvetica-Bold'
+    ))
+
+    return styles
+
+# Compiled once per process; styles are only read while rendering
+STYLES = _build_styles()
+
+TITLE_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+])
+
+PATIENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f4f8')),
+    ('BACKGROUND', (2, 0), (2, -1), HexColor('#f0f4f8')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cccccc')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+SIGNATURE_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+])
+
+DISCLAIMER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), HexColor('#fff3cd')),
+    ('BORDER', (0, 0), (-1, -1), 1, HexColor('#ff9800')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 15),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+    ('TOPPADDING', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+])
+
+# Output profiles for export_report. compact drops the ASCII85 wrapping of the
+# Flate-compressed streams (~15% of the file) and the page-template forms, which
+# only pay for themselves beyond ~12 pages; the pages look the same either way
+OUTPUT_PROFILES = {
+    'standard': {'ascii85': True, 'page_forms': True, 'size_budget': None},
+    'compact': {'ascii85': False, 'page_forms': False, 'size_budget': 64 * 1024},
+}
+
+
+class _BinaryStreamCanvas(Canvas):
+    """
+    Canvas that writes its streams Flate-compressed without the ASCII85 wrapping
+    Page compression is left off so ReportLab falls back to this document's
+    default filters, instead of rl_config.useA85 which is shared by the process
+    """
+    
+    def __init__(self, *args, **kwargs):
+        kwargs['pageCompression'] = 0
+        super().__init__(*args, **kwargs)
+        self._doc.defaultStreamFilters = [PDFZCompress]
+
+
+class _ReportStart(Flowable):
+    """Zero-size marker at the top of each report in a print run"""
+    
+    def __init__(self, entry: Dict[str, Any]):
+        super().__init__()
+        self.entry = entry
+    
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    
+    def draw(self):
+        pass
+
+
+class _PendingReports(Flowable):
+    """
+    Placeholder for the reports not yet laid out in a print run
+    _PrintRunDocTemplate swaps it for the next report's flowables (and itself)
+    when it reaches the front of the story, so only one report's flowables exist at a time
+    """
+    
+    def __init__(self, reports: Iterator[Dict[str, Any]], expand):
+        super().__init__()
+        self.reports = reports
+        self.expand = expand
+        self.count = 0
+    
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    
+    def draw(self):
+        pass
+
+
+class _PrintRunDocTemplate(BaseDocTemplate):
+    """
+    One document for many reports: footer page numbers restart at each report,
+    and each report gets a bookmark and outline entry
+    """
+    
+    def __init__(self, output, on_page_end, **kwargs):
+        super().__init__(output, **kwargs)
+        self.page_offset = 0
+        self.entries: List[Dict[str, Any]] = []
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+        # The footer is drawn at page end, after the page's _ReportStart reset the numbering
+        self.addPageTemplates([PageTemplate(id='report', frames=[frame], onPageEnd=on_page_end,
+                                            pagesize=self.pagesize)])
+    
+    def filterFlowables(self, flowables):
+        pending = flowables[0]
+        if not isinstance(pending, _PendingReports):
+            return
+        report = next(pending.reports, None)
+        if report is None:
+            flowables[0] = None
+            return
+        story = [PageBreak()] if pending.count else []
+        story.extend(pending.expand(report, pending.count))
+        story.append(pending)
+        pending.count += 1
+        flowables[0:1] = story
+    
+    def afterFlowable(self, flowable):
+        if not isinstance(flowable, _ReportStart):
+            return
+        entry = flowable.entry
+        entry['first_page'] = self.page
+        self.page_offset = 1 - self.page
+        if self.entries:
+            self.entries[-1]['pages'] = self.page - self.entries[-1]['first_page']
+        self.entries.append(entry)
+        
+        key = f"report-{len(self.entries)}"
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(entry['title'], key, level=0)
+        self.canv.showOutline()
+
+
 class MedicalReportPDFGenerator:
-    """Generate professional PDF medical reports"""
+    """
+    Generate professional PDF medical reports
+    One instance can be shared between threads: styles and table styles are
+    built once, and only the per-report flowables are created per call
+    """
     
-    def __init__(self):
+    def __init__(self, paragraph_cache_size: int = PARAGRAPH_CACHE_SIZE, page_forms: bool = True,
+                 ascii85: bool = True):
         self.page_width, self.page_height = letter
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles for medical reports"""
-        
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='ReportTitle',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            textColor=HexColor('#1a5490'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Section heading
-        self.styles.add(ParagraphStyle(
-            name='SectionHeading',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=HexColor('#2c5aa0'),
-            spaceAfter=12,
-            spaceBefore=20,
-            fontName='Helvetica-Bold',
-            borderWidth=1,
-            borderColor=HexColor('#2c5aa0'),
-            borderPadding=5,
-            backColor=HexColor('#f0f4f8')
-        ))
-        
-        # Body text
-        self.styles.add(ParagraphStyle(
-            name='ReportBody',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            leading=16,
-            alignment=TA_JUSTIFY,
-            spaceAfter=10
-        ))
-        
-        # Disclaimer style
-        self.styles.add(ParagraphStyle(
-            name='Disclaimer',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            textColor=colors.red,
-            alignment=TA_CENTER,
-            spaceAfter=6,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Critical finding
-        self.styles.add(ParagraphStyle(
-            name='Critical',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            textColor=colors.red,
-            fontName='Helvetica-Bold'
-        ))
+        self.page_forms = page_forms
+        self.canvasmaker = Canvas if ascii85 else _BinaryStreamCanvas
+        self.styles = STYLES
+        self.paragraph_cache_size = paragraph_cache_size
+        self._fragments: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._fragments_lock = threading.Lock()
     
-    def _create_header(self, canvas, doc):
-        """Create professional page header with hospital branding"""
-        canvas.saveState()
-        
+    @classmethod
+    def for_profile(cls, profile: str = 'standard') -> 'MedicalReportPDFGenerator':
+        """Generator configured for an entry of OUTPUT_PROFILES"""
+        if profile not in OUTPUT_PROFILES:
+            raise ValueError(f"Unknown PDF output profile: {profile}")
+        settings = OUTPUT_PROFILES[profile]
+        return cls(page_forms=settings['page_forms'], ascii85=settings['ascii85'])
+    
+    def _static_paragraph(self, text: str, style_name: str) -> Paragraph:
+        """
+        Paragraph for text that repeats across reports, reusing its parsed fragments
+        Fragments are never modified by ReportLab (it clones before splitting),
+        so one parse is safe to share between concurrent builds
+        """
+        key = (style_name, text)
+        with self._fragments_lock:
+            frags = self._fragments.get(key)
+            if frags is not None:
+                self._fragments.move_to_end(key)
+        if frags is not None:
+            return Paragraph(text, self.styles[style_name], frags=frags)
+        
+        paragraph = Paragraph(text, self.styles[style_name])
+        if self.paragraph_cache_size > 0:
+            with self._fragments_lock:
+                self._fragments[key] = paragraph.frags
+                while len(self._fragments) > self.paragraph_cache_size:
+                    self._fragments.popitem(last=False)
+        return paragraph
+    
+    def clear_cache(self):
+        """Drop all cached paragraph fragments"""
+        with self._fragments_lock:
+            self._fragments.clear()
+    
+    def _draw_header_static(self, canvas):
         # Header background
         canvas.setFillColor(HexColor('#1a5490'))
         canvas.rect(0.5*inch, self.page_height - 0.9*inch, self.page_width - inch, 0.4*inch, fill=1, stroke=0)
@@ -95,32 +334,55 @@ class MedicalReportPDFGenerator:
         canvas.setFillColor(colors.white)
         canvas.drawString(0.7*inch, self.page_height - 0.75*inch, "MEDICAL DIAGNOSTIC REPORT")
         
-        # Document status on right
+        # Document status on right (one timestamp per document)
         canvas.setFont('Helvetica', 9)
         canvas.drawRightString(self.page_width - 0.7*inch, self.page_height - 0.75*inch, 
                               f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        
-        canvas.restoreState()
     
-    def _create_footer(self, canvas, doc):
-        """Create professional page footer"""
-        canvas.saveState()
-        
+    def _draw_footer_static(self, canvas):
         # Footer line
         canvas.setStrokeColor(HexColor('#cccccc'))
         canvas.setLineWidth(0.5)
         canvas.line(0.5*inch, 0.7*inch, self.page_width - 0.5*inch, 0.7*inch)
         
-        # Page number and confidentiality notice
+        # Confidentiality notice
         canvas.setFont('Helvetica', 8)
         canvas.setFillColor(colors.grey)
-        page_num = canvas.getPageNumber()
-        canvas.drawString(0.5*inch, 0.5*inch, f"Page {page_num}")
         canvas.drawCentredString(self.page_width / 2, 0.5*inch, 
                                 "CONFIDENTIAL MEDICAL DOCUMENT")
         canvas.drawRightString(self.page_width - 0.5*inch, 0.5*inch, 
                               "AI-Assisted Report")
+    
+    def _draw_static(self, canvas, form_name: str, draw):
+        """
+        Draw a page element that is the same on every page
+        With page_forms it is recorded once per document as a form XObject and
+        each page only references it
+        """
+        canvas.saveState()
+        if not self.page_forms:
+            draw(canvas)
+        else:
+            if not canvas.hasForm(form_name):
+                canvas.beginForm(form_name)
+                draw(canvas)
+                canvas.endForm()
+            canvas.doForm(form_name)
+        canvas.restoreState()
+    
+    def _create_header(self, canvas, doc):
+        """Create professional page header with hospital branding"""
+        self._draw_static(canvas, HEADER_FORM, self._draw_header_static)
+    
+    def _create_footer(self, canvas, doc):
+        """Create professional page footer; only the page number is drawn per page"""
+        self._draw_static(canvas, FOOTER_FORM, self._draw_footer_static)
         
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.setFillColor(colors.grey)
+        page_num = canvas.getPageNumber() + doc.page_offset
+        canvas.drawString(0.5*inch, 0.5*inch, f"Page {page_num}")
         canvas.restoreState()
     
     def _create_patient_info_table(self, patient_info: Dict[str, str]) -> Table:
@@ -165,257 +427,454 @@ class MedicalReportPDFGenerator:
         
         return paragraphs
     
-    def generate_pdf(self, report_data: Dict[str, Any], output_path: str) -> str:
-        """
-        Generate comprehensive, detailed PDF from report data
-        Returns path to generated PDF
-        """
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=1.2*inch,
-            bottomMargin=inch
-        )
-        
-        # Container for PDF elements
+    def _numbered_findings(self, findings) -> List[Any]:
+        """Numbered findings from the layout, critical ones in bold red"""
+        elements = []
+        for i, finding, is_critical in findings:
+            finding_text = (f"<b><font color='red'>{i}. {finding}</font></b>" if is_critical
+                          else f"{i}. {finding}")
+            elements.extend([Paragraph(finding_text, self.styles['ReportBody']), Spacer(1, 0.08*inch)])
+        return elements
+    
+    def _bullets(self, lines: List[str]) -> List[Any]:
+        """Bulleted notes/recommendations (mostly template lines, so fragments are reused)"""
+        elements = []
+        for line in lines:
+            elements.extend([self._static_paragraph(f"• {line}", 'ReportBody'), Spacer(1, 0.08*inch)])
+        return elements
+    
+    def _body_story(self, layout: Dict[str, Any]) -> List[Any]:
+        """Title, status and clinical sections: everything up to the recommendations"""
         story = []
         
         # Document Header Section
         header_data = [
-            [Paragraph("<b><font size=18 color='#1a5490'>MEDICAL DIAGNOSTIC REPORT</font></b>", 
-                      self.styles['Normal'])]
+            [self._static_paragraph(f"<b><font size=18 color='#1a5490'>{layout['title']}</font></b>", 'Normal')]
         ]
         header_table = Table(header_data, colWidths=[7*inch])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
+        header_table.setStyle(TITLE_TABLE_STYLE)
         story.extend([header_table, Spacer(1, 0.15*inch)])
         
-        # Report Metadata
-        report_id = report_data.get('report_id', 'N/A')
-        status = report_data.get('status', 'DRAFT').upper()
-        status_color = '#22c55e' if status == 'APPROVED' else '#f59e0b'
-        
-        meta_text = f"<b>Report ID:</b> {report_id} | <b><font color='{status_color}'>Status: {status}</font></b>"
-        if report_data.get('reviewer_name'):
-            meta_text += f" | <b>Reviewed by:</b> {report_data.get('reviewer_name')}"
+        # Report Metadata (a signed report names its reviewer on the sign-off page)
+        meta_text = (f"<b>Report ID:</b> {layout['report_id']} | "
+                     f"<b><font color='{layout['status_color']}'>Status: {layout['status']}</font></b>")
+        if layout['reviewer_name'] and not layout['signature']:
+            meta_text += f" | <b>Reviewed by:</b> {layout['reviewer_name']}"
         
         story.extend([Paragraph(meta_text, self.styles['ReportBody']), Spacer(1, 0.25*inch)])
         
         # Patient Information Section
-        story.append(Paragraph("PATIENT INFORMATION", self.styles['SectionHeading']))
-        patient_info = report_data.get('patient_information', {})
+        story.append(self._static_paragraph(SECTION_TITLES['patient_information'], 'SectionHeading'))
         
         patient_data = [
-            ['<b>Patient ID:</b>', patient_info.get('patient_id', 'N/A'),
-             '<b>Study Date:</b>', patient_info.get('study_date', 'N/A')],
-            ['<b>Patient Name:</b>', patient_info.get('patient_name', 'N/A'),
-             '<b>Age:</b>', str(patient_info.get('age', 'N/A'))],
-            ['<b>Gender:</b>', patient_info.get('gender', 'N/A'),
-             '<b>Image Type:</b>', patient_info.get('image_type', 'N/A')]
+            [f'<b>{label}</b>', value, f'<b>{label2}</b>', value2]
+            for label, value, label2, value2 in layout['patient_rows']
         ]
         
         patient_table = Table(patient_data, colWidths=[1.4*inch, 2.1*inch, 1.4*inch, 2.1*inch])
-        patient_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f4f8')),
-            ('BACKGROUND', (2, 0), (2, -1), HexColor('#f0f4f8')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cccccc')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        patient_table.setStyle(PATIENT_TABLE_STYLE)
         story.extend([patient_table, Spacer(1, 0.3*inch)])
         
         # Examination Summary
-        exam_summary = report_data.get('examination_summary', 'No examination summary provided.')
         story.extend([
-            Paragraph("EXAMINATION SUMMARY", self.styles['SectionHeading']),
-            Paragraph(exam_summary, self.styles['ReportBody']),
+            self._static_paragraph(SECTION_TITLES['examination_summary'], 'SectionHeading'),
+            Paragraph(layout['examination_summary'], self.styles['ReportBody']),
             Spacer(1, 0.25*inch)
         ])
         
         # Imaging Findings Section
-        imaging = report_data.get('imaging_findings', {})
-        if imaging and imaging.get('status') == 'completed':
-            story.append(Paragraph("IMAGING FINDINGS", self.styles['SectionHeading']))
+        imaging = layout['imaging']
+        if imaging:
+            story.append(self._static_paragraph(SECTION_TITLES['imaging_findings'], 'SectionHeading'))
             
-            findings_list = imaging.get('findings', [])
-            if findings_list:
-                finding_elements = []
-                for i, finding in enumerate(findings_list, 1):
-                    # Check for critical findings
-                    is_critical = any(marker in finding.upper() for marker in ['CRITICAL', 'URGENT', 'IMMEDIATE', '⚠️'])
-                    
-                    finding_text = (f"<b><font color='red'>{i}. {finding}</font></b>" if is_critical 
-                                  else f"{i}. {finding}")
-                    
-                    finding_elements.extend([Paragraph(finding_text, self.styles['ReportBody']), Spacer(1, 0.08*inch)])
-                story.extend(finding_elements)
+            if imaging['findings']:
+                story.extend(self._numbered_findings(imaging['findings']))
             else:
-                story.append(Paragraph("No significant imaging findings reported.", self.styles['ReportBody']))
+                story.append(self._static_paragraph(EMPTY_TEXT['imaging_findings'], 'ReportBody'))
             
             # Image metadata if available
-            if imaging.get('metadata'):
-                metadata = imaging.get('metadata', {})
-                meta_lines = []
-                if metadata.get('mean_intensity'):
-                    meta_lines.append(f"Mean Intensity: {metadata.get('mean_intensity'):.2f}")
-                if metadata.get('edge_density'):
-                    meta_lines.append(f"Edge Density: {metadata.get('edge_density'):.4f}")
-                
-                if meta_lines:
-                    story.append(Spacer(1, 0.1*inch))
-                    meta_text = " | ".join(meta_lines)
-                    story.append(Paragraph(f"<i><font size=9 color='gray'>{meta_text}</font></i>", 
-                                         self.styles['Normal']))
+            if imaging['meta_text']:
+                story.append(Spacer(1, 0.1*inch))
+                story.append(Paragraph(f"<i><font size=9 color='gray'>{imaging['meta_text']}</font></i>", 
+                                     self.styles['Normal']))
             
             story.append(Spacer(1, 0.25*inch))
         
         # Laboratory Findings Section
-        lab = report_data.get('laboratory_findings', {})
-        if lab and lab.get('status') == 'completed':
-            story.append(Paragraph("LABORATORY FINDINGS", self.styles['SectionHeading']))
+        lab = layout['laboratory']
+        if lab:
+            story.append(self._static_paragraph(SECTION_TITLES['laboratory_findings'], 'SectionHeading'))
             
-            findings_list = lab.get('findings', [])
-            if findings_list:
-                lab_elements = []
-                # Create detailed lab table if we have structured data
-                if lab.get('abnormal_findings') or lab.get('critical_findings'):
-                    lab_elements.extend([Paragraph("Abnormal Results:", self.styles['ReportBody']), Spacer(1, 0.1*inch)])
-                
-                for i, finding in enumerate(findings_list, 1):
-                    is_critical = 'CRITICAL' in finding.upper() or '⚠️' in finding
-                    
-                    finding_text = (f"<b><font color='red'>{i}. {finding}</font></b>" if is_critical
-                                  else f"{i}. {finding}")
-                    
-                    lab_elements.extend([Paragraph(finding_text, self.styles['ReportBody']), Spacer(1, 0.08*inch)])
-                story.extend(lab_elements)
+            if lab['findings']:
+                if lab['show_abnormal_label']:
+                    story.extend([self._static_paragraph("Abnormal Results:", 'ReportBody'), Spacer(1, 0.1*inch)])
+                story.extend(self._numbered_findings(lab['findings']))
             else:
-                story.append(Paragraph("All laboratory values within normal limits.", self.styles['ReportBody']))
+                story.append(self._static_paragraph(EMPTY_TEXT['laboratory_findings'], 'ReportBody'))
             
             story.append(Spacer(1, 0.25*inch))
         
         # Interpretive Notes
-        story.append(Paragraph("INTERPRETIVE NOTES", self.styles['SectionHeading']))
-        notes = report_data.get('interpretive_notes', [])
-        if notes:
-            note_elements = []
-            for note in notes:
-                if note and note.strip():
-                    note_elements.extend([Paragraph(f"• {note}", self.styles['ReportBody']), Spacer(1, 0.08*inch)])
-            story.extend(note_elements)
+        story.append(self._static_paragraph(SECTION_TITLES['interpretive_notes'], 'SectionHeading'))
+        if layout['has_interpretive_notes']:
+            story.extend(self._bullets(layout['interpretive_notes']))
         else:
-            story.append(Paragraph("No additional interpretive notes.", self.styles['ReportBody']))
+            story.append(self._static_paragraph(EMPTY_TEXT['interpretive_notes'], 'ReportBody'))
         story.append(Spacer(1, 0.25*inch))
         
         # Recommendations
-        story.append(Paragraph("RECOMMENDATIONS", self.styles['SectionHeading']))
-        recommendations = report_data.get('recommendations', [])
-        if recommendations:
-            rec_elements = []
-            for rec in recommendations:
-                if rec and rec.strip():
-                    rec_elements.extend([Paragraph(f"• {rec}", self.styles['ReportBody']), Spacer(1, 0.08*inch)])
-            story.extend(rec_elements)
+        story.append(self._static_paragraph(SECTION_TITLES['recommendations'], 'SectionHeading'))
+        if layout['has_recommendations']:
+            story.extend(self._bullets(layout['recommendations']))
         else:
-            story.append(Paragraph("No specific recommendations at this time. Follow up as clinically indicated.", 
-                                 self.styles['ReportBody']))
+            story.append(self._static_paragraph(EMPTY_TEXT['recommendations'], 'ReportBody'))
         story.append(Spacer(1, 0.3*inch))
         
+        return story
+    
+    def _tail_story(self, layout: Dict[str, Any]) -> List[Any]:
+        """
+        Reviewer notes, signature and disclaimer
+        A signed report gets these on a sign-off page of its own, headed with the
+        report ID and reviewer, so approval never changes the pages before it
+        """
+        story = []
+        signature = layout['signature']
+        
+        if signature:
+            story.append(self._static_paragraph("REVIEW AND SIGN-OFF", 'SectionHeading'))
+            story.extend([
+                Paragraph(f"<b>Report ID:</b> {layout['report_id']} | "
+                          f"<b><font color='{layout['status_color']}'>Status: {layout['status']}</font></b> | "
+                          f"<b>Reviewed by:</b> {signature['name']}", self.styles['ReportBody']),
+                Spacer(1, 0.25*inch)
+            ])
+        
         # Reviewer Comments (if approved)
-        if report_data.get('reviewer_comments'):
-            story.append(Paragraph("REVIEWER NOTES", self.styles['SectionHeading']))
-            story.append(Paragraph(report_data.get('reviewer_comments'), self.styles['ReportBody']))
+        if layout['reviewer_comments']:
+            story.append(self._static_paragraph(SECTION_TITLES['reviewer_comments'], 'SectionHeading'))
+            story.append(Paragraph(layout['reviewer_comments'], self.styles['ReportBody']))
             story.append(Spacer(1, 0.3*inch))
         
         # Signature Section (if approved)
-        if status == 'APPROVED' and report_data.get('reviewer_name'):
+        if signature:
             story.append(Spacer(1, 0.2*inch))
             sig_data = [
                 ['', ''],
                 ['_________________________________', '_________________________________'],
-                [f"<b>{report_data.get('reviewer_name')}</b>", 
-                 f"<b>Date:</b> {datetime.now().strftime('%Y-%m-%d %H:%M')}"],
+                [f"<b>{signature['name']}</b>", 
+                 f"<b>Date:</b> {signature['date']}"],
                 ['Reviewing Radiologist/Physician', '']
             ]
             sig_table = Table(sig_data, colWidths=[3.5*inch, 3.5*inch])
-            sig_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ]))
+            sig_table.setStyle(SIGNATURE_TABLE_STYLE)
             story.append(sig_table)
             story.append(Spacer(1, 0.3*inch))
         
         # Disclaimer Box
         story.append(Spacer(1, 0.2*inch))
-        disclaimer_lines = report_data.get('disclaimer', [
-            '⚠️ IMPORTANT DISCLAIMER',
-            'This report has been generated with AI assistance and reviewed by a licensed medical professional.',
-            'The findings and recommendations are based on available data and should be correlated with clinical context.',
-            'This document is for medical professional use only and should not be used for self-diagnosis.',
-            'All medical decisions should be made in consultation with qualified healthcare providers.'
-        ])
-        
-        disclaimer_text = "<br/>".join([line for line in disclaimer_lines if line.strip() and '═' not in line])
-        disclaimer_para = Paragraph(f"<font size=9>{disclaimer_text}</font>", self.styles['Disclaimer'])
+        disclaimer_text = "<br/>".join(layout['disclaimer_lines'])
+        disclaimer_para = self._static_paragraph(f"<font size=9>{disclaimer_text}</font>", 'Disclaimer')
         
         disclaimer_table = Table([[disclaimer_para]], colWidths=[7*inch])
-        disclaimer_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), HexColor('#fff3cd')),
-            ('BORDER', (0, 0), (-1, -1), 1, HexColor('#ff9800')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-            ('TOPPADDING', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
+        disclaimer_table.setStyle(DISCLAIMER_TABLE_STYLE)
         story.append(disclaimer_table)
         
+        return story
+    
+    def _build(self, story: List[Any], output, page_offset: int = 0) -> int:
+        """
+        Lay out a story with the page footer; returns the number of pages
+        page_offset continues footer page numbers from pages rendered separately
+        """
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=letter,
+            rightMargin=0.75*inch,
+            leftMargin=0.75*inch,
+            topMargin=1.2*inch,
+            bottomMargin=inch
+        )
+        doc.page_offset = page_offset
+        
         # Build PDF with header and footer
         doc.build(story, 
                  onFirstPage=self._create_footer,
-                 onLaterPages=self._create_footer)
+                 onLaterPages=self._create_footer,
+                 canvasmaker=self.canvasmaker)
+        return doc.page
+    
+    def _story(self, layout: Dict[str, Any]) -> List[Any]:
+        """The whole report; a signed report's tail starts on its own page"""
+        story = self._body_story(layout)
+        if layout['signature']:
+            story.append(PageBreak())
+        story.extend(self._tail_story(layout))
+        return story
+    
+    def generate_pdf(self, report_data: Dict[str, Any], output_path: str) -> str:
+        """
+        Generate comprehensive, detailed PDF from report data
+        Returns path to generated PDF
+        """
+        # Section contents are decided once in report_layout, shared with the HTML preview
+        self._build(self._story(build_report_layout(report_data)), output_path)
+        return output_path
+    
+    def render_body_bytes(self, report_data: Dict[str, Any]) -> bytes:
+        """
+        Body pages of the report as they will appear once it is signed off
+        (status APPROVED), ready to be joined with render_tail_bytes at approval
+        """
+        layout = build_report_layout({**report_data, 'status': 'approved'})
+        buffer = io.BytesIO()
+        self._build(self._body_story(layout), buffer)
+        return buffer.getvalue()
+    
+    def render_tail_bytes(self, report_data: Dict[str, Any], page_offset: int) -> bytes:
+        """Sign-off page of an approved report, numbered after page_offset body pages"""
+        layout = build_report_layout(report_data)
+        if not layout['signature']:
+            raise ValueError("Only approved reports with a reviewer have a sign-off page")
+        buffer = io.BytesIO()
+        self._build(self._tail_story(layout), buffer, page_offset=page_offset)
+        return buffer.getvalue()
+    
+    def generate_print_run(self, reports: Iterable[Dict[str, Any]], output) -> Dict[str, Any]:
+        """
+        Lay out many reports as one document in a single doc.build pass
+        Each report starts on a new page with its own page numbering and an
+        outline entry for its patient; fonts and the page template forms are
+        shared by all of them. reports may be any iterable (e.g. a stream of
+        NDJSON records); only the report being laid out is held as flowables
+        Returns the page count and, per report, its first page and page count
+        """
+        def expand(report, index):
+            layout = build_report_layout(report)
+            patient = report.get('patient_information', {})
+            entry = {
+                'index': index,
+                'report_id': layout['report_id'],
+                'patient_id': patient.get('patient_id'),
+                'patient_name': patient.get('patient_name'),
+                'title': f"{patient.get('patient_name', 'Unknown patient')} "
+                         f"({patient.get('patient_id', 'N/A')}) - {layout['report_id']}",
+            }
+            return [_ReportStart(entry)] + self._story(layout)
+        
+        doc = _PrintRunDocTemplate(
+            output,
+            self._create_footer,
+            pagesize=letter,
+            rightMargin=0.75*inch,
+            leftMargin=0.75*inch,
+            topMargin=1.2*inch,
+            bottomMargin=inch,
+            title="Medical Diagnostic Reports"
+        )
+        doc.build([_PendingReports(iter(reports), expand)], canvasmaker=self.canvasmaker)
         
+        entries = doc.entries
+        if not entries:
+            raise ValueError("No reports to print")
+        entries[-1]['pages'] = doc.page - entries[-1]['first_page'] + 1
+        return {'reports': len(entries), 'pages': doc.page, 'entries': entries}
+    
+    def _write_atomically(self, output_path: str, build):
+        """
+        Run build(file) against a temporary file next to output_path and rename
+        it into place, so readers only ever see the previous file or the complete new one
+        """
+        directory = os.path.dirname(os.path.abspath(output_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.pdf.tmp')
+        try:
+            os.fchmod(fd, 0o644)
+            with os.fdopen(fd, 'wb') as f:
+                result = build(f)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return result
+    
+    def render_to_file(self, report_data: Dict[str, Any], output_path: str) -> str:
+        """Render to output_path atomically"""
+        self._write_atomically(output_path, lambda f: self.generate_pdf(report_data, f))
         return output_path
+    
+    def render_print_run_to_file(self, reports: Iterable[Dict[str, Any]], output_path: str) -> Dict[str, Any]:
+        """Write a print run (generate_print_run) to output_path atomically"""
+        return self._write_atomically(output_path, lambda f: self.generate_print_run(reports, f))
+    
+    def render_bytes(self, report_data: Dict[str, Any]) -> bytes:
+        """Render to an in-memory PDF, for blob storage"""
+        buffer = io.BytesIO()
+        self.generate_pdf(report_data, buffer)
+        return buffer.getvalue()
+
 
+# Shared renderer so repeated exports reuse styles and parsed static text
+_default_generator = MedicalReportPDFGenerator()
+_profile_generators = {'standard': _default_generator}
+_profile_generators_lock = threading.Lock()
 
-def export_report_to_pdf(report_data: Dict[str, Any], output_dir: str = "/tmp") -> str:
+
+def _generator_for(profile: str) -> MedicalReportPDFGenerator:
+    with _profile_generators_lock:
+        generator = _profile_generators.get(profile)
+        if generator is None:
+            generator = _profile_generators[profile] = MedicalReportPDFGenerator.for_profile(profile)
+        return generator
+
+# Rendered PDFs by content hash, so identical re-exports skip ReportLab entirely
+PDF_CACHE_DIR = os.environ.get(
+    'PDF_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../outputs/pdf-cache')
+)
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+_default_cache = PDFCache(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
+
+
+def export_report(report_data: Dict[str, Any], output_dir: str = "/tmp",
+                  cache: Optional[PDFCache] = None, profile: str = 'standard',
+                  size_budget: Optional[int] = None) -> Dict[str, Any]:
     """
-    Main entry point for PDF export
-    Returns path to generated PDF file
+    Export a report to <output_dir>/<report_id>.pdf (<report_id>.<profile>.pdf
+    for profiles other than standard), reusing a cached render of identical
+    content when there is one
+    profile selects an entry of OUTPUT_PROFILES; size_budget (bytes) overrides
+    the profile's budget
+    Returns pdf_path, content_hash, sha256 (of the file, for integrity checks),
+    bytes, whether the cache was used, the profile, its size budget and
+    whether the file fits it (None when there is no budget)
+    A cached PDF keeps the signature date of its first render
     """
-    generator = MedicalReportPDFGenerator()
+    generator = _generator_for(profile)
+    if size_budget is None:
+        size_budget = OUTPUT_PROFILES[profile]['size_budget']
+    cache = cache or _default_cache
     
-    # Generate filename
+    # Generate filename; other profiles get their own file beside the standard one
     report_id = report_data.get('report_id', 'report')
-    filename = f"{report_id}.pdf"
+    filename = f"{report_id}.pdf" if profile == 'standard' else f"{report_id}.{profile}.pdf"
     output_path = os.path.join(output_dir, filename)
     
-    # Generate PDF
-    pdf_path = generator.generate_pdf(report_data, output_path)
+    key = content_hash(report_data, profile=profile)
+    sha256 = cache.get(key, output_path)
+    cached = sha256 is not None
+    if not cached:
+        generator.render_to_file(report_data, output_path)
+        sha256 = cache.put(key, output_path)
     
-    return pdf_path
+    size = os.path.getsize(output_path)
+    return {
+        'pdf_path': output_path,
+        'content_hash': key,
+        'sha256': sha256,
+        'bytes': size,
+        'cached': cached,
+        'profile': profile,
+        'size_budget': size_budget,
+        'within_budget': size <= size_budget if size_budget is not None else None
+    }
+
+
+# Rendered PDFs for download, content-addressed so any replica can find them
+PDF_BLOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../outputs/pdf-blobs')
+_default_store = blob_store_from_env(PDF_BLOB_DIR)
+
+
+def _body_key(report_data: Dict[str, Any]) -> str:
+    return f"body-{body_hash(report_data)}.pdf"
+
+
+def _join_pdfs(*readers) -> bytes:
+    """Concatenate PDFs (pypdf readers) page by page"""
+    writer = PdfWriter()
+    for reader in readers:
+        writer.append(reader)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def prerender_body_to_store(report_data: Dict[str, Any],
+                            store: Optional[BlobStore] = None) -> Dict[str, Any]:
+    """
+    Render a draft's body pages into the blob store ahead of approval
+    Returns blob_key, bytes and whether an identical body was already stored
+    """
+    store = store or _default_store
+    blob_key = _body_key(report_data)
+    if store.exists(blob_key):
+        return {'blob_key': blob_key, 'bytes': store.size(blob_key), 'cached': True}
+    
+    pdf_bytes = _default_generator.render_body_bytes(report_data)
+    store.put(blob_key, pdf_bytes)
+    return {'blob_key': blob_key, 'bytes': len(pdf_bytes), 'cached': False}
+
+
+def export_report_to_store(report_data: Dict[str, Any],
+                           store: Optional[BlobStore] = None) -> Dict[str, Any]:
+    """
+    Render a report in memory into the blob store under <content hash>.pdf
+    Identical content already in the store is not rendered again. A signed
+    report whose body was pre-rendered (prerender_body_to_store) only has its
+    sign-off page rendered; edits to the body fall back to a full render
+    Returns blob_key, content_hash, sha256, bytes, whether the stored blob was
+    reused and how it was produced (render: cached, body or full)
+    """
+    store = store or _default_store
+    key = content_hash(report_data)
+    blob_key = f"{key}.pdf"
+    
+    render = 'cached'
+    if store.exists(blob_key):
+        pdf_bytes = store.get(blob_key)
+    else:
+        body = None
+        layout_signed = build_report_layout(report_data)['signature'] is not None
+        if layout_signed and PdfReader is not None:
+            try:
+                body = store.get(_body_key(report_data))
+            except KeyError:
+                # BlobNotFoundError; caught as KeyError since steps load their own copy of blob_store
+                body = None
+        
+        if body is not None:
+            body_reader = PdfReader(io.BytesIO(body))
+            tail = _default_generator.render_tail_bytes(report_data, page_offset=len(body_reader.pages))
+            pdf_bytes = _join_pdfs(body_reader, PdfReader(io.BytesIO(tail)))
+            render = 'body'
+        else:
+            pdf_bytes = _default_generator.render_bytes(report_data)
+            render = 'full'
+        store.put(blob_key, pdf_bytes)
+    
+    return {
+        'blob_key': blob_key,
+        'content_hash': key,
+        'sha256': hashlib.sha256(pdf_bytes).hexdigest(),
+        'bytes': len(pdf_bytes),
+        'cached': render == 'cached',
+        'render': render
+    }
+
+
+def export_report_to_pdf(report_data: Dict[str, Any], output_dir: str = "/tmp",
+                         profile: str = 'standard') -> str:
+    """
+    Main entry point for PDF export
+    Use profile='compact' for PDFs that are archived or emailed
+    Returns path to generated PDF file
+    """
+    return export_report(report_data, output_dir, profile=profile)['pdf_path']
 
 
 if __name__ == "__main__":
+    import sys
+    import json
+    
     # Test PDF generation
     test_report = {
         'report_id': 'RPT-TEST-001',
@@ -441,5 +900,51 @@ if __name__ == "__main__":
         'disclaimer': ['This is a test disclaimer']
     }
     
-    pdf_path = export_report_to_pdf(test_report)
-    print(f"PDF generated: {pdf_path}")
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        # Per-PDF latency: a fresh generator per call vs the shared renderer
+        # Usage: python pdf_generator.py --benchmark [runs] [report.json]
+        import io
+        import time
+        
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+        if len(sys.argv) > 3:
+            with open(sys.argv[3]) as f:
+                test_report = json.load(f)
+        
+        def fresh():
+            MedicalReportPDFGenerator().generate_pdf(test_report, io.BytesIO())
+        
+        def shared():
+            _default_generator.generate_pdf(test_report, io.BytesIO())
+        
+        for label, render in (('fresh generator per PDF', fresh), ('shared renderer', shared)):
+            render()
+            started = time.perf_counter()
+            for _ in range(runs):
+                render()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+            print(f"{label:24} {elapsed_ms:8.2f} ms per PDF ({runs} runs)")
+        
+        # Page template drawn on every page vs once per document as form XObjects,
+        # on the report above and on a long one (findings repeated to fill ~40 pages)
+        long_report = dict(test_report)
+        for section in ('imaging_findings', 'laboratory_findings'):
+            findings = (test_report.get(section) or {}).get('findings') or ['Finding']
+            long_report[section] = {**test_report.get(section, {}), 'status': 'completed',
+                                    'findings': (findings * (300 // len(findings) + 1))[:300]}
+        
+        print()
+        for report_label, report in (('report', test_report), ('long report', long_report)):
+            for label, page_forms in (('per-page drawing', False), ('form XObjects', True)):
+                generator = MedicalReportPDFGenerator(page_forms=page_forms)
+                output = io.BytesIO()
+                pages = generator._build(generator._story(build_report_layout(report)), output)
+                started = time.perf_counter()
+                for _ in range(runs):
+                    generator.generate_pdf(report, io.BytesIO())
+                elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+                print(f"{report_label:12} {label:17} {elapsed_ms:8.2f} ms per PDF "
+                      f"{len(output.getvalue()):8} bytes {pages:4} pages")
+    else:
+        pdf_path = export_report_to_pdf(test_report)
+        print(f"PDF generated: {pdf_path}")
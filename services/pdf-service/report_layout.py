@@ -0,0 +1,125 @@
+"""
+Report Layout
+Section order, titles and content decisions shared by the PDF and HTML renderers
+"""
+
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+SECTION_TITLES = {
+    'patient_information': "PATIENT INFORMATION",
+    'examination_summary': "EXAMINATION SUMMARY",
+    'imaging_findings': "IMAGING FINDINGS",
+    'laboratory_findings': "LABORATORY FINDINGS",
+    'interpretive_notes': "INTERPRETIVE NOTES",
+    'recommendations': "RECOMMENDATIONS",
+    'reviewer_comments': "REVIEWER NOTES",
+}
+
+REPORT_TITLE = "MEDICAL DIAGNOSTIC REPORT"
+
+STATUS_COLORS = {'APPROVED': '#22c55e'}
+DEFAULT_STATUS_COLOR = '#f59e0b'
+
+EMPTY_TEXT = {
+    'examination_summary': "No examination summary provided.",
+    'imaging_findings': "No significant imaging findings reported.",
+    'laboratory_findings': "All laboratory values within normal limits.",
+    'interpretive_notes': "No additional interpretive notes.",
+    'recommendations': "No specific recommendations at this time. Follow up as clinically indicated.",
+}
+
+DEFAULT_DISCLAIMER = [
+    '⚠️ IMPORTANT DISCLAIMER',
+    'This report has been generated with AI assistance and reviewed by a licensed medical professional.',
+    'The findings and recommendations are based on available data and should be correlated with clinical context.',
+    'This document is for medical professional use only and should not be used for self-diagnosis.',
+    'All medical decisions should be made in consultation with qualified healthcare providers.'
+]
+
+IMAGING_CRITICAL_MARKERS = ('CRITICAL', 'URGENT', 'IMMEDIATE', '⚠️')
+
+# (number, text, is_critical)
+Finding = Tuple[int, str, bool]
+
+
+def _imaging_section(imaging: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not imaging or imaging.get('status') != 'completed':
+        return None
+
+    findings: List[Finding] = [
+        (i, finding, any(marker in finding.upper() for marker in IMAGING_CRITICAL_MARKERS))
+        for i, finding in enumerate(imaging.get('findings', []), 1)
+    ]
+
+    meta_text = None
+    metadata = imaging.get('metadata') or {}
+    meta_lines = []
+    if metadata.get('mean_intensity'):
+        meta_lines.append(f"Mean Intensity: {metadata.get('mean_intensity'):.2f}")
+    if metadata.get('edge_density'):
+        meta_lines.append(f"Edge Density: {metadata.get('edge_density'):.4f}")
+    if meta_lines:
+        meta_text = " | ".join(meta_lines)
+
+    return {'findings': findings, 'meta_text': meta_text}
+
+
+def _laboratory_section(lab: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not lab or lab.get('status') != 'completed':
+        return None
+
+    findings: List[Finding] = [
+        (i, finding, 'CRITICAL' in finding.upper() or '⚠️' in finding)
+        for i, finding in enumerate(lab.get('findings', []), 1)
+    ]
+    return {
+        'findings': findings,
+        'show_abnormal_label': bool(findings) and bool(lab.get('abnormal_findings') or lab.get('critical_findings'))
+    }
+
+
+def build_report_layout(report_data: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Everything a renderer needs, in display order, as plain values
+    Renderers only decide how each piece looks, never what is shown
+    """
+    status = report_data.get('status', 'DRAFT').upper()
+    patient_info = report_data.get('patient_information', {})
+    reviewer_name = report_data.get('reviewer_name')
+
+    signature = None
+    if status == 'APPROVED' and reviewer_name:
+        signature = {
+            'name': reviewer_name,
+            'date': (now or datetime.now()).strftime('%Y-%m-%d %H:%M')
+        }
+
+    disclaimer_lines = report_data.get('disclaimer', DEFAULT_DISCLAIMER)
+
+    return {
+        'title': REPORT_TITLE,
+        'report_id': report_data.get('report_id', 'N/A'),
+        'status': status,
+        'status_color': STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR),
+        'reviewer_name': reviewer_name,
+        'patient_rows': [
+            ('Patient ID:', patient_info.get('patient_id', 'N/A'),
+             'Study Date:', patient_info.get('study_date', 'N/A')),
+            ('Patient Name:', patient_info.get('patient_name', 'N/A'),
+             'Age:', str(patient_info.get('age', 'N/A'))),
+            ('Gender:', patient_info.get('gender', 'N/A'),
+             'Image Type:', patient_info.get('image_type', 'N/A')),
+        ],
+        'examination_summary': report_data.get('examination_summary', EMPTY_TEXT['examination_summary']),
+        'imaging': _imaging_section(report_data.get('imaging_findings', {})),
+        'laboratory': _laboratory_section(report_data.get('laboratory_findings', {})),
+        'interpretive_notes': [note for note in report_data.get('interpretive_notes', []) if note and note.strip()],
+        'has_interpretive_notes': bool(report_data.get('interpretive_notes', [])),
+        'recommendations': [rec for rec in report_data.get('recommendations', []) if rec and rec.strip()],
+        'has_recommendations': bool(report_data.get('recommendations', [])),
+        'reviewer_comments': report_data.get('reviewer_comments'),
+        'signature': signature,
+        # Rule lines ('═' * 80) are decoration in the text report only
+        'disclaimer_lines': [line for line in disclaimer_lines if line.strip() and '═' not in line],
+    }
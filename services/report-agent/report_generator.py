@@ -3,15 +3,83 @@ Medical Report Generation Service
 Template-based report generation from imaging and lab results
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
+from collections import OrderedDict
 from datetime import datetime
+import copy
+import hashlib
 import json
+import os
+import threading
+
+try:
+    from report_ids import new_report_id
+    from report_stream import assemble_report, SECTION_ORDER
+except ImportError:
+    # Loaded by file path from a Motia step; load the sibling modules the same way
+    import importlib.util
+
+    def _load_sibling(name):
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{name}.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    new_report_id = _load_sibling('report_ids').new_report_id
+    _report_stream = _load_sibling('report_stream')
+    assemble_report = _report_stream.assemble_report
+    SECTION_ORDER = _report_stream.SECTION_ORDER
+
+# Number of generated sections kept for reuse across report regenerations
+SECTION_CACHE_SIZE = 512
+
+def hash_input(data: Any) -> str:
+    """Stable content hash of a section input (key order does not matter)"""
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
 
 class MedicalReportGenerator:
     """Generate structured medical diagnostic reports"""
     
-    def __init__(self):
+    def __init__(self, section_cache_size: int = SECTION_CACHE_SIZE):
         self.report_version = "1.0.0"
+        self.section_cache_size = section_cache_size
+        self._section_cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._section_cache_lock = threading.Lock()
+    
+    def _cached_section(self, name: str, key: Tuple, build: Callable[[], Any],
+                        hit_report: Dict[str, str], copy_result: bool = True) -> Any:
+        """
+        Return a section from the cache, building it only when its inputs changed
+        Records 'hit' or 'miss' for the section in hit_report
+        copy_result=False hands out the cached object; the caller must not modify it
+        """
+        cache_key = (name, self.report_version) + key
+        with self._section_cache_lock:
+            section = self._section_cache.get(cache_key)
+            if section is not None:
+                self._section_cache.move_to_end(cache_key)
+        
+        if section is None:
+            hit_report[name] = 'miss'
+            section = build()
+            if self.section_cache_size > 0:
+                with self._section_cache_lock:
+                    self._section_cache[cache_key] = section
+                    while len(self._section_cache) > self.section_cache_size:
+                        self._section_cache.popitem(last=False)
+        else:
+            hit_report[name] = 'hit'
+        
+        # Callers may edit the report, so never hand out the cached object itself
+        return copy.deepcopy(section) if copy_result else section
+    
+    def clear_section_cache(self):
+        """Drop all memoized sections"""
+        with self._section_cache_lock:
+            self._section_cache.clear()
     
     def generate_patient_info_section(self, patient_data: Dict[str, Any]) -> Dict[str, str]:
         """Generate patient information section"""
@@ -48,107 +116,122 @@ class MedicalReportGenerator:
         
         return ' '.join(summary_parts) if summary_parts else 'Examination data pending.'
     
-    def generate_imaging_findings(self, imaging_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate imaging findings section"""
+    def imaging_findings_fields(self, imaging_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Imaging findings section without its lines"""
         if not imaging_data or imaging_data.get('status') != 'success':
-            return {
-                'status': 'pending',
-                'findings': ['Imaging analysis pending or unavailable.']
-            }
+            return {'status': 'pending'}
         
-        findings = []
-        observations = imaging_data.get('observations', [])
+        return {
+            'status': 'completed',
+            'image_type': imaging_data.get('image_type', 'diagnostic').upper(),
+            'observations_count': len(imaging_data.get('observations', []))
+        }
+    
+    def iter_imaging_findings(self, imaging_data: Dict[str, Any]) -> Iterator[str]:
+        """Imaging findings lines, one at a time"""
+        if not imaging_data or imaging_data.get('status') != 'success':
+            yield 'Imaging analysis pending or unavailable.'
+            return
         
         # Add header
         image_type = imaging_data.get('image_type', 'diagnostic').upper()
-        findings.append(f"{image_type} EXAMINATION:")
-        findings.append("")
+        yield f"{image_type} EXAMINATION:"
+        yield ""
         
         # Add observations
-        for idx, obs in enumerate(observations, 1):
-            findings.append(f"{idx}. {obs}")
+        for idx, obs in enumerate(imaging_data.get('observations', []), 1):
+            yield f"{idx}. {obs}"
         
         # Add technical details
         dimensions = imaging_data.get('image_dimensions', {})
         if dimensions:
-            findings.append("")
-            findings.append(f"Technical details: Image resolution {dimensions.get('width')}×{dimensions.get('height')} pixels.")
+            yield ""
+            yield f"Technical details: Image resolution {dimensions.get('width')}×{dimensions.get('height')} pixels."
+    
+    def generate_imaging_findings(self, imaging_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate imaging findings section"""
+        section = self.imaging_findings_fields(imaging_data)
+        section['findings'] = list(self.iter_imaging_findings(imaging_data))
+        return section
+    
+    def laboratory_findings_fields(self, lab_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Laboratory findings section without its lines"""
+        if not lab_data or lab_data.get('status') != 'success':
+            return {'status': 'pending'}
         
         return {
             'status': 'completed',
-            'image_type': image_type,
-            'findings': findings,
-            'observations_count': len(observations)
+            'abnormal_count': len(lab_data.get('abnormal_findings', [])),
+            'critical_count': len(lab_data.get('critical_findings', []))
         }
     
-    def generate_laboratory_findings(self, lab_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate laboratory findings section"""
+    def iter_laboratory_findings(self, lab_data: Dict[str, Any]) -> Iterator[str]:
+        """Laboratory findings lines, one at a time (one per result for large panels)"""
         if not lab_data or lab_data.get('status') != 'success':
-            return {
-                'status': 'pending',
-                'findings': ['Laboratory analysis pending or unavailable.']
-            }
+            yield 'Laboratory analysis pending or unavailable.'
+            return
         
-        findings = []
-        findings.append("LABORATORY RESULTS:")
-        findings.append("")
+        yield "LABORATORY RESULTS:"
+        yield ""
         
         # Summary
         summary_text = lab_data.get('summary_text', '')
         if summary_text:
-            findings.append(f"Summary: {summary_text}")
-            findings.append("")
+            yield f"Summary: {summary_text}"
+            yield ""
         
         # All results
-        findings.append("Detailed Results:")
-        results = lab_data.get('results', [])
-        for result in results:
+        yield "Detailed Results:"
+        for result in lab_data.get('results', []):
             test_name = result.get('test_name')
             value = result.get('value')
             unit = result.get('unit')
             ref_range = result.get('reference_range')
             flag = result.get('flag', '')
             
-            findings.append(
-                f"  {flag} {test_name}: {value} {unit} (Reference: {ref_range})"
-            )
+            yield f"  {flag} {test_name}: {value} {unit} (Reference: {ref_range})"
         
         # Highlight abnormal findings
         abnormal = lab_data.get('abnormal_findings', [])
         critical = lab_data.get('critical_findings', [])
         
         if critical:
-            findings.append("")
-            findings.append("CRITICAL VALUES:")
+            yield ""
+            yield "CRITICAL VALUES:"
             for result in critical:
-                findings.append(f"  • {result.get('test_name')}: {result.get('interpretation')}")
+                yield f"  • {result.get('test_name')}: {result.get('interpretation')}"
         
         if abnormal and not critical:
-            findings.append("")
-            findings.append("ABNORMAL VALUES:")
+            yield ""
+            yield "ABNORMAL VALUES:"
             for result in abnormal:
-                findings.append(f"  • {result.get('test_name')}: {result.get('interpretation')}")
-        
-        return {
-            'status': 'completed',
-            'findings': findings,
-            'abnormal_count': len(abnormal),
-            'critical_count': len(critical)
-        }
+                yield f"  • {result.get('test_name')}: {result.get('interpretation')}"
+
+        # Significant changes since the patient's previous panels
+        delta_alerts = (lab_data.get('trend_analysis') or {}).get('delta_alerts', [])
+        if delta_alerts:
+            yield ""
+            yield "DELTA CHECKS:"
+            for trend in delta_alerts:
+                yield f"  • {trend.get('test_name')}: {trend.get('interpretation')}"
     
-    def generate_interpretive_notes(self, imaging_data: Dict[str, Any], 
-                                   lab_data: Dict[str, Any]) -> List[str]:
-        """Generate interpretive notes (non-diagnostic)"""
-        notes = []
-        
-        notes.append("INTERPRETIVE NOTES:")
-        notes.append("")
+    def generate_laboratory_findings(self, lab_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate laboratory findings section"""
+        section = self.laboratory_findings_fields(lab_data)
+        section['findings'] = list(self.iter_laboratory_findings(lab_data))
+        return section
+    
+    def iter_interpretive_notes(self, imaging_data: Dict[str, Any], 
+                                lab_data: Dict[str, Any]) -> Iterator[str]:
+        """Interpretive notes lines (non-diagnostic)"""
+        yield "INTERPRETIVE NOTES:"
+        yield ""
         
         # Check for critical findings
         has_critical = False
         if lab_data and lab_data.get('critical_findings'):
             has_critical = True
-            notes.append("• Critical laboratory values identified requiring immediate clinical attention.")
+            yield "• Critical laboratory values identified requiring immediate clinical attention."
         
         # General interpretation guidance
         has_abnormal_imaging = (imaging_data and 
@@ -160,44 +243,48 @@ class MedicalReportGenerator:
                             lab_data.get('abnormal_count', 0) > 0)
         
         if has_abnormal_imaging:
-            notes.append("• Imaging findings noted require radiologist review and clinical correlation.")
+            yield "• Imaging findings noted require radiologist review and clinical correlation."
         
         if has_abnormal_labs:
-            notes.append("• Laboratory abnormalities require clinical correlation with patient presentation.")
+            yield "• Laboratory abnormalities require clinical correlation with patient presentation."
         
         if not has_critical and not has_abnormal_imaging and not has_abnormal_labs:
-            notes.append("• Examination findings within expected parameters.")
-            notes.append("• Routine clinical follow-up as appropriate.")
+            yield "• Examination findings within expected parameters."
+            yield "• Routine clinical follow-up as appropriate."
         else:
-            notes.append("• Comprehensive clinical assessment recommended.")
-        
-        notes.append("• These findings are AI-generated and require expert medical review.")
+            yield "• Comprehensive clinical assessment recommended."
         
-        return notes
+        yield "• These findings are AI-generated and require expert medical review."
     
-    def generate_recommendations(self, imaging_data: Dict[str, Any], 
-                                lab_data: Dict[str, Any]) -> List[str]:
-        """Generate recommendations (non-prescriptive)"""
-        recommendations = []
-        
-        recommendations.append("RECOMMENDATIONS:")
-        recommendations.append("")
+    def generate_interpretive_notes(self, imaging_data: Dict[str, Any], 
+                                   lab_data: Dict[str, Any]) -> List[str]:
+        """Generate interpretive notes (non-diagnostic)"""
+        return list(self.iter_interpretive_notes(imaging_data, lab_data))
+    
+    def iter_recommendations(self, imaging_data: Dict[str, Any], 
+                             lab_data: Dict[str, Any]) -> Iterator[str]:
+        """Recommendation lines (non-prescriptive)"""
+        yield "RECOMMENDATIONS:"
+        yield ""
         
         # Check severity
         has_critical = lab_data and lab_data.get('critical_findings')
         
         if has_critical:
-            recommendations.append("1. Immediate physician review recommended for critical values.")
-            recommendations.append("2. Clinical correlation with patient symptoms and history.")
-            recommendations.append("3. Consider repeat testing if clinically indicated.")
+            yield "1. Immediate physician review recommended for critical values."
+            yield "2. Clinical correlation with patient symptoms and history."
+            yield "3. Consider repeat testing if clinically indicated."
         else:
-            recommendations.append("1. Radiologist review and interpretation required.")
-            recommendations.append("2. Clinical correlation with patient presentation recommended.")
-            recommendations.append("3. Follow-up imaging or laboratory studies as clinically indicated.")
-        
-        recommendations.append("4. All findings should be interpreted in the context of complete patient evaluation.")
+            yield "1. Radiologist review and interpretation required."
+            yield "2. Clinical correlation with patient presentation recommended."
+            yield "3. Follow-up imaging or laboratory studies as clinically indicated."
         
-        return recommendations
+        yield "4. All findings should be interpreted in the context of complete patient evaluation."
+    
+    def generate_recommendations(self, imaging_data: Dict[str, Any], 
+                                lab_data: Dict[str, Any]) -> List[str]:
+        """Generate recommendations (non-prescriptive)"""
+        return list(self.iter_recommendations(imaging_data, lab_data))
     
     def generate_disclaimer(self) -> List[str]:
         """Generate medical disclaimer"""
@@ -220,46 +307,131 @@ class MedicalReportGenerator:
             "═" * 80
         ]
     
-    def generate_complete_report(self, 
-                                patient_data: Dict[str, Any],
-                                imaging_data: Optional[Dict[str, Any]] = None,
-                                lab_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _line_section(self, name: str, key: Optional[Tuple], build: Callable[[], Any],
+                      fields: Optional[Callable[[], Dict[str, Any]]], lines: Callable[[], Iterable[str]],
+                      hit_report: Dict[str, str]) -> Iterator[Dict[str, Any]]:
         """
-        Generate complete structured medical report
+        Events for a findings or list section
+        With a cache key the section is built (or reused) whole; without one
+        its lines are streamed straight from the generator
+        """
+        if key is not None:
+            # Lines are immutable strings and the fields are copied below,
+            # so the cached section itself is never handed out
+            section = self._cached_section(name, key, build, hit_report, copy_result=False)
+            if isinstance(section, dict):
+                section_fields = {k: v for k, v in section.items() if k != 'findings'}
+                section_lines = section['findings']
+            else:
+                section_fields, section_lines = None, section
+        else:
+            section_fields = fields() if fields else None
+            section_lines = lines()
+        
+        header = {'event': 'section', 'section': name}
+        if section_fields is not None:
+            header['fields'] = section_fields
+        yield header
+        for text in section_lines:
+            yield {'event': 'line', 'section': name, 'text': text}
+    
+    def iter_report(self,
+                    patient_data: Dict[str, Any],
+                    imaging_data: Optional[Dict[str, Any]] = None,
+                    lab_data: Optional[Dict[str, Any]] = None,
+                    use_cache: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Generate the report as a stream of events (see report_stream), section by section
+        Nothing is held beyond the current line unless use_cache is set, in which
+        case sections go through the section cache like generate_complete_report
         """
-        # Generate all sections
-        patient_info = self.generate_patient_info_section(patient_data)
-        examination_summary = self.generate_examination_summary(imaging_data or {}, lab_data or {})
-        imaging_findings = self.generate_imaging_findings(imaging_data or {})
-        lab_findings = self.generate_laboratory_findings(lab_data or {})
-        interpretive_notes = self.generate_interpretive_notes(imaging_data or {}, lab_data or {})
-        recommendations = self.generate_recommendations(imaging_data or {}, lab_data or {})
-        disclaimer = self.generate_disclaimer()
-        
-        # Compile report
-        report = {
-            'report_id': f"RPT-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+        imaging = imaging_data or {}
+        labs = lab_data or {}
+        hit_report: Dict[str, str] = {}
+        
+        keys: Dict[str, Optional[Tuple]] = dict.fromkeys(SECTION_ORDER)
+        if use_cache:
+            # Hash each input once; a section's key is the hashes of what it reads
+            patient_hash = hash_input(patient_data)
+            imaging_hash = hash_input(imaging)
+            lab_hash = hash_input(labs)
+            # Patient info falls back to today's date when study_date is missing
+            today = datetime.now().strftime('%Y-%m-%d')
+            keys.update({
+                'patient_information': (patient_hash, today),
+                'examination_summary': (imaging_hash, lab_hash),
+                'imaging_findings': (imaging_hash,),
+                'laboratory_findings': (lab_hash,),
+                'interpretive_notes': (imaging_hash, lab_hash),
+                'recommendations': (imaging_hash, lab_hash),
+            })
+        
+        def value_section(name: str, build: Callable[[], Any]) -> Dict[str, Any]:
+            value = self._cached_section(name, keys[name], build, hit_report) if keys[name] else build()
+            return {'event': 'section', 'section': name, 'value': value}
+        
+        yield {
+            'event': 'report',
+            'report_id': new_report_id(),
             'generated_date': datetime.now().isoformat(),
             'report_version': self.report_version,
             'status': 'draft',
             'requires_approval': True,
-            
-            'patient_information': patient_info,
-            'examination_summary': examination_summary,
-            'imaging_findings': imaging_findings,
-            'laboratory_findings': lab_findings,
-            'interpretive_notes': interpretive_notes,
-            'recommendations': recommendations,
-            'disclaimer': disclaimer,
-            
+        }
+        
+        yield value_section('patient_information',
+                            lambda: self.generate_patient_info_section(patient_data))
+        yield value_section('examination_summary',
+                            lambda: self.generate_examination_summary(imaging, labs))
+        yield from self._line_section(
+            'imaging_findings', keys['imaging_findings'],
+            lambda: self.generate_imaging_findings(imaging),
+            lambda: self.imaging_findings_fields(imaging),
+            lambda: self.iter_imaging_findings(imaging), hit_report)
+        yield from self._line_section(
+            'laboratory_findings', keys['laboratory_findings'],
+            lambda: self.generate_laboratory_findings(labs),
+            lambda: self.laboratory_findings_fields(labs),
+            lambda: self.iter_laboratory_findings(labs), hit_report)
+        yield from self._line_section(
+            'interpretive_notes', keys['interpretive_notes'],
+            lambda: self.generate_interpretive_notes(imaging, labs), None,
+            lambda: self.iter_interpretive_notes(imaging, labs), hit_report)
+        yield from self._line_section(
+            'recommendations', keys['recommendations'],
+            lambda: self.generate_recommendations(imaging, labs), None,
+            lambda: self.iter_recommendations(imaging, labs), hit_report)
+        yield from self._line_section(
+            'disclaimer', None, self.generate_disclaimer, None,
+            self.generate_disclaimer, hit_report)
+        
+        yield {
+            'event': 'end',
             'metadata': {
                 'has_imaging': imaging_data is not None,
                 'has_labs': lab_data is not None,
-                'requires_urgent_review': (lab_data and lab_data.get('critical_findings', [])) is not None
+                'requires_urgent_review': (lab_data and lab_data.get('critical_findings', [])) is not None,
+                'section_cache': {
+                    'sections': hit_report,
+                    'hits': sum(1 for status in hit_report.values() if status == 'hit'),
+                    'misses': sum(1 for status in hit_report.values() if status == 'miss')
+                }
             }
         }
-        
-        return report
+    
+    def generate_complete_report(self, 
+                                patient_data: Dict[str, Any],
+                                imaging_data: Optional[Dict[str, Any]] = None,
+                                lab_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Generate complete structured medical report
+        Sections whose inputs are unchanged since a previous call are reused
+        """
+        return assemble_report(self.iter_report(patient_data, imaging_data, lab_data, use_cache=True))
+
+
+# Shared across calls so the section cache survives between reports
+_default_generator = MedicalReportGenerator()
 
 
 def generate_medical_report(patient_data: Dict[str, Any],
@@ -267,9 +439,9 @@ def generate_medical_report(patient_data: Dict[str, Any],
                            lab_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Main entry point for report generation
+    Uses a shared generator so repeated calls reuse unchanged sections
     """
-    generator = MedicalReportGenerator()
-    return generator.generate_complete_report(patient_data, imaging_data, lab_data)
+    return _default_generator.generate_complete_report(patient_data, imaging_data, lab_data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+"""
+Report and Session Identifiers
+Time-sortable, collision-free IDs (ULID layout) for reports, sessions and jobs
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+import itertools
+import os
+import time
+
+# Crockford base32, as used by ULID (no I, L, O, U)
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_DECODE = {char: index for index, char in enumerate(ALPHABET)}
+
+ULID_LENGTH = 26
+REPORT_PREFIX = 'RPT-'
+SESSION_PREFIX = 'SESSION-'
+JOB_PREFIX = 'JOB-'
+
+# 128 bits = 48-bit millisecond timestamp + 32-bit process tag + 48-bit counter.
+# The random tag keeps processes apart; the counter keeps IDs from one process
+# unique and increasing without a lock (itertools.count is atomic under the GIL).
+_TAG_BITS = 32
+_COUNTER_BITS = 48
+_COUNTER_MASK = (1 << _COUNTER_BITS) - 1
+
+_process_tag = 0
+_counter = itertools.count()
+_last_ms = 0
+
+
+def _reseed():
+    """Fresh tag and counter; also runs in forked children"""
+    global _process_tag, _counter, _last_ms
+    _process_tag = int.from_bytes(os.urandom(_TAG_BITS // 8), 'big')
+    # Random start so the counter itself carries no process information
+    _counter = itertools.count(int.from_bytes(os.urandom(4), 'big'))
+    _last_ms = 0
+
+
+_reseed()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed)
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(ULID_LENGTH):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def new_ulid() -> str:
+    """
+    26-character ID that sorts by creation time
+    Consecutive IDs from one thread are strictly increasing, even within a millisecond
+    """
+    global _last_ms
+    # Never step back in time, so a clock adjustment cannot break ordering
+    now_ms = max(time.time_ns() // 1_000_000, _last_ms)
+    _last_ms = now_ms
+    count = next(_counter) & _COUNTER_MASK
+    return _encode((now_ms << 80) | (_process_tag << _COUNTER_BITS) | count)
+
+
+def new_report_id() -> str:
+    """Report ID, e.g. RPT-01JF3Z6Q1M7W9X2K4T8B5N0C3D"""
+    return REPORT_PREFIX + new_ulid()
+
+
+def new_session_id() -> str:
+    """Session ID, e.g. SESSION-01JF3Z6Q1M7W9X2K4T8B5N0C3D"""
+    return SESSION_PREFIX + new_ulid()
+
+
+def new_job_id() -> str:
+    """Background job ID, e.g. JOB-01JF3Z6Q1M7W9X2K4T8B5N0C3D"""
+    return JOB_PREFIX + new_ulid()
+
+
+def _ulid_part(identifier: str) -> Optional[str]:
+    tail = identifier.rsplit('-', 1)[-1].upper()
+    if len(tail) != ULID_LENGTH or any(char not in _DECODE for char in tail):
+        return None
+    return tail
+
+
+def id_timestamp(identifier: str) -> Optional[datetime]:
+    """
+    Creation time of a report/session ID (UTC)
+    Returns None for legacy IDs that are not ULID based
+    """
+    ulid = _ulid_part(identifier)
+    if ulid is None:
+        return None
+    value = 0
+    for char in ulid[:10]:
+        value = value * 32 + _DECODE[char]
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def ulid_floor(moment: datetime) -> str:
+    """
+    Smallest ULID created at or after `moment`
+    Use with a prefix for range scans, e.g. REPORT_PREFIX + ulid_floor(start)
+    """
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return _encode(int(moment.timestamp() * 1000) << 80)
@@ -0,0 +1,230 @@
+"""
+Report Patch Service
+Store reviewer edits as a JSON Patch against the draft and rebuild the final report
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from difflib import SequenceMatcher
+import copy
+import hashlib
+import json
+import threading
+
+PATCH_FORMAT = "json-patch/1"
+
+# Reconstructed final reports kept per process
+RECONSTRUCTION_CACHE_SIZE = 64
+
+class PatchError(ValueError):
+    """Patch does not apply to the given base report"""
+
+
+def report_hash(report: Dict[str, Any]) -> str:
+    """Content hash identifying the exact draft a patch was made against"""
+    payload = json.dumps(report, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _escape(token: Any) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _diff(base: Any, target: Any, path: str, ops: List[Dict[str, Any]]):
+    if type(base) is not type(target):
+        ops.append({'op': 'replace', 'path': path, 'value': target})
+    elif isinstance(base, dict):
+        for key in base:
+            child = f"{path}/{_escape(key)}"
+            if key not in target:
+                ops.append({'op': 'remove', 'path': child})
+            else:
+                _diff(base[key], target[key], child, ops)
+        for key in target:
+            if key not in base:
+                ops.append({'op': 'add', 'path': f"{path}/{_escape(key)}", 'value': target[key]})
+    elif isinstance(base, list):
+        _diff_list(base, target, path, ops)
+    elif base != target:
+        ops.append({'op': 'replace', 'path': path, 'value': target})
+
+
+def _diff_list(base: list, target: list, path: str, ops: List[Dict[str, Any]]):
+    """
+    Line-level edits for lists such as findings: matching runs are skipped and
+    only replaced, inserted or removed lines produce operations
+    """
+    try:
+        opcodes = SequenceMatcher(None, base, target, autojunk=False).get_opcodes()
+    except TypeError:
+        # Unhashable items (lists of dicts): compare position by position
+        opcodes = [('replace', 0, len(base), 0, len(target))]
+
+    # Operations are applied in order, so after each opcode the document
+    # matches target up to j2 and positions are target indexes
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        for offset in range(paired):
+            _diff(base[i1 + offset], target[j1 + offset], f"{path}/{j1 + offset}", ops)
+        for index in range(j1 + paired, j2):
+            ops.append({'op': 'add', 'path': f"{path}/{index}", 'value': target[index]})
+        for _ in range(i2 - i1 - paired):
+            ops.append({'op': 'remove', 'path': f"{path}/{j1 + paired}"})
+
+
+def diff_reports(base: Dict[str, Any], target: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    JSON Patch (RFC 6902 add/remove/replace) turning base into target
+    Only changed fields and list lines appear in the patch
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff(base, target, '', ops)
+    return ops
+
+
+def _resolve(document: Any, path: str) -> Tuple[Any, Any]:
+    """Container and final key/index for a JSON pointer"""
+    if not path.startswith('/'):
+        raise PatchError(f"Invalid patch path: {path!r}")
+    tokens = [_unescape(token) for token in path[1:].split('/')]
+    parent = document
+    for token in tokens[:-1]:
+        try:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise PatchError(f"Patch path not found: {path}")
+    last = tokens[-1]
+    if isinstance(parent, list):
+        try:
+            last = int(last)
+        except ValueError:
+            raise PatchError(f"Invalid list index in patch path: {path}")
+    return parent, last
+
+
+def _apply_op(document: Any, op: Dict[str, Any]) -> Any:
+    """Apply one operation in place; returns the (possibly replaced) document"""
+    if op['path'] == '':
+        return copy.deepcopy(op['value'])
+    parent, key = _resolve(document, op['path'])
+    try:
+        if op['op'] == 'replace':
+            if isinstance(parent, dict) and key not in parent:
+                raise KeyError(key)
+            parent[key] = copy.deepcopy(op['value'])
+        elif op['op'] == 'add':
+            if isinstance(parent, list):
+                parent.insert(key, copy.deepcopy(op['value']))
+            else:
+                parent[key] = copy.deepcopy(op['value'])
+        elif op['op'] == 'remove':
+            del parent[key]
+        else:
+            raise PatchError(f"Unsupported patch operation: {op['op']}")
+    except (KeyError, IndexError, TypeError):
+        raise PatchError(f"Patch does not apply at {op['path']}")
+    return document
+
+
+def apply_patch(base: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply a patch from diff_reports to a copy of base"""
+    document = copy.deepcopy(base)
+    for op in ops:
+        document = _apply_op(document, op)
+    return document
+
+
+def describe_patch(base: Dict[str, Any], ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Audit view of a patch: one entry per change with the before and after values
+    Walks only the touched paths, so it stays cheap for large reports
+    """
+    document = copy.deepcopy(base)
+    changes = []
+    for op in ops:
+        before = None
+        if op['path'] and op['op'] in ('replace', 'remove'):
+            parent, key = _resolve(document, op['path'])
+            try:
+                before = parent[key]
+            except (KeyError, IndexError, TypeError):
+                before = None
+        changes.append({
+            'op': op['op'],
+            'path': op['path'],
+            'before': before,
+            'after': op.get('value')
+        })
+        document = _apply_op(document, op)
+    return changes
+
+
+def make_final_patch(draft: Dict[str, Any], final: Dict[str, Any]) -> Dict[str, Any]:
+    """Patch record stored in place of the full final report"""
+    return {
+        'format': PATCH_FORMAT,
+        'report_id': final.get('report_id', draft.get('report_id')),
+        'base_report_id': draft.get('report_id'),
+        'base_hash': report_hash(draft),
+        'created_at': datetime.now().isoformat(),
+        'ops': diff_reports(draft, final)
+    }
+
+
+def find_base(patch: Dict[str, Any], *candidates: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """First candidate draft the patch was made against"""
+    for candidate in candidates:
+        if candidate and report_hash(candidate) == patch.get('base_hash'):
+            return candidate
+    return None
+
+
+class ReconstructionCache:
+    """Small LRU of final reports rebuilt from (draft, patch)"""
+
+    def __init__(self, maxsize: int = RECONSTRUCTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def reconstruct(self, draft: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Final report for a patch record
+        Raises PatchError when the draft is not the one the patch was made against
+        """
+        base_hash = patch.get('base_hash') or report_hash(draft)
+        key = (base_hash, patch.get('created_at', ''))
+        with self._lock:
+            report = self._items.get(key)
+            if report is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+        if report is None:
+            # The base is only verified on a miss; a cached entry was built from it
+            if report_hash(draft) != base_hash:
+                raise PatchError("Draft report changed since approval; patch base does not match")
+            report = apply_patch(draft, patch.get('ops', []))
+            with self._lock:
+                self.misses += 1
+                self._items[key] = report
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+        # Hand out copies so callers cannot alter the cached report
+        return copy.deepcopy(report)
+
+
+_cache = ReconstructionCache()
+
+
+def reconstruct_final_report(draft: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the approved report using the shared reconstruction cache"""
+    return _cache.reconstruct(draft, patch)
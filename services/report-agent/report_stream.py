@@ -0,0 +1,139 @@
+"""
+Streaming Report Events
+A report as a flat sequence of small events, and sinks that consume them one at a time
+
+Event shapes (each is JSON-serialisable, so an event stream is also an NDJSON stream):
+    {'event': 'report', 'report_id': ..., 'generated_date': ..., 'status': ..., ...}
+    {'event': 'section', 'section': name, 'value': ...}       single-value section
+    {'event': 'section', 'section': name, 'fields': {...}}    findings section; lines follow
+    {'event': 'section', 'section': name}                     list section; lines follow
+    {'event': 'line', 'section': name, 'text': ...}
+    {'event': 'end', 'metadata': {...}}
+"""
+
+from typing import Dict, Any, Iterable, Iterator, Optional, TextIO
+import json
+
+# Section names by shape, in report order
+VALUE_SECTIONS = ('patient_information', 'examination_summary')
+FINDING_SECTIONS = ('imaging_findings', 'laboratory_findings')
+LINE_SECTIONS = ('interpretive_notes', 'recommendations', 'disclaimer')
+SECTION_ORDER = ('patient_information', 'examination_summary', 'imaging_findings',
+                 'laboratory_findings', 'interpretive_notes', 'recommendations', 'disclaimer')
+
+
+def assemble_report(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the report dict from an event stream"""
+    report: Dict[str, Any] = {}
+    lines = None
+    for event in events:
+        kind = event['event']
+        if kind == 'line':
+            lines.append(event['text'])
+        elif kind == 'section':
+            name = event['section']
+            if 'value' in event:
+                report[name] = event['value']
+                lines = None
+            elif 'fields' in event:
+                section = dict(event['fields'])
+                lines = section['findings'] = []
+                report[name] = section
+            else:
+                lines = report[name] = []
+        elif kind == 'report':
+            report.update((key, value) for key, value in event.items() if key != 'event')
+        elif kind == 'end':
+            report['metadata'] = event.get('metadata', {})
+    return report
+
+
+def report_events(report: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Event stream for an existing report dict (e.g. a stored draft or approved report)"""
+    header = {'event': 'report'}
+    header.update((key, value) for key, value in report.items()
+                  if key not in SECTION_ORDER and key != 'metadata')
+    yield header
+
+    for name in SECTION_ORDER:
+        if name not in report:
+            continue
+        section = report[name]
+        if name in VALUE_SECTIONS:
+            yield {'event': 'section', 'section': name, 'value': section}
+            continue
+        if name in FINDING_SECTIONS:
+            yield {'event': 'section', 'section': name,
+                   'fields': {key: value for key, value in section.items() if key != 'findings'}}
+            lines = section.get('findings', [])
+        else:
+            yield {'event': 'section', 'section': name}
+            lines = section
+        for text in lines:
+            yield {'event': 'line', 'section': name, 'text': text}
+
+    yield {'event': 'end', 'metadata': report.get('metadata', {})}
+
+
+def write_ndjson(events: Iterable[Dict[str, Any]], out: TextIO,
+                 extra: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Write one JSON object per event; extra fields (e.g. a case_id) are added to every line
+    Returns the number of events written
+    """
+    count = 0
+    for event in events:
+        if extra:
+            event = {**extra, **event}
+        out.write(json.dumps(event, separators=(',', ':')))
+        out.write('\n')
+        count += 1
+    return count
+
+
+def write_text(events: Iterable[Dict[str, Any]], out: TextIO) -> int:
+    """
+    Write the report as plain text, section by section as events arrive
+    Returns the number of lines written
+    """
+    count = 0
+
+    def emit(text: str = ''):
+        nonlocal count
+        out.write(text)
+        out.write('\n')
+        count += 1
+
+    for event in events:
+        kind = event['event']
+        if kind == 'line':
+            emit(event['text'])
+        elif kind == 'section':
+            emit()
+            value = event.get('value')
+            if isinstance(value, dict):
+                emit(f"{event['section'].replace('_', ' ').upper()}:")
+                for key, item in value.items():
+                    emit(f"  {key.replace('_', ' ').title()}: {item}")
+            elif value is not None:
+                emit(f"{event['section'].replace('_', ' ').upper()}:")
+                emit(str(value))
+        elif kind == 'report':
+            emit("MEDICAL DIAGNOSTIC REPORT")
+            emit(f"Report ID: {event.get('report_id', 'N/A')}")
+            emit(f"Generated: {event.get('generated_date', 'N/A')}")
+            emit(f"Status: {str(event.get('status', 'draft')).upper()}")
+            if event.get('reviewer_name'):
+                emit(f"Reviewed by: {event['reviewer_name']}")
+            if event.get('reviewer_comments'):
+                emit(f"Reviewer notes: {event['reviewer_comments']}")
+    return count
+
+
+def write_pdf(events: Iterable[Dict[str, Any]], output_path: str, pdf_generator) -> str:
+    """
+    Render an event stream with a MedicalReportPDFGenerator
+    ReportLab lays out the whole story in doc.build, so the report is assembled
+    here first; the assembled dict holds only the lines the PDF shows anyway
+    """
+    return pdf_generator.generate_pdf(assemble_report(events), output_path)
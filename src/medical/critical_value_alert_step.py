@@ -0,0 +1,82 @@
+"""
+Critical Lab Value Alert Step
+Raises high-priority alerts for critical lab values ahead of the full report
+"""
+
+from pydantic import BaseModel
+from typing import List, Dict, Any
+import time
+import os
+import importlib.util
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
+
+class CriticalValuesEvent(BaseModel):
+    """Input schema for critical lab values"""
+    session_id: str
+    critical_values: List[Dict[str, Any]]
+    ingested_at: float  # Epoch seconds when the lab panel was received
+
+# Critical values alert (fires before report generation)
+config = {
+    "type": "event",
+    "name": "CriticalValueAlert",
+    "description": "Alert on critical laboratory values as soon as they are ingested",
+    "flows": ["medical-report"],
+    "subscribes": ["critical-lab-values"],
+    "emits": [],
+    "input": CriticalValuesEvent.model_json_schema(),
+}
+
+async def handler(input_data, context):
+    """
+    Record and log a critical value alert with ingest-to-alert latency
+    """
+    state = ReportState(context)
+    session_id = input_data.get("session_id")
+    critical_values = input_data.get("critical_values", [])
+    ingested_at = input_data.get("ingested_at")
+
+    alerted_at = time.time()
+    latency_ms = round((alerted_at - ingested_at) * 1000, 3) if ingested_at else None
+
+    patient_info = await state.get(f"patient_info_{session_id}")
+
+    alert = {
+        "session_id": session_id,
+        "patient_id": patient_info.get("patient_id") if patient_info else None,
+        "priority": "critical",
+        "tests": [
+            {
+                "test_name": result.get("test_name"),
+                "value": result.get("value"),
+                "unit": result.get("unit"),
+                "status": result.get("status"),
+                "reference_range": result.get("reference_range")
+            }
+            for result in critical_values
+        ],
+        "ingested_at": ingested_at,
+        "alerted_at": alerted_at,
+        "latency_ms": latency_ms
+    }
+
+    await state.set(f"critical_alert_{session_id}", alert)
+
+    # This represents the page/notification to the on-call clinician
+    context.logger.warn("CRITICAL LAB VALUES - Immediate Attention Required", {
+        "session_id": session_id,
+        "patient_id": alert["patient_id"],
+        "tests": [f"{t['test_name']}: {t['value']} {t['unit'] or ''}".strip() for t in alert["tests"]],
+        "ingest_to_alert_ms": latency_ms
+    })
@@ -1,11 +1,48 @@
 """
 PDF Download Endpoint
-Serves the final approved PDF report for download
+Serves the final approved PDF report for download, with ETag revalidation and byte ranges
 """
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Tuple
+import hashlib
+import re
 import os
+import importlib.util
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+# Import blob store dynamically
+def get_blob_store():
+    spec = importlib.util.spec_from_file_location(
+        "blob_store",
+        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/blob_store.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+ReportState = get_state_codec()
+_blob_store_module = get_blob_store()
+
+# Same store RenderReportPDF writes to (PDF_BLOB_STORE / PDF_BLOB_DIR)
+PDF_BLOB_DIR = os.path.join(os.path.dirname(__file__), '../../outputs/pdf-blobs')
+blob_store = _blob_store_module.blob_store_from_env(PDF_BLOB_DIR)
+
+# Files are read in chunks of this size; a request never holds more than its range in memory
+CHUNK_SIZE = 64 * 1024
+
+# SHA-256 by blob key or file identity, so repeat downloads are not re-hashed
+_digest_cache = {}
+_DIGEST_CACHE_SIZE = 256
 
 class PDFDownloadResponse(BaseModel):
     """Response schema for PDF download"""
@@ -13,6 +50,8 @@ class PDFDownloadResponse(BaseModel):
     message: str
     report_id: Optional[str] = None
     file_available: bool = False
+    job_id: Optional[str] = None
+    job_status: Optional[str] = None
 
 # Step: Download PDF Report
 config = {
@@ -28,54 +67,254 @@ config = {
                 "application/pdf": {}
             }
         },
+        202: PDFDownloadResponse.model_json_schema(),
+        206: {
+            "content": {
+                "application/pdf": {}
+            }
+        },
+        304: {},
         404: PDFDownloadResponse.model_json_schema(),
+        416: {},
     },
     "emits": [],
 }
 
+def _file_sha256(path: str) -> str:
+    """SHA-256 of a file, hashed in chunks and memoized by inode, size and mtime"""
+    stat = os.stat(path)
+    identity = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    digest = _digest_cache.get(identity)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        if len(_digest_cache) >= _DIGEST_CACHE_SIZE:
+            _digest_cache.pop(next(iter(_digest_cache)))
+        _digest_cache[identity] = digest
+    return digest
+
+def _blob_sha256(blob_key: str, size: int) -> str:
+    """
+    SHA-256 of a stored blob, read in CHUNK_SIZE ranges
+    Blobs are immutable, so each is hashed once per process
+    """
+    digest = _digest_cache.get(blob_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        for start in range(0, size, CHUNK_SIZE):
+            sha.update(blob_store.read_range(blob_key, start, min(start + CHUNK_SIZE, size) - 1))
+        digest = sha.hexdigest()
+        if len(_digest_cache) >= _DIGEST_CACHE_SIZE:
+            _digest_cache.pop(next(iter(_digest_cache)))
+        _digest_cache[blob_key] = digest
+    return digest
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison and may list several tags"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single "bytes=" range
+    Returns None to serve the whole file (no, malformed or multi-range header);
+    raises ValueError when the range cannot be satisfied
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", header or "")
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    """Read bytes start..end (inclusive) in chunks"""
+    parts = []
+    remaining = end - start + 1
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            parts.append(chunk)
+            remaining -= len(chunk)
+    return b"".join(parts)
+
 async def handler(req, context):
     """
     Serve PDF file for download
     """
+    state = ReportState(context)
     params = req.get("params", {})
     session_id = params.get("sessionId")
+    headers = {key.lower(): value for key, value in (req.get("headers") or {}).items()}
     
     context.logger.info("PDF Download Request", {"session_id": session_id})
     
     try:
-        # Get PDF path from state
-        pdf_path = await context.state.get("medical_reports", f"pdf_path_{session_id}")
-        
-        if not pdf_path:
-            context.logger.warn("PDF not found", {"session_id": session_id})
+        # PDFs are rendered in the background after approval (RenderReportPDF)
+        pdf_job = await state.get(f"pdf_job_{session_id}")
+        if pdf_job and pdf_job.get("status") in ("queued", "rendering"):
             return {
-                "status": 404,
+                "status": 202,
+                "headers": {
+                    "Retry-After": "2",
+                    "Cache-Control": "no-cache"
+                },
                 "body": {
-                    "status": "not_found",
-                    "message": "PDF report not found. Ensure the report has been approved.",
-                    "file_available": False
+                    "status": "pending",
+                    "message": "PDF report is being generated. Try again shortly.",
+                    "report_id": pdf_job.get("report_id"),
+                    "file_available": False,
+                    "job_id": pdf_job.get("job_id"),
+                    "job_status": pdf_job.get("status")
+                }
+            }
+        if pdf_job and pdf_job.get("status") == "failed":
+            context.logger.error("PDF render failed", {"session_id": session_id, "error": pdf_job.get("error")})
+            return {
+                "status": 500,
+                "body": {
+                    "status": "error",
+                    "message": f"PDF generation failed: {pdf_job.get('error')}",
+                    "report_id": pdf_job.get("report_id"),
+                    "file_available": False,
+                    "job_id": pdf_job.get("job_id"),
+                    "job_status": "failed"
                 }
             }
         
-        # Check if file exists
-        if not os.path.exists(pdf_path):
-            context.logger.error("PDF file missing", {"path": pdf_path})
+        if pdf_job and pdf_job.get("blob_key"):
+            # Rendered into the blob store, readable from any replica
+            blob_key = pdf_job["blob_key"]
+            try:
+                file_size = blob_store.size(blob_key)
+                file_sha256 = _blob_sha256(blob_key, file_size)
+            except KeyError:
+                # BlobNotFoundError, whichever copy of blob_store the store came from
+                context.logger.error("PDF blob missing", {"blob_key": blob_key})
+                return {
+                    "status": 404,
+                    "body": {
+                        "status": "error",
+                        "message": "PDF file not found in storage",
+                        "file_available": False
+                    }
+                }
+            read_range = lambda start, end: blob_store.read_range(blob_key, start, end)
+        else:
+            # Reports rendered before the blob store wrote to a path on this node
+            pdf_path = await state.get(f"pdf_path_{session_id}")
+            
+            if not pdf_path:
+                context.logger.warn("PDF not found", {"session_id": session_id})
+                return {
+                    "status": 404,
+                    "body": {
+                        "status": "not_found",
+                        "message": "PDF report not found. Ensure the report has been approved.",
+                        "file_available": False
+                    }
+                }
+            
+            # Check if file exists
+            if not os.path.exists(pdf_path):
+                context.logger.error("PDF file missing", {"path": pdf_path})
+                return {
+                    "status": 404,
+                    "body": {
+                        "status": "error",
+                        "message": "PDF file not found on server",
+                        "file_available": False
+                    }
+                }
+            file_size = os.path.getsize(pdf_path)
+            file_sha256 = _file_sha256(pdf_path)
+            read_range = lambda start, end: _read_range(pdf_path, start, end)
+        
+        # Get final report metadata (envelope fields only, no need to decode the report)
+        final_report = (await state.get_meta(f"final_patch_{session_id}")
+                        or await state.get_meta(f"final_report_{session_id}"))
+        report_id = final_report.get('report_id', 'report')
+        
+        # Verify against the digest recorded at render time (reports rendered by RenderReportPDF)
+        expected_sha256 = pdf_job.get("sha256") if pdf_job else None
+        if expected_sha256 and file_sha256 != expected_sha256:
+            context.logger.error("PDF integrity check failed", {"session_id": session_id})
             return {
-                "status": 404,
+                "status": 500,
                 "body": {
                     "status": "error",
-                    "message": "PDF file not found on server",
+                    "message": "PDF file does not match the rendered report",
+                    "report_id": pdf_job.get("report_id"),
                     "file_available": False
                 }
             }
         
-        # Get final report for metadata
-        final_report = await context.state.get("medical_reports", f"final_report_{session_id}")
-        report_id = final_report.get('report_id', 'report') if final_report else 'report'
+        # Strong ETag: the PDF's content hash
+        etag = f'"{file_sha256}"'
+        cache_headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            # Always revalidate; an unchanged PDF costs a 304
+            "Cache-Control": "private, no-cache"
+        }
+        if headers.get("if-none-match") and _etag_matches(headers["if-none-match"], etag):
+            return {"status": 304, "headers": cache_headers, "body": ""}
+        
+        content_headers = {
+            "Content-Type": "application/pdf",
+            "Content-Disposition": f'attachment; filename="{report_id}.pdf"',
+            **cache_headers
+        }
+        
+        # A Range only applies while the client's copy is current (If-Range)
+        byte_range = None
+        if headers.get("range") and headers.get("if-range", etag) == etag:
+            try:
+                byte_range = _parse_range(headers["range"], file_size)
+            except ValueError:
+                return {
+                    "status": 416,
+                    "headers": {**cache_headers, "Content-Range": f"bytes */{file_size}"},
+                    "body": ""
+                }
+        
+        if byte_range:
+            start, end = byte_range
+            pdf_content = read_range(start, end)
+            context.logger.info("PDF Range Download", {
+                "session_id": session_id,
+                "range": f"{start}-{end}",
+                "file_size": file_size
+            })
+            return {
+                "status": 206,
+                "headers": {
+                    **content_headers,
+                    "Content-Range": f"bytes {start}-{end}/{file_size}",
+                    "Content-Length": str(len(pdf_content))
+                },
+                "body": pdf_content
+            }
         
-        # Read PDF file
-        with open(pdf_path, 'rb') as f:
-            pdf_content = f.read()
+        pdf_content = read_range(0, file_size - 1)
         
         context.logger.info("PDF Download Successful", {
             "session_id": session_id,
@@ -86,10 +325,8 @@ async def handler(req, context):
         return {
             "status": 200,
             "headers": {
-                "Content-Type": "application/pdf",
-                "Content-Disposition": f'attachment; filename="{report_id}.pdf"',
-                "Content-Length": str(len(pdf_content)),
-                "Cache-Control": "no-cache"
+                **content_headers,
+                "Content-Length": str(len(pdf_content))
             },
             "body": pdf_content
         }
@@ -5,6 +5,32 @@ Retrieve generated reports and PDF
 
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import os
+import importlib.util
+
+# Import report patch service dynamically
+def get_report_patch():
+    spec = importlib.util.spec_from_file_location(
+        "report_patch",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_patch.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+report_patch = get_report_patch()
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
 
 class GetReportRequest(BaseModel):
     """Request schema for retrieving report"""
@@ -35,15 +61,28 @@ async def handler(req, context):
     """
     Retrieve report for display in UI
     """
+    state = ReportState(context)
     params = req.get("params", {})
     session_id = params.get("session_id")
     
     context.logger.info("Retrieving Report", {"session_id": session_id})
     
     try:
-        # Try to get final report first
-        final_report = await context.state.get("medical_reports", f"final_report_{session_id}")
-        pdf_path = await context.state.get("medical_reports", f"pdf_path_{session_id}")
+        # Try to get final report first (stored as a patch against the draft)
+        final_report = None
+        final_patch = await state.get(f"final_patch_{session_id}")
+        draft_report = await state.get(f"draft_report_{session_id}")
+        if final_patch:
+            try:
+                final_report = report_patch.reconstruct_final_report(draft_report, final_patch)
+            except report_patch.PatchError:
+                # Draft was regenerated after approval; the approved base was kept aside
+                approved_base = await state.get(f"approved_base_{session_id}")
+                final_report = report_patch.reconstruct_final_report(approved_base or {}, final_patch)
+        else:
+            # Reports approved before patches were introduced are stored whole
+            final_report = await state.get(f"final_report_{session_id}")
+        pdf_path = await state.get(f"pdf_path_{session_id}")
         
         if final_report:
             return {
@@ -56,9 +95,7 @@ async def handler(req, context):
                 }
             }
         
-        # If no final report, get draft
-        draft_report = await context.state.get("medical_reports", f"draft_report_{session_id}")
-        
+        # If no final report, return the draft
         if draft_report:
             return {
                 "status": 200,
@@ -19,7 +19,30 @@ def get_image_processor():
     spec.loader.exec_module(module)
     return module.process_diagnostic_image
 
+# Import ID generator dynamically
+def get_report_ids():
+    spec = importlib.util.spec_from_file_location(
+        "report_ids",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_ids.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 process_diagnostic_image = get_image_processor()
+new_session_id = get_report_ids().new_session_id
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
 
 class ImageUploadRequest(BaseModel):
     """Request schema for image upload"""
@@ -57,6 +80,7 @@ async def handler(req, context):
     """
     Handle image upload and trigger analysis
     """
+    state = ReportState(context)
     body = req.get("body", {})
     context.logger.info("Medical Workflow - Image Analysis Started", {"patient_id": body.get("patient_id")})
     
@@ -81,19 +105,17 @@ async def handler(req, context):
         
         analysis_result = process_diagnostic_image(image_path, image_type, metadata)
         
-        # Generate session ID
-        session_id = f"SESSION-{patient_id}-{study_date}"
+        # Generate session ID (unique and time-sortable, even for repeat studies)
+        session_id = new_session_id()
         
         # Store analysis result in state
-        await context.state.set(
-            "medical_reports",
+        await state.set(
             f"imaging_result_{session_id}",
             analysis_result
         )
         
         # Store patient info
-        await context.state.set(
-            "medical_reports",
+        await state.set(
             f"patient_info_{session_id}",
             {
                 "patient_id": patient_id,
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from typing import Dict, Any
 import sys
 import os
+import time
 import importlib.util
 
 # Import lab analyzer dynamically
@@ -17,9 +18,39 @@ def get_lab_analyzer():
     )
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
-    return module.analyze_lab_results
+    return module
 
-analyze_lab_results = get_lab_analyzer()
+# Import lab history store dynamically
+def get_lab_history():
+    spec = importlib.util.spec_from_file_location(
+        "lab_history",
+        os.path.join(os.path.dirname(__file__), '../../services/lab-agent/lab_history.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+lab_analyzer = get_lab_analyzer()
+analyze_lab_results = lab_analyzer.analyze_lab_results
+analyzer = lab_analyzer.LabResultAnalyzer()
+
+# Per-patient time series of lab values, shared across sessions
+LAB_HISTORY_DB = os.environ.get(
+    'LAB_HISTORY_DB', os.path.join(os.path.dirname(__file__), '../../outputs/lab_history.sqlite3')
+)
+lab_history = get_lab_history().LabHistoryStore(LAB_HISTORY_DB)
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
 
 class LabResultsRequest(BaseModel):
     """Request schema for lab results"""
@@ -46,13 +77,15 @@ config = {
     "responseSchema": {
         200: LabAnalysisResponse.model_json_schema(),
     },
-    "emits": ["labs-analyzed"],
+    "emits": ["labs-analyzed", "critical-lab-values"],
 }
 
 async def handler(req, context):
     """
     Handle lab results analysis
     """
+    state = ReportState(context)
+    ingested_at = time.time()
     body = req.get("body", {})
     session_id = body.get("session_id")
     
@@ -61,15 +94,48 @@ async def handler(req, context):
     try:
         lab_data = body.get("lab_data", {})
         
+        # Critical values fast path: alert before the full panel is analyzed
+        critical_values = [result.to_dict() for result in analyzer.iter_critical_values(lab_data)]
+        if critical_values:
+            await context.emit({
+                "topic": "critical-lab-values",
+                "data": {
+                    "session_id": session_id,
+                    "critical_values": critical_values,
+                    "ingested_at": ingested_at
+                }
+            })
+            context.logger.warn("Critical Lab Values Detected", {
+                "session_id": session_id,
+                "tests": [result["test_name"] for result in critical_values],
+                "ingest_to_alert_ms": round((time.time() - ingested_at) * 1000, 3)
+            })
+        
         # Analyze lab results
         analysis_result = analyze_lab_results(lab_data)
         
-        # Store lab result in state
-        await context.state.set(
-            "medical_reports",
+        # Delta checks against this patient's previous panels
+        patient_info = await state.get(f"patient_info_{session_id}")
+        patient_id = patient_info.get("patient_id") if patient_info else None
+        if patient_id:
+            observed_at = patient_info.get("study_date")
+            # A re-submitted panel is compared against earlier sessions, not its own previous attempt
+            lab_history.discard_session(session_id)
+            analysis_result["trend_analysis"] = analyzer.analyze_trends(
+                patient_id, lab_data, lab_history, observed_at=observed_at
+            )
+            lab_history.append_panel(patient_id, lab_data, observed_at=observed_at, session_id=session_id)
+        
+        # Store lab result in state, with the raw input so it can be
+        # re-scored if the reference range catalogue changes
+        await state.set(
             f"lab_result_{session_id}",
             analysis_result
         )
+        await state.set(
+            f"lab_input_{session_id}",
+            lab_data
+        )
         
         # Emit event
         await context.emit({
@@ -84,7 +150,8 @@ async def handler(req, context):
         
         context.logger.info("Lab Analysis Completed", {
             "session_id": session_id,
-            "abnormal_count": analysis_result.get("summary", {}).get("abnormal_count", 0)
+            "abnormal_count": analysis_result.get("summary", {}).get("abnormal_count", 0),
+            "delta_alerts": len(analysis_result.get("trend_analysis", {}).get("delta_alerts", []))
         })
         
         return {
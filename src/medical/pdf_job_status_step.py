@@ -0,0 +1,100 @@
+"""
+PDF Job Status Step
+Progress of the background PDF render for a session
+"""
+
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+import os
+import importlib.util
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
+
+class PDFJobStatusResponse(BaseModel):
+    """Response schema for PDF job status"""
+    status: str
+    session_id: str
+    job: Optional[Dict[str, Any]] = None
+    elapsed_ms: Optional[float] = None
+    pdf_available: bool = False
+
+# Status of the queued PDF render (see RenderReportPDF)
+config = {
+    "type": "api",
+    "name": "PDFJobStatusAPI",
+    "description": "Status of the background PDF render for an approved report",
+    "flows": ["medical-report"],
+    "method": "GET",
+    "path": "/medical/report/{session_id}/pdf-status",
+    "responseSchema": {
+        200: PDFJobStatusResponse.model_json_schema(),
+        404: PDFJobStatusResponse.model_json_schema(),
+    },
+    "emits": [],
+}
+
+def _elapsed_ms(job):
+    """Time since the job was queued, or its total time once finished"""
+    try:
+        queued_at = datetime.fromisoformat(job["queued_at"])
+        finished_at = datetime.fromisoformat(job["completed_at"]) if job.get("completed_at") else datetime.now()
+    except (KeyError, TypeError, ValueError):
+        return None
+    return round((finished_at - queued_at).total_seconds() * 1000, 1)
+
+async def handler(req, context):
+    """
+    Return the render job (queued, rendering, completed or failed)
+    """
+    state = ReportState(context)
+    params = req.get("params", {})
+    session_id = params.get("session_id")
+
+    try:
+        job = await state.get(f"pdf_job_{session_id}")
+        pdf_path = await state.get(f"pdf_path_{session_id}")
+
+        if not job and not pdf_path:
+            return {
+                "status": 404,
+                "body": {
+                    "status": "not_found",
+                    "session_id": session_id,
+                    "pdf_available": False
+                }
+            }
+
+        # Reports approved before rendering was queued have a PDF path but no job
+        pdf_available = job.get("status") == "completed" if job else bool(pdf_path)
+
+        return {
+            "status": 200,
+            "body": {
+                "status": job.get("status") if job else "completed",
+                "session_id": session_id,
+                "job": job,
+                "elapsed_ms": _elapsed_ms(job) if job else None,
+                "pdf_available": pdf_available
+            }
+        }
+
+    except Exception as e:
+        context.logger.error("PDF Job Status Failed", {"error": str(e)})
+        return {
+            "status": 500,
+            "body": {
+                "status": "error",
+                "message": str(e)
+            }
+        }
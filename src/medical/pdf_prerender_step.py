@@ -0,0 +1,129 @@
+"""
+PDF Pre-render Step
+Renders the body pages of a new draft while it waits for review, so approval
+only has to render the sign-off page
+"""
+
+from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import asyncio
+import time
+import os
+import importlib.util
+
+# Import PDF generator dynamically
+def get_pdf_generator():
+    spec = importlib.util.spec_from_file_location(
+        "pdf_generator",
+        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/pdf_generator.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.prerender_body_to_store
+
+# Import blob store dynamically
+def get_blob_store():
+    spec = importlib.util.spec_from_file_location(
+        "blob_store",
+        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/blob_store.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.blob_store_from_env(PDF_BLOB_DIR)
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+# Same store RenderReportPDF reads pre-rendered bodies from
+PDF_BLOB_DIR = os.path.join(os.path.dirname(__file__), '../../outputs/pdf-blobs')
+
+prerender_body_to_store = get_pdf_generator()
+ReportState = get_state_codec()
+blob_store = get_blob_store()
+
+# Pre-rendering is opportunistic; keep it to one render at a time per process
+_prerender_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-prerender")
+
+class ReportGeneratedEvent(BaseModel):
+    """Input schema for a newly generated draft"""
+    session_id: str
+    report_id: Optional[str] = None
+
+config = {
+    "type": "event",
+    "name": "PrerenderReportPDF",
+    "description": "Pre-render the PDF body of a draft report ahead of approval",
+    "flows": ["medical-report"],
+    "subscribes": ["report-generated"],
+    "emits": [],
+    "input": ReportGeneratedEvent.model_json_schema(),
+}
+
+async def _approved_pdf_stored(state, session_id, report_id):
+    """Whether RenderReportPDF already stored this draft's approved PDF (and dropped its body)"""
+    job = await state.get(f"pdf_job_{session_id}")
+    return bool(job) and job.get("status") == "completed" and job.get("report_id") == report_id
+
+async def handler(input_data, context):
+    """
+    Render the draft's body pages into the blob store
+    Failures only cost the approval a full render, so they are logged, not retried.
+    The body of the draft this one replaces is deleted; RenderReportPDF deletes
+    the current one once the approved PDF is stored
+    """
+    state = ReportState(context)
+    session_id = input_data.get("session_id")
+
+    draft_report = await state.get(f"draft_report_{session_id}")
+    report_id = input_data.get("report_id")
+    if not draft_report or (report_id and draft_report.get("report_id") != report_id):
+        # Regenerated since the event was emitted; the newer draft has its own event
+        context.logger.info("PDF Pre-render Skipped", {
+            "session_id": session_id,
+            "reason": "draft replaced" if draft_report else "draft not found"
+        })
+        return
+    if await _approved_pdf_stored(state, session_id, draft_report.get("report_id")):
+        context.logger.info("PDF Pre-render Skipped", {"session_id": session_id, "reason": "already approved"})
+        return
+
+    body_key = f"pdf_body_{session_id}"
+    previous_blob = await state.get(body_key)
+    try:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(_prerender_pool, prerender_body_to_store, draft_report, blob_store)
+        render_ms = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        context.logger.warn("PDF Pre-render Failed", {"session_id": session_id, "error": str(e)})
+        result = None
+    
+    # Approved and rendered while this body was being rendered; nothing will read it
+    if result and await _approved_pdf_stored(state, session_id, draft_report.get("report_id")):
+        blob_store.delete(result["blob_key"])
+        context.logger.info("PDF Pre-render Discarded", {"session_id": session_id, "blob_key": result["blob_key"]})
+        return
+    
+    # Body blobs are only read at approval, so the replaced draft's body has no further use
+    blob_key = result["blob_key"] if result else None
+    if previous_blob and previous_blob != blob_key:
+        blob_store.delete(previous_blob)
+    await state.set(body_key, blob_key)
+    if result is None:
+        return
+
+    context.logger.info("PDF Body Pre-rendered", {
+        "session_id": session_id,
+        "report_id": draft_report.get("report_id"),
+        "blob_key": blob_key,
+        "cached": result["cached"],
+        "render_ms": render_ms
+    })
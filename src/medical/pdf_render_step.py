@@ -0,0 +1,186 @@
+"""
+PDF Render Step
+Renders approved reports to PDF off the request path, on a bounded worker pool
+"""
+
+from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import time
+import os
+import importlib.util
+
+# Import PDF generator dynamically
+def get_pdf_generator():
+    spec = importlib.util.spec_from_file_location(
+        "pdf_generator",
+        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/pdf_generator.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.export_report_to_store
+
+# Import blob store dynamically
+def get_blob_store():
+    spec = importlib.util.spec_from_file_location(
+        "blob_store",
+        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/blob_store.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.blob_store_from_env(PDF_BLOB_DIR)
+
+# Import report patch service dynamically
+def get_report_patch():
+    spec = importlib.util.spec_from_file_location(
+        "report_patch",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_patch.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+# Rendered PDFs go to the blob store (PDF_BLOB_STORE / PDF_BLOB_DIR), not a path on this node
+PDF_BLOB_DIR = os.path.join(os.path.dirname(__file__), '../../outputs/pdf-blobs')
+
+export_report_to_store = get_pdf_generator()
+report_patch = get_report_patch()
+ReportState = get_state_codec()
+blob_store = get_blob_store()
+
+# ReportLab layout is CPU-bound; at most this many renders run at once per process.
+# The shared renderer is thread-safe, so workers reuse its styles and fragments.
+PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", "2"))
+_render_pool = ThreadPoolExecutor(max_workers=PDF_RENDER_WORKERS, thread_name_prefix="pdf-render")
+
+class PDFRenderRequest(BaseModel):
+    """Input schema for a queued PDF render"""
+    session_id: str
+    job_id: str
+
+# Background PDF rendering for approved reports
+config = {
+    "type": "event",
+    "name": "RenderReportPDF",
+    "description": "Render the approved report to PDF outside the approval request",
+    "flows": ["medical-report"],
+    "subscribes": ["pdf-render-requested"],
+    "emits": ["pdf-rendered"],
+    "input": PDFRenderRequest.model_json_schema(),
+}
+
+async def _is_current(state, session_id, job_id):
+    job = await state.get(f"pdf_job_{session_id}")
+    return job is not None and job.get("job_id") == job_id
+
+async def handler(input_data, context):
+    """
+    Rebuild the final report from its approval patch and render it
+    Jobs superseded by a newer approval are skipped
+    """
+    state = ReportState(context)
+    session_id = input_data.get("session_id")
+    job_id = input_data.get("job_id")
+    job_key = f"pdf_job_{session_id}"
+
+    job = await state.get(job_key)
+    if not job or job.get("job_id") != job_id or job.get("status") == "completed":
+        context.logger.info("PDF Render Skipped", {
+            "session_id": session_id,
+            "job_id": job_id,
+            "reason": "superseded" if job else "unknown job"
+        })
+        return
+
+    job["status"] = "rendering"
+    job["started_at"] = datetime.now().isoformat()
+    job["attempts"] = job.get("attempts", 0) + 1
+    job["error"] = None
+    await state.set(job_key, job)
+
+    try:
+        final_patch = await state.get(f"final_patch_{session_id}")
+        if not final_patch:
+            raise ValueError("Approved report not found")
+        draft_report = await state.get(f"draft_report_{session_id}")
+        approved_base = await state.get(f"approved_base_{session_id}")
+        base = report_patch.find_base(final_patch, draft_report, approved_base)
+        if base is None:
+            raise ValueError("Draft report the approval was made against is no longer available")
+        final_report = report_patch.reconstruct_final_report(base, final_patch)
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        # Rendered in memory; identical content (retried or repeated approvals) is already
+        # stored, and an unedited body pre-rendered from the draft only needs its sign-off page
+        export = await loop.run_in_executor(_render_pool, export_report_to_store, final_report, blob_store)
+        render_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    except Exception as e:
+        job["status"] = "failed"
+        job["completed_at"] = datetime.now().isoformat()
+        job["error"] = str(e)
+        if await _is_current(state, session_id, job_id):
+            await state.set(job_key, job)
+        context.logger.error("PDF Render Failed", {
+            "session_id": session_id,
+            "job_id": job_id,
+            "attempt": job["attempts"],
+            "error": str(e)
+        })
+        # Let the queue retry the job
+        raise
+
+    # A re-approval while rendering queued a newer job; that one publishes its own PDF
+    if not await _is_current(state, session_id, job_id):
+        context.logger.info("PDF Render Superseded", {"session_id": session_id, "job_id": job_id})
+        return
+
+    job["status"] = "completed"
+    job["completed_at"] = datetime.now().isoformat()
+    job["render_ms"] = render_ms
+    job["blob_key"] = export["blob_key"]
+    # Content hash identifies the render; sha256 lets downloads verify the blob
+    job["content_hash"] = export["content_hash"]
+    job["sha256"] = export["sha256"]
+    job["bytes"] = export["bytes"]
+    job["cached"] = export["cached"]
+    job["render"] = export["render"]
+    await state.set(job_key, job)
+    
+    # The pre-rendered body (PrerenderReportPDF) is not needed once the approved PDF is stored
+    body_blob = await state.get(f"pdf_body_{session_id}")
+    if body_blob:
+        blob_store.delete(body_blob)
+        await state.set(f"pdf_body_{session_id}", None)
+
+    await context.emit({
+        "topic": "pdf-rendered",
+        "data": {
+            "session_id": session_id,
+            "job_id": job_id,
+            "report_id": job.get("report_id"),
+            "blob_key": export["blob_key"]
+        }
+    })
+
+    context.logger.info("PDF Rendered", {
+        "session_id": session_id,
+        "job_id": job_id,
+        "render_ms": render_ms,
+        "cached": export["cached"],
+        "render": export["render"],
+        "blob_key": export["blob_key"],
+        "bytes": export["bytes"]
+    })
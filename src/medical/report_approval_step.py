@@ -1,25 +1,50 @@
 """
 Report Approval and Finalization Step
-Human-in-the-loop review and approval
+Human-in-the-loop review and approval; the PDF is rendered in the background
 """
 
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from datetime import datetime
 import sys
 import os
+import copy
 import importlib.util
 
-# Import PDF generator dynamically
-def get_pdf_generator():
+# Import report patch service dynamically
+def get_report_patch():
     spec = importlib.util.spec_from_file_location(
-        "pdf_generator",
-        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/pdf_generator.py')
+        "report_patch",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_patch.py')
     )
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
-    return module.export_report_to_pdf
+    return module
 
-export_report_to_pdf = get_pdf_generator()
+# Import report ID helpers dynamically
+def get_report_ids():
+    spec = importlib.util.spec_from_file_location(
+        "report_ids",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_ids.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+report_patch = get_report_patch()
+new_job_id = get_report_ids().new_job_id
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
 
 class ReportApprovalRequest(BaseModel):
     """Request schema for report approval"""
@@ -36,9 +61,11 @@ class ReportApprovalResponse(BaseModel):
     session_id: str
     report_id: str
     pdf_path: Optional[str] = None
+    pdf_job_id: Optional[str] = None
+    pdf_status: Optional[str] = None
     message: str
 
-# Step 4: Report Approval and PDF Generation
+# Step 4: Report Approval (PDF rendering is queued to RenderReportPDF)
 config = {
     "type": "api",
     "name": "ApproveReportAPI",
@@ -50,14 +77,15 @@ config = {
     "responseSchema": {
         200: ReportApprovalResponse.model_json_schema(),
     },
-    "emits": ["report-approved", "report-rejected"],
+    "emits": ["report-approved", "report-rejected", "pdf-render-requested"],
 }
 
 async def handler(req, context):
     """
     Handle human review and approval
-    Generate final PDF if approved
+    Persist the final report and queue its PDF render
     """
+    state = ReportState(context)
     body = req.get("body", {})
     session_id = body.get("session_id")
     report_id = body.get("report_id")
@@ -74,7 +102,7 @@ async def handler(req, context):
     
     try:
         # Get draft report from state
-        draft_report = await context.state.get("medical_reports", f"draft_report_{session_id}")
+        draft_report = await state.get(f"draft_report_{session_id}")
         
         if not draft_report:
             raise ValueError("Draft report not found")
@@ -87,7 +115,7 @@ async def handler(req, context):
                 "rejected_at": context.trace_id
             }
             
-            await context.state.set("medical_reports", f"rejection_{session_id}", rejection_info)
+            await state.set(f"rejection_{session_id}", rejection_info)
             
             await context.emit({
                 "topic": "report-rejected",
@@ -110,8 +138,8 @@ async def handler(req, context):
                 }
             }
         
-        # Report approved
-        final_report = edited_report if edited_report else draft_report
+        # Report approved (work on a copy; the draft stays the patch base)
+        final_report = copy.deepcopy(edited_report if edited_report else draft_report)
         
         # Update report status
         final_report["status"] = "approved"
@@ -119,16 +147,36 @@ async def handler(req, context):
         final_report["reviewer_comments"] = reviewer_comments
         final_report["requires_approval"] = False
         
-        # Ensure PDF output directory exists
-        pdf_output_dir = os.path.join(os.path.dirname(__file__), '../../outputs/pdfs')
-        os.makedirs(pdf_output_dir, exist_ok=True)
+        # Store the reviewer's changes as a patch against the draft, not a second full copy
+        final_patch = report_patch.make_final_patch(draft_report, final_report)
+        await state.set(f"final_patch_{session_id}", final_patch)
         
-        # Generate PDF
-        pdf_path = export_report_to_pdf(final_report, pdf_output_dir)
+        # Queue the PDF; the approval no longer waits for ReportLab layout.
+        # A newer job for the same session supersedes this one.
+        pdf_job = {
+            "job_id": new_job_id(),
+            "session_id": session_id,
+            "report_id": final_patch["report_id"],
+            "status": "queued",
+            "queued_at": datetime.now().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "attempts": 0,
+            "render_ms": None,
+            "blob_key": None,
+            "content_hash": None,
+            "sha256": None,
+            "error": None
+        }
+        await state.set(f"pdf_job_{session_id}", pdf_job)
         
-        # Store final report
-        await context.state.set("medical_reports", f"final_report_{session_id}", final_report)
-        await context.state.set("medical_reports", f"pdf_path_{session_id}", pdf_path)
+        await context.emit({
+            "topic": "pdf-render-requested",
+            "data": {
+                "session_id": session_id,
+                "job_id": pdf_job["job_id"]
+            }
+        })
         
         # Emit approval event
         await context.emit({
@@ -136,14 +184,15 @@ async def handler(req, context):
             "data": {
                 "session_id": session_id,
                 "report_id": report_id,
-                "pdf_path": pdf_path,
+                "pdf_job_id": pdf_job["job_id"],
                 "reviewer": reviewer_name
             }
         })
         
         context.logger.info("Report Approved and Finalized", {
             "session_id": session_id,
-            "pdf_path": pdf_path
+            "pdf_job_id": pdf_job["job_id"],
+            "patch_ops": len(final_patch["ops"])
         })
         
         return {
@@ -152,8 +201,10 @@ async def handler(req, context):
                 "status": "approved",
                 "session_id": session_id,
                 "report_id": report_id,
-                "pdf_path": pdf_path,
-                "message": "Report approved and PDF generated successfully"
+                "pdf_path": None,
+                "pdf_job_id": pdf_job["job_id"],
+                "pdf_status": pdf_job["status"],
+                "message": "Report approved; PDF is being generated"
             }
         }
         
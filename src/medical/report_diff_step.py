@@ -0,0 +1,113 @@
+"""
+Report Diff Step
+Audit view of the reviewer's changes between draft and approved report
+"""
+
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+import os
+import importlib.util
+
+# Import report patch service dynamically
+def get_report_patch():
+    spec = importlib.util.spec_from_file_location(
+        "report_patch",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_patch.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+report_patch = get_report_patch()
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
+
+class ReportDiffResponse(BaseModel):
+    """Response schema for report diff"""
+    status: str
+    session_id: str
+    report_id: Optional[str] = None
+    base_report_id: Optional[str] = None
+    approved_at: Optional[str] = None
+    change_count: int = 0
+    changes: List[Dict[str, Any]] = []
+
+# Audit: what the reviewer changed at approval
+config = {
+    "type": "api",
+    "name": "GetReportDiffAPI",
+    "description": "Show reviewer changes between draft and approved report",
+    "flows": ["medical-report"],
+    "method": "GET",
+    "path": "/medical/report/{session_id}/diff",
+    "responseSchema": {
+        200: ReportDiffResponse.model_json_schema(),
+    },
+    "emits": [],
+}
+
+async def handler(req, context):
+    """
+    Return the approval patch with before/after values for each change
+    """
+    state = ReportState(context)
+    params = req.get("params", {})
+    session_id = params.get("session_id")
+
+    context.logger.info("Retrieving Report Diff", {"session_id": session_id})
+
+    try:
+        final_patch = await state.get(f"final_patch_{session_id}")
+
+        if not final_patch:
+            return {
+                "status": 404,
+                "body": {
+                    "status": "not_found",
+                    "session_id": session_id,
+                    "change_count": 0,
+                    "changes": []
+                }
+            }
+
+        draft_report = await state.get(f"draft_report_{session_id}")
+        approved_base = await state.get(f"approved_base_{session_id}")
+        base = report_patch.find_base(final_patch, draft_report, approved_base)
+
+        if base is None:
+            raise ValueError("Draft report the approval was made against is no longer available")
+
+        changes = report_patch.describe_patch(base, final_patch.get("ops", []))
+
+        return {
+            "status": 200,
+            "body": {
+                "status": "success",
+                "session_id": session_id,
+                "report_id": final_patch.get("report_id"),
+                "base_report_id": final_patch.get("base_report_id"),
+                "approved_at": final_patch.get("created_at"),
+                "change_count": len(changes),
+                "changes": changes
+            }
+        }
+
+    except Exception as e:
+        context.logger.error("Report Diff Failed", {"error": str(e)})
+        return {
+            "status": 500,
+            "body": {
+                "status": "error",
+                "message": str(e)
+            }
+        }
@@ -19,7 +19,41 @@ def get_report_generator():
     spec.loader.exec_module(module)
     return module.generate_medical_report
 
+# Import lab analyzer dynamically
+def get_lab_analyzer():
+    spec = importlib.util.spec_from_file_location(
+        "lab_analyzer",
+        os.path.join(os.path.dirname(__file__), '../../services/lab-agent/lab_analyzer.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.LabResultAnalyzer()
+
+# Import report patch service dynamically
+def get_report_patch():
+    spec = importlib.util.spec_from_file_location(
+        "report_patch",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_patch.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 generate_medical_report = get_report_generator()
+lab_analyzer = get_lab_analyzer()
+report_patch = get_report_patch()
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+ReportState = get_state_codec()
 
 class ReportGenerationRequest(BaseModel):
     """Request schema for report generation"""
@@ -52,6 +86,7 @@ async def handler(req, context):
     """
     Generate complete medical report from all data
     """
+    state = ReportState(context)
     body = req.get("body", {})
     session_id = body.get("session_id")
     
@@ -59,13 +94,28 @@ async def handler(req, context):
     
     try:
         # Retrieve stored data from state
-        patient_info = await context.state.get("medical_reports", f"patient_info_{session_id}")
-        imaging_result = await context.state.get("medical_reports", f"imaging_result_{session_id}")
-        lab_result = await context.state.get("medical_reports", f"lab_result_{session_id}")
+        patient_info = await state.get(f"patient_info_{session_id}")
+        imaging_result = await state.get(f"imaging_result_{session_id}")
+        lab_result = await state.get(f"lab_result_{session_id}")
         
         if not patient_info:
             raise ValueError("Patient information not found. Please complete image analysis first.")
         
+        # Re-score labs only if they were graded against an older reference catalogue
+        if lab_result and lab_analyzer.is_stale(lab_result):
+            lab_input = await state.get(f"lab_input_{session_id}")
+            if lab_input:
+                refreshed = lab_analyzer.analyze_panel(lab_input)
+                if lab_result.get("trend_analysis"):
+                    refreshed["trend_analysis"] = lab_result["trend_analysis"]
+                context.logger.info("Lab Result Re-scored", {
+                    "session_id": session_id,
+                    "from_version": lab_result.get("reference_catalogue_version"),
+                    "to_version": refreshed.get("reference_catalogue_version")
+                })
+                lab_result = refreshed
+                await state.set(f"lab_result_{session_id}", lab_result)
+        
         # Generate report
         report = generate_medical_report(
             patient_data=patient_info,
@@ -73,9 +123,15 @@ async def handler(req, context):
             lab_data=lab_result
         )
         
+        # An approved report is a patch against the current draft; keep that base
+        final_patch = await state.get(f"final_patch_{session_id}")
+        if final_patch:
+            previous_draft = await state.get(f"draft_report_{session_id}")
+            if report_patch.find_base(final_patch, previous_draft):
+                await state.set(f"approved_base_{session_id}", previous_draft)
+        
         # Store draft report in state
-        await context.state.set(
-            "medical_reports",
+        await state.set(
             f"draft_report_{session_id}",
             report
         )
@@ -95,7 +151,8 @@ async def handler(req, context):
         
         context.logger.info("Report Generated - Awaiting Approval", {
             "session_id": session_id,
-            "report_id": report_id
+            "report_id": report_id,
+            "section_cache": report.get("metadata", {}).get("section_cache")
         })
         
         return {
@@ -0,0 +1,149 @@
+"""
+Report Preview Step
+Formatted HTML view of the current report for the review screen
+"""
+
+from pydantic import BaseModel
+from typing import Optional
+import os
+import importlib.util
+
+# Import HTML renderer dynamically
+def get_html_renderer():
+    spec = importlib.util.spec_from_file_location(
+        "html_renderer",
+        os.path.join(os.path.dirname(__file__), '../../services/pdf-service/html_renderer.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Import report patch service dynamically
+def get_report_patch():
+    spec = importlib.util.spec_from_file_location(
+        "report_patch",
+        os.path.join(os.path.dirname(__file__), '../../services/report-agent/report_patch.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Import state codec dynamically
+def get_state_codec():
+    spec = importlib.util.spec_from_file_location(
+        "state_codec",
+        os.path.join(os.path.dirname(__file__), 'state_codec.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReportState
+
+html_renderer = get_html_renderer()
+report_patch = get_report_patch()
+ReportState = get_state_codec()
+
+# Rendered previews, keyed by report version
+preview_cache = html_renderer.PreviewCache()
+
+class PreviewNotFoundResponse(BaseModel):
+    """Response schema when no report exists"""
+    status: str
+    session_id: Optional[str] = None
+    message: str
+
+# Review screen: HTML preview (the PDF is only rendered at approval)
+config = {
+    "type": "api",
+    "name": "ReportPreviewAPI",
+    "description": "HTML preview of the draft or approved report",
+    "flows": ["medical-report"],
+    "method": "GET",
+    "path": "/medical/report/{session_id}/preview",
+    "responseSchema": {
+        200: {
+            "content": {
+                "text/html": {}
+            }
+        },
+        404: PreviewNotFoundResponse.model_json_schema(),
+    },
+    "emits": [],
+}
+
+async def _load_report(state, session_id, version_key):
+    """Full report for a cache miss"""
+    final_patch = await state.get(f"final_patch_{session_id}")
+    if final_patch:
+        draft_report = await state.get(f"draft_report_{session_id}")
+        approved_base = await state.get(f"approved_base_{session_id}")
+        base = report_patch.find_base(final_patch, draft_report, approved_base)
+        if base is None:
+            raise ValueError("Draft report the approval was made against is no longer available")
+        return report_patch.reconstruct_final_report(base, final_patch)
+    if version_key.endswith(":final"):
+        return await state.get(f"final_report_{session_id}")
+    return await state.get(f"draft_report_{session_id}")
+
+async def handler(req, context):
+    """
+    Serve the report as HTML, re-rendering only when the report changed
+    """
+    state = ReportState(context)
+    params = req.get("params", {})
+    session_id = params.get("session_id")
+    headers = {key.lower(): value for key, value in (req.get("headers") or {}).items()}
+
+    try:
+        # Work out the report version without decoding any full report
+        final_patch = await state.get(f"final_patch_{session_id}")
+        if final_patch:
+            version_key = f"{final_patch.get('report_id')}:{final_patch.get('created_at')}"
+        else:
+            legacy_final = await state.get_meta(f"final_report_{session_id}")
+            draft_meta = await state.get_meta(f"draft_report_{session_id}")
+            if legacy_final:
+                version_key = f"{legacy_final.get('report_id')}:final"
+            elif draft_meta:
+                version_key = f"{draft_meta.get('report_id')}:draft"
+            else:
+                return {
+                    "status": 404,
+                    "body": {
+                        "status": "not_found",
+                        "session_id": session_id,
+                        "message": "No report found for this session"
+                    }
+                }
+
+        etag = f'"{version_key}"'
+        cache_headers = {
+            "ETag": etag,
+            # Always revalidate; an unchanged report costs a 304 and no rendering
+            "Cache-Control": "private, no-cache"
+        }
+        if headers.get("if-none-match") == etag:
+            return {"status": 304, "headers": cache_headers, "body": ""}
+
+        html = preview_cache.get(version_key)
+        if html is None:
+            report = await _load_report(state, session_id, version_key)
+            html = preview_cache.render(version_key, report)
+
+        return {
+            "status": 200,
+            "headers": {
+                "Content-Type": "text/html; charset=utf-8",
+                **cache_headers
+            },
+            "body": html
+        }
+
+    except Exception as e:
+        context.logger.error("Report Preview Failed", {"error": str(e)})
+        return {
+            "status": 500,
+            "body": {
+                "status": "error",
+                "message": str(e)
+            }
+        }
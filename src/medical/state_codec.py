@@ -0,0 +1,277 @@
+"""
+State Codec
+Compact encoding for report, imaging and lab documents kept in Motia state
+"""
+
+from typing import Dict, Any, Optional, Tuple
+import base64
+import json
+import time
+import zlib
+
+STATE_GROUP = "medical_reports"
+
+# Envelope marker; entries without it are plain JSON written before the codec
+CODEC_KEY = "__codec__"
+CODEC_NAME = "zlib-dict"
+
+# Documents smaller than this are stored as plain JSON
+MIN_ENCODE_BYTES = 256
+
+# Small top-level fields copied into the envelope, readable without decoding
+META_FIELDS = ("report_id", "status", "session_id", "patient_id", "base_report_id", "base_hash")
+
+# Strings that recur in every document: report and lab keys, section headers,
+# the disclaimer and the lab/imaging template sentences. zlib treats them as
+# already-seen data, so each document only pays for what is specific to it.
+# A version is never edited once released; add a new one and bump
+# CURRENT_DICTIONARY so older entries keep decoding with their own.
+_DICTIONARY_FRAGMENTS_V1 = (
+    # Imaging
+    '"image_type":"xray"', '"image_path":"', '"features":{"mean_intensity":', '"std_intensity":',
+    '"texture_variance":', '"edge_density":', '"bright_region_ratio":', '"dark_region_ratio":',
+    '"image_dimensions":{"height":', '"width":', '"observations":["',
+    'Image quality: Adequate for diagnostic assessment.', 'Image quality: Low contrast detected. Clinical correlation recommended.',
+    'Image quality: High contrast with detailed structural visibility.',
+    'Overall density: Within expected range.', 'Overall density: Increased opacity observed.',
+    'Overall density: Predominantly lucent appearance noted.',
+    'Notable lucent regions identified. Further radiologist review recommended.',
+    'Dense regions noted. Clinical correlation advised.', 'Well-defined structural borders present.',
+    'Homogeneous appearance with minimal structural variation.',
+    'Radiographic examination completed. Standard positioning maintained.',
+    'MRI acquisition parameters within acceptable range.',
+    'CT scan slice reviewed. Axial plane visualization adequate.',
+    '"disclaimer":"AI-generated observations. For radiologist review only. Not a diagnosis."',
+    # Report sections
+    '"report_id":"RPT-', '"generated_date":"', '"report_version":"1.0.0"', '"status":"draft"',
+    '"requires_approval":true', '"patient_information":{"patient_id":"', '"patient_name":"',
+    '"age":"', '"gender":"', '"study_date":"', '"examination_summary":"', '"imaging_findings":{',
+    '"laboratory_findings":{', '"interpretive_notes":["INTERPRETIVE NOTES:",""',
+    '"recommendations":["RECOMMENDATIONS:",""', '"metadata":{"has_imaging":', '"has_labs":',
+    '"requires_urgent_review":', '"section_cache":{"sections":{"patient_information":"',
+    '"examination_summary":"hit"', '"imaging_findings":"hit"', '"laboratory_findings":"hit"',
+    '"interpretive_notes":"hit"', '"recommendations":"hit"', '"hits":', '"misses":',
+    '"status":"completed"', '"status":"pending"', '"observations_count":', '"abnormal_count":',
+    '"critical_count":', '"findings":["', 'Imaging analysis pending or unavailable.',
+    'Laboratory analysis pending or unavailable.', 'EXAMINATION:', 'Technical details: Image resolution ',
+    'LABORATORY RESULTS:', 'Summary: ', 'Detailed Results:', 'CRITICAL VALUES:', 'ABNORMAL VALUES:',
+    'DELTA CHECKS:', ' (Reference: ', 'imaging study completed. Image quality assessed and processed for diagnostic review.',
+    'Laboratory panel consisting of ', ' tests analyzed. ', ' value(s) outside normal reference ranges.',
+    '• Critical laboratory values identified requiring immediate clinical attention.',
+    '• Imaging findings noted require radiologist review and clinical correlation.',
+    '• Laboratory abnormalities require clinical correlation with patient presentation.',
+    '• Examination findings within expected parameters.', '• Routine clinical follow-up as appropriate.',
+    '• Comprehensive clinical assessment recommended.',
+    '• These findings are AI-generated and require expert medical review.',
+    '1. Immediate physician review recommended for critical values.',
+    '2. Clinical correlation with patient symptoms and history.',
+    '3. Consider repeat testing if clinically indicated.',
+    '1. Radiologist review and interpretation required.',
+    '2. Clinical correlation with patient presentation recommended.',
+    '3. Follow-up imaging or laboratory studies as clinically indicated.',
+    '4. All findings should be interpreted in the context of complete patient evaluation.',
+    '"disclaimer":["","' + '═' * 80 + '","IMPORTANT DISCLAIMER","' + '═' * 80 + '","",'
+    '"This report is AI-GENERATED and is intended as a DRAFT for review purposes only.","",'
+    '"• NOT a medical diagnosis or treatment recommendation",'
+    '"• NOT a substitute for professional medical judgment",'
+    '"• MUST be reviewed and validated by a licensed radiologist/physician",'
+    '"• AI analysis may contain errors or omissions",'
+    '"• Clinical correlation with patient history and examination is essential","",'
+    '"This draft report requires human expert review and approval before clinical use.","","' + '═' * 80 + '"]',
+    # Lab results
+    '"status":"success","summary":{"total_tests":', '"normal_count":', '"summary_text":"',
+    ' abnormal value(s) noted.', 'All values within normal reference ranges.',
+    ' critical value(s) requiring immediate attention.',
+    '"abnormal_findings":[', '"critical_findings":[', '"trend_analysis":{"status":"success","window":5,"trends":[',
+    '"delta_alerts":[', '"previous_value":', '"previous_date":"', '"delta":', '"delta_limit":',
+    '"delta_exceeded":false', '"direction":"', '"slope_per_day":', '"points":',
+    '"reference_catalogue_version":"', '"disclaimer":"Laboratory results for clinical correlation only. Not a medical diagnosis."',
+    'Hemoglobin', 'White Blood Cell Count', 'Platelet Count', 'Hematocrit', 'Red Blood Cell Count',
+    'Glucose', 'Creatinine', 'Blood Urea Nitrogen', 'Sodium', 'Potassium', 'Calcium',
+    'ALT (Liver)', 'AST (Liver)', 'Total Bilirubin', 'Total Cholesterol',
+    'HDL Cholesterol', 'LDL Cholesterol', 'Triglycerides',
+    '"unit":"g/dL"', '"unit":"mg/dL"', '"unit":"mEq/L"', '"unit":"U/L"', '"unit":"%"',
+    '"unit":"×10³/μL"', '"unit":"×10⁶/μL"',
+    '"status":"critical_low","flag":"⚠️ CRITICAL LOW","interpretation":"Value critically below normal range. Immediate clinical attention recommended."}',
+    '"status":"critical_high","flag":"⚠️ CRITICAL HIGH","interpretation":"Value critically above normal range. Immediate clinical attention recommended."}',
+    '"status":"low","flag":"↓ LOW","interpretation":"Value below normal range. Clinical correlation advised."}',
+    '"status":"high","flag":"↑ HIGH","interpretation":"Value above normal range. Clinical correlation advised."}',
+    '"status":"normal","flag":"✓","interpretation":"Value within normal range."}',
+    '{"test_name":"', '"value":', '"reference_range":"',
+)
+
+# Zlib uses at most the last 32 KiB of a dictionary; the most common strings go last
+DICTIONARIES = {
+    1: "".join(_DICTIONARY_FRAGMENTS_V1).encode("utf-8"),
+}
+CURRENT_DICTIONARY = 1
+
+# Running totals for the size/time report
+stats = {
+    "encoded": 0,
+    "decoded": 0,
+    "raw_bytes": 0,
+    "stored_bytes": 0,
+    "encode_seconds": 0.0,
+    "decode_seconds": 0.0,
+}
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def is_encoded(value: Any) -> bool:
+    return isinstance(value, dict) and CODEC_KEY in value
+
+
+def encode(value: Any) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Value to store in state, plus size/time figures for this document
+    Small values and non-documents pass through unchanged
+    """
+    if not isinstance(value, (dict, list)):
+        return value, {}
+
+    started = time.perf_counter()
+    raw = _dumps(value)
+    if len(raw) < MIN_ENCODE_BYTES:
+        return value, {}
+
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY,
+                                  DICTIONARIES[CURRENT_DICTIONARY])
+    packed = compressor.compress(raw) + compressor.flush()
+    envelope = {
+        CODEC_KEY: CODEC_NAME,
+        "dict": CURRENT_DICTIONARY,
+        "size": len(raw),
+        # Base64 because state values are JSON
+        "data": base64.b64encode(packed).decode("ascii"),
+    }
+    if isinstance(value, dict):
+        meta = {field: value[field] for field in META_FIELDS if field in value}
+        if meta:
+            envelope["meta"] = meta
+    elapsed = time.perf_counter() - started
+
+    stored = len(_dumps(envelope))
+    if stored >= len(raw):
+        # Mostly unique content (hashes, IDs): plain JSON is smaller
+        return value, {}
+    stats["encoded"] += 1
+    stats["raw_bytes"] += len(raw)
+    stats["stored_bytes"] += stored
+    stats["encode_seconds"] += elapsed
+    return envelope, {
+        "raw_bytes": len(raw),
+        "stored_bytes": stored,
+        "ratio": round(stored / len(raw), 3),
+        "encode_ms": round(elapsed * 1000, 3)
+    }
+
+
+def decode(value: Any) -> Any:
+    """Inverse of encode; plain JSON entries are returned as they are"""
+    if not is_encoded(value):
+        return value
+    if value[CODEC_KEY] != CODEC_NAME:
+        raise ValueError(f"Unknown state codec: {value[CODEC_KEY]}")
+
+    started = time.perf_counter()
+    decompressor = zlib.decompressobj(-15, DICTIONARIES[value["dict"]])
+    raw = decompressor.decompress(base64.b64decode(value["data"])) + decompressor.flush()
+    document = json.loads(raw)
+    stats["decoded"] += 1
+    stats["decode_seconds"] += time.perf_counter() - started
+    return document
+
+
+def meta(value: Any) -> Dict[str, Any]:
+    """Envelope metadata (report_id, status, ...) without decompressing the document"""
+    if is_encoded(value):
+        return value.get("meta", {})
+    if isinstance(value, dict):
+        return {field: value[field] for field in META_FIELDS if field in value}
+    return {}
+
+
+def summary() -> Dict[str, Any]:
+    """Totals since process start: sizes before/after and mean encode/decode time"""
+    encoded, decoded = stats["encoded"], stats["decoded"]
+    return {
+        **stats,
+        "ratio": round(stats["stored_bytes"] / stats["raw_bytes"], 3) if stats["raw_bytes"] else None,
+        "mean_encode_ms": round(stats["encode_seconds"] * 1000 / encoded, 4) if encoded else None,
+        "mean_decode_ms": round(stats["decode_seconds"] * 1000 / decoded, 4) if decoded else None,
+    }
+
+
+class ReportState:
+    """
+    context.state for the medical_reports group with transparent encoding
+    get() decodes on read; get_meta() reads envelope fields only
+    """
+
+    def __init__(self, context, group: str = STATE_GROUP):
+        self._state = context.state
+        self._logger = context.logger
+        self.group = group
+
+    async def get(self, key: str) -> Any:
+        return decode(await self._state.get(self.group, key))
+
+    async def get_meta(self, key: str) -> Dict[str, Any]:
+        return meta(await self._state.get(self.group, key))
+
+    async def set(self, key: str, value: Any):
+        stored, figures = encode(value)
+        await self._state.set(self.group, key, stored)
+        if figures:
+            self._logger.info("State Document Encoded", {"key": key, **figures})
+
+
+if __name__ == "__main__":
+    # Size and timing report over the demo data
+    import os
+    import importlib.util
+
+    base = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../..")
+
+    def load(name, path):
+        spec = importlib.util.spec_from_file_location(name, os.path.join(base, path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    lab_analyzer = load("lab_analyzer", "services/lab-agent/lab_analyzer.py")
+    report_generator = load("report_generator", "services/report-agent/report_generator.py")
+
+    with open(os.path.join(base, "demo-data/sample_patient_1.json")) as f:
+        patient = json.load(f)
+    with open(os.path.join(base, "demo-data/sample_labs_1.json")) as f:
+        lab_result = lab_analyzer.analyze_lab_results(json.load(f))
+    imaging = {
+        "status": "success", "image_type": "xray", "image_path": patient["image_path"],
+        "metadata": patient, "observations": [
+            "Image quality: Adequate for diagnostic assessment.",
+            "Overall density: Within expected range.",
+            "Radiographic examination completed. Standard positioning maintained."
+        ],
+        "image_dimensions": {"height": 1024, "width": 1024},
+        "disclaimer": "AI-generated observations. For radiologist review only. Not a diagnosis."
+    }
+    draft = report_generator.generate_medical_report(patient, imaging, lab_result)
+
+    print(f"{'document':<16} {'json bytes':>11} {'stored':>8} {'ratio':>7} {'encode ms':>10} {'decode ms':>10}")
+    for name, document in (("lab_result", lab_result), ("imaging_result", imaging), ("draft_report", draft)):
+        runs = 200
+        started = time.perf_counter()
+        for _ in range(runs):
+            stored, figures = encode(document)
+        encode_ms = (time.perf_counter() - started) * 1000 / runs
+        started = time.perf_counter()
+        for _ in range(runs):
+            assert decode(stored) == document
+        decode_ms = (time.perf_counter() - started) * 1000 / runs
+        print(f"{name:<16} {figures['raw_bytes']:>11} {figures['stored_bytes']:>8} {figures['ratio']:>7} "
+              f"{encode_ms:>10.4f} {decode_ms:>10.4f}")
@@ -5,6 +5,7 @@ Test PDF Generation with Comprehensive Medical Report Data
 
 import sys
 import os
+import tempfile
 import importlib.util
 
 # Load PDF generator dynamically
@@ -222,6 +223,16 @@ def test_pdf_generation():
         return False
 
 
+def test_repeat_export_leaves_only_pdf():
+    """Exporting the same report again reuses the cached PDF without leaving temp files"""
+    report_data = create_comprehensive_test_report()
+    with tempfile.TemporaryDirectory() as output_dir:
+        first = export_report_to_pdf(report_data, output_dir)
+        second = export_report_to_pdf(report_data, output_dir)
+        assert first == second
+        assert os.listdir(output_dir) == [os.path.basename(first)]
+
+
 if __name__ == "__main__":
     success = test_pdf_generation()
     sys.exit(0 if success else 1)
@@ -5,8 +5,6 @@ echo "Testing Medical Report Workflow"
 echo "======================================"
 echo ""
 
-SESSION_ID="SESSION-TEST123-2025-12-17"
-
 # Step 1: Image Analysis
 echo "Step 1: Analyzing image..."
 IMAGE_RESPONSE=$(curl -s -X POST http://localhost:3000/medical/analyze-image \
@@ -23,6 +21,8 @@ IMAGE_RESPONSE=$(curl -s -X POST http://localhost:3000/medical/analyze-image \
 echo "✓ Image Analysis: $IMAGE_RESPONSE"
 echo ""
 
+SESSION_ID=$(echo $IMAGE_RESPONSE | grep -o '"session_id": *"[^"]*"' | cut -d'"' -f4)
+
 # Step 2: Lab Analysis
 echo "Step 2: Analyzing lab results..."
 LAB_RESPONSE=$(curl -s -X POST http://localhost:3000/medical/analyze-labs \